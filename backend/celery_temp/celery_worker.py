@@ -19,6 +19,13 @@ celery_app.conf.update(
     enable_utc=True,
     worker_send_task_events=True,  # Enable task events for monitoring
     task_send_sent_event=True,
+    # Staged upload blobs whose task never ran (run the worker with -B)
+    beat_schedule={
+        "cleanup-staged-blobs": {
+            "task": "celery_temp.tasks.cleanup_staged_blobs",
+            "schedule": 3600.0,
+        },
+    },
 )
 
 if __name__ == "__main__":
@@ -0,0 +1,46 @@
+# Queue Celery tasks from the API. The imports are deferred so that API
+# processes load celery, the Redis-backed app, cloudinary and loguru only
+# when a task is actually queued.
+
+from utils.blob_store import blob_store
+
+
+def _delay(task, key: str, image):
+    # Uploads are staged on disk; only the blob reference goes through Redis
+    if not hasattr(image, "read"):
+        return task.delay(key, image)
+    ref = blob_store.put(image)
+    try:
+        return task.delay(key, ref)
+    except BaseException:
+        blob_store.release(ref)
+        raise
+
+
+def queue_book_cover(book_id: str, image):
+    """`image` is an open file (staged as a blob) or a remote URL Cloudinary
+    fetches itself."""
+    from celery_temp.tasks import upload_image_and_update_book
+
+    return _delay(upload_image_and_update_book, book_id, image)
+
+
+def queue_profile_image(user_id: str, image):
+    from celery_temp.tasks import update_profile_image
+
+    return _delay(update_profile_image, user_id, image)
+
+
+def queue_release_images(*urls):
+    """Release the image references of a deleted book/profile; empty URLs are
+    skipped."""
+    urls = [url for url in urls if url]
+    if not urls:
+        return None
+    from celery_temp.tasks import release_images
+
+    try:
+        return release_images.delay(urls)
+    except Exception:
+        # The delete has committed; a lost release only keeps the asset alive
+        return None
@@ -1,6 +1,10 @@
+from contextlib import contextmanager
+
 from celery_temp.celery_worker import celery_app
-from utils.cloudinary import upload_image, delete_image
+from utils.blob_store import blob_digest, blob_store, is_blob_ref
+from utils.image_assets import acquire_image, release_image
 from database.mysql import SessionLocal
+from database.routing import pin_primary
 from models.book.book_model import Book
 from loguru import logger
 
@@ -36,18 +40,45 @@ def get_db():
         db.close()
 
 
+@contextmanager
+def staged_image(image):
+    """Yield ``(source, digest)``: the path of a staged blob and its SHA-256,
+    or `image` itself (a remote URL) and None. A staged blob is released
+    afterwards."""
+    if not is_blob_ref(image):
+        yield image, None
+        return
+    try:
+        yield blob_store.path(image), blob_digest(image)
+    finally:
+        blob_store.release(image)
+
+
 @celery_app.task
-def upload_image_and_update_book(book_id, image_bytes):
+def upload_image_and_update_book(book_id, image):
+    db = SessionLocal()
+    # Queued right after the row was written; a lagging replica may not have it
+    pin_primary(db)
     try:
-        url = upload_image(image_bytes)
-        db = SessionLocal()
-        book = db.query(Book).filter(Book.id == book_id).first()
-        if book:
-            book.cover_image = url if url else None
-            db.commit()
-            logger.success(f"Book {book_id} updated with new cover image.")
-        else:
-            logger.warning(f"Book {book_id} not found.")
+        with staged_image(image) as (source, digest):
+            book = db.query(Book).filter(Book.id == book_id).first()
+            if not book:
+                logger.warning(f"Book {book_id} not found.")
+                return
+            # Identical bytes reuse the stored renditions instead of re-uploading
+            stored = acquire_image(db, source, digest)
+        old_image = book.cover_image
+        book.cover_image = stored.url if stored else None
+        book.cover_thumb = stored.thumb_url if stored else None
+        db.commit()
+        # No book_cache invalidation: the cache lives in each API process, out
+        # of this worker's reach. Coverless books are never cached, so a first
+        # cover shows at once; a replaced one once the entry's TTL runs out
+
+        # Same bytes again: acquire took a second reference, this drops it
+        if old_image:
+            release_image(db, old_image)
+        logger.success(f"Book {book_id} updated with new cover image.")
     except Exception as e:
         logger.error(f"Error: {e}")
     finally:
@@ -55,25 +86,50 @@ def upload_image_and_update_book(book_id, image_bytes):
 
 
 @celery_app.task
-def update_profile_image(user_id, image_bytes):
+def update_profile_image(user_id, image):
     db = SessionLocal()
+    pin_primary(db)
     try:
-        profile = db.query(Profile).filter(Profile.profile_id == user_id).first()
-        if not profile:
-            logger.warning(f"Profile ID: {user_id} not found!")
-            return
+        with staged_image(image) as (source, digest):
+            profile = db.query(Profile).filter(Profile.profile_id == user_id).first()
+            if not profile:
+                logger.warning(f"Profile ID: {user_id} not found!")
+                return
+            stored = acquire_image(db, source, digest)
 
         old_image = profile.profile_Image
-        if old_image is not None:
-            delete_image(old_image)
-            logger.info(f"Old profile image deleted!")
-
-        url = upload_image(image_bytes)
-        profile.profile_Image = url
+        # Avatars are shown small; the medium rendition is plenty
+        profile.profile_Image = (stored.medium_url or stored.url) if stored else None
         db.commit()
         db.refresh(profile)
+        # The old asset is destroyed only if nothing else references it
+        if old_image is not None and release_image(db, old_image):
+            logger.info(f"Old profile image deleted!")
         logger.success(f"Profile {user_id} updated with new image.")
     except Exception as e:
         logger.error(f"Error updating profile image for user {user_id}: {e}")
     finally:
         db.close()
+
+
+@celery_app.task
+def release_images(urls):
+    """Drop the asset references held by a deleted book or profile."""
+    db = SessionLocal()
+    pin_primary(db)
+    try:
+        for url in urls:
+            if release_image(db, url):
+                logger.info(f"Image {url} deleted!")
+    except Exception as e:
+        logger.error(f"Error releasing images {urls}: {e}")
+    finally:
+        db.close()
+
+
+@celery_app.task
+def cleanup_staged_blobs():
+    removed = blob_store.cleanup()
+    if removed:
+        logger.info(f"Removed {removed} staged blobs never consumed.")
+    return removed
@@ -4,9 +4,16 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 import pymysql
 
+from database.pool import InstrumentedQueuePool, instrument_engine
+from database.routing import ReplicaSet, RoutingSession, register_replicas
+
 load_dotenv()
 
 
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
 SQL_SERVER_HOST = os.getenv("SQL_SERVER_HOST")
 SQL_SERVER_DB = os.getenv("SQL_SERVER_DB")
 SQL_SERVER_USER = os.getenv("SQL_SERVER_USER")
@@ -14,12 +21,71 @@ SQL_SERVER_PASSWORD = os.getenv("SQL_SERVER_PASSWORD")
 SQL_SERVER_PORT = os.getenv("SQL_SERVER_PORT", "3306")
 
 SQL_SERVER_URL = f"mysql+pymysql://{SQL_SERVER_USER}:{SQL_SERVER_PASSWORD}@{SQL_SERVER_HOST}:{SQL_SERVER_PORT}/{SQL_SERVER_DB}"
+SQL_SERVER_ASYNC_URL = os.getenv(
+    "SQL_SERVER_ASYNC_URL",
+    f"mysql+asyncmy://{SQL_SERVER_USER}:{SQL_SERVER_PASSWORD}@{SQL_SERVER_HOST}:{SQL_SERVER_PORT}/{SQL_SERVER_DB}",
+)
+# Comma-separated read replicas; SELECTs are spread over them
+SQL_REPLICA_URLS = [
+    url.strip() for url in os.getenv("SQL_REPLICA_URLS", "").split(",") if url.strip()
+]
+REPLICA_RETRY_AFTER = float(os.getenv("SQL_REPLICA_RETRY_AFTER", "30"))
+# DB_ASYNC=true serves requests through AsyncSession repositories instead
+DB_ASYNC = _env_flag("DB_ASYNC")
+
+DB_ECHO = _env_flag("DB_ECHO")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle well before MySQL's wait_timeout drops idle connections
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", "true")
+# Connections opened at startup so the first requests skip the handshake
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", "0"))
+# Local convenience only; deployments run `python -m tools.schema create`
+DB_CREATE_TABLES = _env_flag("DB_CREATE_TABLES")
+
+
+def engine_options():
+    """Engine/pool keyword arguments shared by the sync and async engines."""
+    return {
+        "echo": DB_ECHO,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def create_db_engine(url: str, name: str = "primary", **overrides):
+    """Engine on an instrumented QueuePool, registered for the stats API."""
+    options = {**engine_options(), "poolclass": InstrumentedQueuePool, **overrides}
+    engine = create_engine(url, **options)
+    return instrument_engine(name, engine)
+
 
 # Create a new SQLAlchemy engine instance
-engine = create_engine(SQL_SERVER_URL, echo=True)
+engine = create_db_engine(SQL_SERVER_URL)
+replicas = register_replicas(
+    "replicas",
+    ReplicaSet(
+        [
+            create_db_engine(url, name=f"replica_{index}")
+            for index, url in enumerate(SQL_REPLICA_URLS, 1)
+        ],
+        retry_after=REPLICA_RETRY_AFTER,
+    ),
+)
 
-# Create a configured "Session" class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create a configured "Session" class; without replicas every query goes to `engine`
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    replicas=replicas,
+)
 
 
 Base = declarative_base()
@@ -0,0 +1,54 @@
+import os
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database.mysql import (
+    REPLICA_RETRY_AFTER,
+    SQL_REPLICA_URLS,
+    SQL_SERVER_ASYNC_URL,
+    engine_options,
+)
+from database.pool import InstrumentedAsyncQueuePool, instrument_engine
+from database.routing import ReplicaSet, RoutingSession, register_replicas
+
+# Defaults to the sync replica URLs on the asyncmy driver
+SQL_REPLICA_ASYNC_URLS = [
+    url.strip()
+    for url in os.getenv("SQL_REPLICA_ASYNC_URLS", "").split(",")
+    if url.strip()
+] or [url.replace("+pymysql", "+asyncmy") for url in SQL_REPLICA_URLS]
+
+
+def create_async_db_engine(url: str, name: str):
+    engine = create_async_engine(
+        url, poolclass=InstrumentedAsyncQueuePool, **engine_options()
+    )
+    instrument_engine(name, engine)
+    return engine
+
+
+# Only imported when DB_ASYNC is on, so the sync stack never needs asyncmy
+async_engine = create_async_db_engine(SQL_SERVER_ASYNC_URL, "primary_async")
+async_replica_engines = [
+    create_async_db_engine(url, f"replica_async_{index}")
+    for index, url in enumerate(SQL_REPLICA_ASYNC_URLS, 1)
+]
+async_replicas = register_replicas(
+    "replicas_async",
+    ReplicaSet(async_replica_engines, retry_after=REPLICA_RETRY_AFTER),
+)
+
+# expire_on_commit=False: attributes stay readable after commit without an
+# implicit (and, under asyncio, impossible) lazy refresh
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=RoutingSession,
+    replicas=async_replicas,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,128 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# name -> sync Engine, for the internal stats API
+_engines = {}
+
+
+class PoolStats:
+    """Counters for one connection pool, fed by pool events and checkout timing."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def incr(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self, pool):
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": (
+                    round(self.wait_total / waits * 1000, 3) if waits else 0.0
+                ),
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+            }
+
+
+class InstrumentedPoolMixin:
+    """Times ``_do_get``, i.e. how long a checkout waited for a free (or new)
+    connection, including checkouts that hit ``pool_timeout``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(name: str, engine):
+    """Hook pool events for `engine` (sync or async) and register it under
+    `name` for ``pool_stats``."""
+    engine = getattr(engine, "sync_engine", engine)
+    pool = engine.pool
+    if not hasattr(pool, "stats"):
+        pool.stats = PoolStats()
+    stats = pool.stats
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_conn, record, proxy):
+        stats.incr("checkouts")
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_conn, record):
+        stats.incr("checkins")
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_conn, record):
+        stats.incr("connects")
+
+    @event.listens_for(pool, "close")
+    def on_close(dbapi_conn, record):
+        stats.incr("closes")
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_conn, record, exception):
+        stats.incr("invalidations")
+
+    _engines[name] = engine
+    return engine
+
+
+def pool_stats():
+    return {
+        name: engine.pool.stats.snapshot(engine.pool)
+        for name, engine in _engines.items()
+    }
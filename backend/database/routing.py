@@ -0,0 +1,132 @@
+import itertools
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Seconds a replica sits out after a connection-level failure
+REPLICA_RETRY_AFTER = 30
+
+# name -> ReplicaSet, for the internal stats API
+_replica_sets = {}
+
+# bind_arguments sending one statement to the primary without pinning the
+# rest of the session, e.g. db.scalar(stmt, bind_arguments=PRIMARY)
+PRIMARY = {"primary": True}
+
+
+class ReplicaSet:
+    """Round-robin over replica engines, skipping ones that recently failed."""
+
+    def __init__(self, engines, retry_after: float = REPLICA_RETRY_AFTER):
+        self.engines = [getattr(engine, "sync_engine", engine) for engine in engines]
+        self.retry_after = retry_after
+        self._down_until = {}
+        self._cycle = itertools.cycle(range(len(self.engines)))
+        self._lock = threading.Lock()
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def __len__(self):
+        return len(self.engines)
+
+    def _on_error(self, context):
+        # Only connectivity problems take a replica out; a bad query is not
+        # the replica's fault
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, engine):
+        with self._lock:
+            self._down_until[engine] = time.monotonic() + self.retry_after
+
+    def is_up(self, engine) -> bool:
+        with self._lock:
+            return self._down_until.get(engine, 0) <= time.monotonic()
+
+    def pick(self):
+        """Next healthy replica, or None when every replica is down."""
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                engine = self.engines[next(self._cycle)]
+                if self._down_until.get(engine, 0) <= now:
+                    return engine
+        return None
+
+    def health(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                engine.url.render_as_string(hide_password=True): (
+                    self._down_until.get(engine, 0) <= now
+                )
+                for engine in self.engines
+            }
+
+
+def register_replicas(name: str, replicas: ReplicaSet):
+    _replica_sets[name] = replicas
+    return replicas
+
+
+def replica_health():
+    return {name: replicas.health() for name, replicas in _replica_sets.items()}
+
+
+class RoutingSession(Session):
+    """Sends plain SELECTs to a replica and everything else to the primary
+    bind. Once the session has written (flushed or run DML) it stays on the
+    primary, so the caller reads its own writes. A single SELECT executed with
+    ``bind_arguments=PRIMARY`` also goes to the primary.
+
+    The replica is picked on the first read and kept until the session
+    closes (or the replica is marked down), so one session holds a single
+    replica connection and reads one snapshot."""
+
+    def __init__(self, *args, replicas: ReplicaSet = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.wrote = False
+        self.replica = None
+
+    def _pick_replica(self):
+        if self.replica is None or not self.replicas.is_up(self.replica):
+            self.replica = self.replicas.pick()
+        return self.replica
+
+    def close(self):
+        super().close()
+        self.replica = None
+
+    def get_bind(self, mapper=None, clause=None, primary: bool = False, **kwargs):
+        if self.replicas and not self.wrote and not self._flushing:
+            if _is_plain_select(clause):
+                replica = None if primary else self._pick_replica()
+                if replica is not None:
+                    return replica
+            elif clause is not None:
+                self.wrote = True
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _stick_to_primary(session, flush_context):
+    session.wrote = True
+
+
+def _is_plain_select(clause) -> bool:
+    return (
+        clause is not None
+        and getattr(clause, "is_select", False)
+        and getattr(clause, "_for_update_arg", None) is None
+    )
+
+
+def pin_primary(session):
+    """Send the rest of `session` (sync or async) to the primary, e.g. before
+    the read half of a read-modify-write."""
+    session = getattr(session, "sync_session", session)
+    if isinstance(session, RoutingSession):
+        session.wrote = True
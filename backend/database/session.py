@@ -0,0 +1,57 @@
+import inspect
+
+from fastapi.concurrency import run_in_threadpool
+
+from database.mysql import DB_ASYNC, SessionLocal, engine, replicas
+
+if DB_ASYNC:
+    from database.mysql_async import get_async_db as get_db
+else:
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+async def run_db(call, *args):
+    """Await a service call in async mode; in sync mode run it in the
+    threadpool so blocking queries never stall the event loop."""
+    if not DB_ASYNC:
+        return await run_in_threadpool(call, *args)
+    result = call(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def warm_up(connections: int):
+    """Open `connections` primary connections and hand them back to the pool."""
+    if DB_ASYNC:
+        from database.mysql_async import async_engine
+
+        opened = [await async_engine.connect() for _ in range(connections)]
+        for conn in opened:
+            await conn.close()
+    else:
+        await run_in_threadpool(_warm_up_sync, connections)
+
+
+def _warm_up_sync(connections: int):
+    opened = [engine.connect() for _ in range(connections)]
+    for conn in opened:
+        conn.close()
+
+
+async def dispose():
+    """Close every pooled connection (primary and replicas) on shutdown."""
+    if DB_ASYNC:
+        from database.mysql_async import async_engine, async_replica_engines
+
+        for async_db_engine in [async_engine, *async_replica_engines]:
+            await async_db_engine.dispose()
+    else:
+        for db_engine in [engine, *replicas.engines]:
+            await run_in_threadpool(db_engine.dispose)
@@ -1,13 +1,46 @@
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from routes.user.user_route import router as user_router
 from routes.book.book_route import router as book_router
-from database.mysql import engine
+from routes.internal.internal_route import router as internal_router
+from database.mysql import DB_CREATE_TABLES, DB_POOL_WARMUP, engine
+from database.session import dispose, warm_up
 from models import create_all_tables
 from middleware.exception_handlers import register_exception_handlers
+from middleware.password_pool import password_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Importing this module does no I/O; each startup phase below is timed
+    # and reported by GET /internal/stats
+    timings = app.state.startup_timings = {}
+
+    # Phase 1: schema. Off by default, deployments run `python -m tools.schema create`
+    if DB_CREATE_TABLES:
+        started = time.perf_counter()
+        await run_in_threadpool(create_all_tables, engine)
+        timings["schema_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    # Phase 2: connection pool warm-up
+    if DB_POOL_WARMUP:
+        started = time.perf_counter()
+        await warm_up(DB_POOL_WARMUP)
+        timings["pool_warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    yield
+
+    # Shutdown: close pooled connections and the password worker processes
+    await dispose()
+    password_pool.shutdown()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,9 +52,8 @@ app.add_middleware(
 
 # Register exception handlers
 register_exception_handlers(app)
-# Auto create all tables in the database
-create_all_tables(engine)
 
 # Include the user router
 app.include_router(user_router)
 app.include_router(book_router)
+app.include_router(internal_router)
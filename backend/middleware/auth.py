@@ -1,8 +1,11 @@
+import hashlib
 import os
+import time
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
+from jose import JOSEError, jwt
 from passlib.context import CryptContext
 from dotenv import load_dotenv
+from utils.cache import token_cache
 
 load_dotenv()
 
@@ -33,16 +36,24 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 
 
 def decode_access_token(token: str):
+    # A request checks the same token several times (route, check_admin,
+    # repository); verify the HS256 signature once and reuse the claims
+    # until the token expires. Only valid tokens are cached.
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+    except JOSEError:
+        # Bad signature/claims, or a key that cannot verify at all
         return None
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        token_cache.set(key, payload, ttl=min(expires_in, token_cache.ttl))
+    return dict(payload)
 
 
 def check_admin(token: str) -> bool:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return bool(payload.get("isAdmin"))
-    except JWTError:
-        return False
+    payload = decode_access_token(token)
+    return bool(payload and payload.get("isAdmin"))
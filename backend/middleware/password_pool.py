@@ -0,0 +1,143 @@
+"""Bounded process pool for bcrypt password work.
+
+bcrypt costs 100-300 ms of CPU per call. Running it on request threads lets
+a login burst take every threadpool worker (and the GIL) away from
+unrelated requests. Password calls are sent to a few worker processes
+instead, and once ``max_pending`` calls are in flight new ones are rejected
+immediately with ``PasswordPoolBusy`` rather than queueing. A pool broken by
+a dead worker process is replaced on the next call.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+PASSWORD_POOL_WORKERS = int(
+    os.getenv("PASSWORD_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+# The sync repos block a threadpool thread (40 by default in anyio) on every
+# pending call; keep this well below that so a login burst gets 503s while
+# other requests still have threads
+PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", "16"))
+# Recent calls kept for the latency percentiles
+LATENCY_WINDOW = 1024
+
+
+class PasswordPoolBusy(Exception):
+    """Raised instead of queueing when the pool already has max_pending calls."""
+
+
+class PasswordPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = max(workers, 1)
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.calls = 0
+        self.rejected = 0
+        self.errors = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._latency_max = 0.0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that holds DB connections and
+                # running threads is not safe
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reset_executor(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _acquire(self):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolBusy(
+                    "Too many password checks in progress, please retry shortly"
+                )
+            self.pending += 1
+
+    def _release(self, started: float, failed: bool):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.pending -= 1
+            self.calls += 1
+            self.errors += failed
+            self._latencies.append(elapsed)
+            self._latency_max = max(self._latency_max, elapsed)
+
+    def submit(self, fn, *args):
+        """Schedule ``fn(*args)`` in a worker process; returns a
+        concurrent.futures.Future. Raises ``PasswordPoolBusy`` when full."""
+        self._acquire()
+        started = time.perf_counter()
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died (killed, crashed); replace the pool once
+                self._reset_executor(executor)
+                future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release(started, failed=True)
+            raise
+        future.add_done_callback(
+            lambda done: self._release(
+                started, done.cancelled() or done.exception() is not None
+            )
+        )
+        return future
+
+    def call(self, fn, *args):
+        """Blocking call, for sync repositories running in the threadpool."""
+        return self.submit(fn, *args).result()
+
+    async def run(self, fn, *args):
+        """Awaitable call, for async repositories."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "calls": self.calls,
+                "rejected": self.rejected,
+                "errors": self.errors,
+                "latency_ms_avg": (
+                    round(sum(latencies) / len(latencies) * 1000, 3)
+                    if latencies
+                    else 0.0
+                ),
+                "latency_ms_p95": (
+                    round(latencies[int(len(latencies) * 0.95)] * 1000, 3)
+                    if latencies
+                    else 0.0
+                ),
+                "latency_ms_max": round(self._latency_max * 1000, 3),
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordPool(PASSWORD_POOL_WORKERS, PASSWORD_POOL_MAX_PENDING)
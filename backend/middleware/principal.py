@@ -0,0 +1,52 @@
+"""Request-scoped authenticated principal.
+
+``get_principal`` verifies the bearer token once per request and loads the
+caller's ``User`` with its ``Profile`` in one joined primary-key query, on
+the primary: a replica may not have a just-registered account yet, and
+``update_user`` modifies this very row. The
+result is cached on ``request.state.principal`` and handed to services
+ready-made, so repositories neither decode the token nor look the caller up
+again. An invalid token or unknown user resolves to ``None``; repositories
+answer that with their usual 401 envelope.
+"""
+
+from fastapi import Depends, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from database.routing import PRIMARY
+from database.session import get_db, run_db
+from middleware.auth import decode_access_token
+from models.user.user_model import User
+
+bearer_scheme = HTTPBearer()
+PRINCIPAL_LOADERS = (joinedload(User.profile),)
+_MISSING = object()
+
+
+def load_user(db, user_id: str):
+    """User + Profile by primary key, read from the primary without pinning
+    the rest of the session; a coroutine on an AsyncSession."""
+    stmt = select(User).options(*PRINCIPAL_LOADERS).where(User.id == user_id)
+    return db.scalar(stmt, bind_arguments=PRIMARY)
+
+
+async def get_principal(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db=Depends(get_db),
+):
+    principal = getattr(request.state, "principal", _MISSING)
+    if principal is not _MISSING:
+        return principal
+    payload = decode_access_token(credentials.credentials)
+    principal = None
+    if payload and payload.get("id"):
+        principal = await run_db(load_user, db, payload["id"])
+    request.state.principal = principal
+    return principal
+
+
+def is_admin(principal) -> bool:
+    return bool(principal and principal.profile and principal.profile.isAdmin)
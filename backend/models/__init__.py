@@ -2,6 +2,7 @@ from database.mysql import Base
 from models.user.user_model import User
 from models.book.book_model import Book
 from models.profile.profile_model import Profile
+from models.image.image_asset_model import ImageAsset
 
 
 def create_all_tables(engine):
@@ -1,10 +1,35 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    event,
+    func,
+)
 from datetime import datetime
+from typing import NamedTuple, Optional
 from sqlalchemy.orm import relationship
 
 from database.mysql import Base
+from utils.encoding import format_datetime
 import uuid
 
+# Columns a client may request through `?fields=`
+BOOK_FIELDS = (
+    "id",
+    "title",
+    "author",
+    "caption",
+    "summary",
+    "cover_image",
+    "user_id",
+    "create_At",
+)
+
 
 class Book(Base):
     __tablename__ = "Books"
@@ -17,12 +42,57 @@ class Book(Base):
     caption = Column(String(255))
     summary = Column(String(255))
     cover_image = Column(String(255))
+    # Thumbnail rendition of cover_image, served by list endpoints
+    cover_thumb = Column(String(255))
     user_id = Column(
         String(255), ForeignKey("Users.id", onupdate="CASCADE"), nullable=False
     )
     create_At = Column(DateTime, default=datetime.utcnow)
     user = relationship("User", back_populates="books")
 
+    __table_args__ = (
+        # Backs the keyset pagination seek on (create_At, id)
+        Index("ix_books_create_at_id", "create_At", "id"),
+        # Per-uploader listing and its count; InnoDB appends the primary key,
+        # so this also covers the (create_At, id) ordering
+        Index("ix_books_user_id_create_at", "user_id", "create_At"),
+        # Full-text search; SQLite gets the books_fts table below instead
+        Index(
+            "ft_books_search",
+            "title",
+            "author",
+            "caption",
+            "summary",
+            mysql_prefix="FULLTEXT",
+        ).ddl_if(dialect="mysql"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "author": self.author,
+            "caption": self.caption,
+            "summary": self.summary,
+            "cover_image": self.cover_image,
+            "user_id": self.user_id,
+            "create_At": format_datetime(self.create_At),
+        }
+
+
+class BookRead(NamedTuple):
+    """Read model for list endpoints: a plain tuple built from a column
+    SELECT, so nothing is tracked by the Session. Field order is BOOK_FIELDS."""
+
+    id: str
+    title: str
+    author: str
+    caption: Optional[str]
+    summary: Optional[str]
+    cover_image: Optional[str]
+    user_id: str
+    create_At: datetime
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -32,5 +102,85 @@ class Book(Base):
             "summary": self.summary,
             "cover_image": self.cover_image,
             "user_id": self.user_id,
-            "create_At": self.create_At.strftime("%Y-%m-%d %H:%M:%S"),
+            "create_At": format_datetime(self.create_At),
         }
+
+
+def book_column(name: str, thumbnail: bool = True):
+    """The column selected for a BOOK_FIELDS name. With `thumbnail`,
+    ``cover_image`` is the cover thumbnail, or the full cover for books
+    without renditions (remote URL covers, older uploads)."""
+    if name == "cover_image" and thumbnail:
+        return func.coalesce(Book.cover_thumb, Book.cover_image).label(name)
+    return getattr(Book, name)
+
+
+def book_columns(thumbnail: bool = True):
+    """The Book columns behind BookRead, in BOOK_FIELDS order."""
+    return [book_column(name, thumbnail) for name in BOOK_FIELDS]
+
+
+def parse_book_fields(fields: str = None):
+    """Validate a `?fields=` value against BOOK_FIELDS; None means every field."""
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in BOOK_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return requested or None
+
+
+def book_row_to_dict(row, fields):
+    """Serialize a column-projected row the same way Book.to_dict() does."""
+    data = {}
+    for field in fields:
+        value = getattr(row, field)
+        if field == "create_At" and value is not None:
+            value = format_datetime(value)
+        data[field] = value
+    return data
+
+
+# SQLite fallback for search: an FTS5 table kept in sync by triggers
+BOOKS_FTS_TABLE = "books_fts"
+
+_sqlite_search_ddl = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {BOOKS_FTS_TABLE} USING fts5("
+    "book_id UNINDEXED, title, author, caption, summary)",
+    f"CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON Books BEGIN "
+    f"INSERT INTO {BOOKS_FTS_TABLE} (book_id, title, author, caption, summary) "
+    "VALUES (new.id, new.title, new.author, new.caption, new.summary); END",
+    f"CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON Books BEGIN "
+    f"DELETE FROM {BOOKS_FTS_TABLE} WHERE book_id = old.id; END",
+    f"CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE ON Books BEGIN "
+    f"DELETE FROM {BOOKS_FTS_TABLE} WHERE book_id = old.id; "
+    f"INSERT INTO {BOOKS_FTS_TABLE} (book_id, title, author, caption, summary) "
+    "VALUES (new.id, new.title, new.author, new.caption, new.summary); END",
+]
+
+# Indexes the rows of a Books table created before the search table
+_sqlite_search_backfill = (
+    f"INSERT INTO {BOOKS_FTS_TABLE} (book_id, title, author, caption, summary) "
+    "SELECT id, title, author, caption, summary FROM Books "
+    f"WHERE id NOT IN (SELECT book_id FROM {BOOKS_FTS_TABLE})"
+)
+
+
+def create_sqlite_search(conn):
+    """Create the search table and its triggers on an existing SQLite Books
+    table (after_create only fires for new ones) and index its rows."""
+    for statement in _sqlite_search_ddl:
+        conn.exec_driver_sql(statement)
+    conn.exec_driver_sql(_sqlite_search_backfill)
+
+
+for _statement in _sqlite_search_ddl:
+    event.listen(
+        Book.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Book.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {BOOKS_FTS_TABLE}").execute_if(dialect="sqlite"),
+)
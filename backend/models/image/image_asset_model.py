@@ -0,0 +1,23 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from datetime import datetime
+
+from database.mysql import Base
+
+
+class ImageAsset(Base):
+    """A stored (Cloudinary) image by the SHA-256 of its uploaded bytes.
+
+    ``url`` is the large rendition, ``medium_url``/``thumb_url`` the smaller
+    ones (None for assets uploaded without renditions). ``ref_count`` counts
+    the books and profiles pointing at the asset; its renditions are
+    destroyed when it drops to zero.
+    """
+
+    __tablename__ = "ImageAssets"
+
+    sha256 = Column(String(64), primary_key=True)
+    url = Column(String(255), nullable=False, unique=True, index=True)
+    medium_url = Column(String(255), index=True)
+    thumb_url = Column(String(255), index=True)
+    ref_count = Column(Integer, nullable=False, default=1)
+    create_At = Column(DateTime, default=datetime.utcnow)
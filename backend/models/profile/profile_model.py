@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, String, ForeignKey, DateTime, Boolean, Index
 from database.mysql import Base
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from utils.encoding import format_datetime
 
 
 class Profile(Base):
@@ -19,6 +20,11 @@ class Profile(Base):
     create_At = Column(DateTime, default=datetime.utcnow)
     user = relationship("User", back_populates="profile", uselist=False)
 
+    __table_args__ = (
+        # Backs the admin user listing's keyset seek on (create_At, profile_id)
+        Index("ix_profile_create_at_id", "create_At", "profile_id"),
+    )
+
     def to_dict(self):
         return {
             "username": self.user.username if self.user else None,
@@ -26,5 +32,5 @@ class Profile(Base):
             "isAdmin": self.isAdmin,
             "isAuthor": self.isAuthor,
             "profile_Image": self.profile_Image,
-            "create_At": self.create_At.strftime("%Y-%m-%d %H:%M:%S"),
+            "create_At": format_datetime(self.create_At),
         }
@@ -13,7 +13,10 @@ class User(Base):
     username = Column(String(255), unique=True, index=True, nullable=False)
     email = Column(String(255), unique=True, index=True, nullable=False)
     password = Column(String(255), nullable=False)
-    profile = relationship("Profile", back_populates="user", uselist=False)
+    # The profile's primary key is the user id; it goes with the user
+    profile = relationship(
+        "Profile", back_populates="user", uselist=False, cascade="all, delete-orphan"
+    )
     books = relationship("Book", back_populates="user")
 
     def to_dict(self):
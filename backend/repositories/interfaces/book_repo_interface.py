@@ -1,14 +1,23 @@
 from abc import ABC, abstractmethod
+from typing import List
 from schemas.book.book_schema import BookCreate, BookUpdate, BookResponse
 
 
 class BookRepoInterface:
     @abstractmethod
-    def get_books(self):
+    def get_books(self, fields: str = None):
         pass
 
     @abstractmethod
-    def get_books_with_pagination(self, page: int, limit: int):
+    def iter_books(self, batch_size: int, fields: str = None):
+        pass
+
+    @abstractmethod
+    def get_books_with_pagination(self, page: int, limit: int, fields: str = None):
+        pass
+
+    @abstractmethod
+    def get_books_with_cursor(self, cursor: str, limit: int, fields: str = None):
         pass
 
     @abstractmethod
@@ -16,11 +25,30 @@ class BookRepoInterface:
         pass
 
     @abstractmethod
-    def get_books_by_user_id(self, user_id: str):
+    def get_books_by_ids(self, ids: List[str]):
+        pass
+
+    @abstractmethod
+    def get_books_by_user_id(
+        self,
+        user_id: str,
+        fields: str = None,
+        cursor: str = None,
+        limit: int = None,
+        with_count: bool = False,
+    ):
+        pass
+
+    @abstractmethod
+    def search_books(self, q: str, page: int, limit: int):
+        pass
+
+    @abstractmethod
+    async def create_book(self, book: BookCreate, image: str, principal):
         pass
 
     @abstractmethod
-    async def create_book(self, book: BookCreate, image: str, credentials):
+    def bulk_create_books(self, items: List[dict], principal):
         pass
 
     @abstractmethod
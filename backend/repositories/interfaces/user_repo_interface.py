@@ -17,15 +17,31 @@ class UserRepoInterface(ABC):
         pass
 
     @abstractmethod
-    def get_all_users(self, credentials):
+    def get_all_users(
+        self, principal, cursor: str = None, limit: int = 20, books: int = 0
+    ):
         pass
 
     @abstractmethod
-    def get_profile(self, credentials):
+    def get_profile(
+        self,
+        principal,
+        include: str = None,
+        cursor: str = None,
+        limit: int = 20,
+        view: str = None,
+    ):
         pass
 
     @abstractmethod
-    def get_user_by_id(self, user_id: str):
+    def get_user_by_id(
+        self,
+        user_id: str,
+        include: str = None,
+        cursor: str = None,
+        limit: int = 20,
+        view: str = None,
+    ):
         pass
 
     @abstractmethod
@@ -33,7 +49,7 @@ class UserRepoInterface(ABC):
         pass
 
     @abstractmethod
-    def update_user(self, body: UserUpdate, credentials):
+    def update_user(self, body: UserUpdate, principal):
         pass
 
     @abstractmethod
@@ -0,0 +1,166 @@
+"""Statement builders and row shaping shared by the sync and async book repos.
+
+Nothing here touches a session: the repositories execute the statements and
+feed the rows back, so both stacks issue exactly the same SQL.
+"""
+
+import uuid
+from datetime import datetime
+
+from pydantic import ValidationError
+from sqlalchemy import column, func, literal_column, or_, select, table, text
+from sqlalchemy.dialects.mysql import match
+
+from models.book.book_model import (
+    Book,
+    BookRead,
+    BOOKS_FTS_TABLE,
+    book_column,
+    book_columns,
+    book_row_to_dict,
+    parse_book_fields,
+)
+from schemas.book.book_schema import BookBulkItem
+from utils.pagination import decode_cursor, encode_cursor, keyset_before
+from utils.search import fts5_query, highlight_snippet
+
+SEARCH_FIELDS = ("title", "author", "caption", "summary")
+
+
+def select_books(fields: str = None, required=()):
+    """``(stmt, serialize)`` for list endpoints. Only columns are selected, so
+    rows come back as tuples and no ORM instances enter the Session. Every
+    field maps to the BookRead read model; `fields` restricts the SELECT,
+    with `required` columns (e.g. for cursors) selected but not serialized."""
+    fields = parse_book_fields(fields)
+    if fields is None:
+        return select(*book_columns()), read_book
+    columns = dict.fromkeys([*fields, *required])
+    stmt = select(*(book_column(name) for name in columns))
+    return stmt, lambda row: book_row_to_dict(row, fields)
+
+
+def read_book(row):
+    return BookRead._make(row).to_dict()
+
+
+def newest_first(stmt):
+    return stmt.order_by(Book.create_At.desc(), Book.id.desc())
+
+
+def cursor_page(stmt, cursor: str, limit: int):
+    """Seek one (create_At, id) DESC page, fetching one extra row to know
+    whether another page exists."""
+    stmt = newest_first(stmt)
+    if cursor:
+        create_at, book_id = decode_cursor(cursor)
+        stmt = stmt.where(keyset_before(Book.create_At, Book.id, create_at, book_id))
+    return stmt.limit(limit + 1)
+
+
+def cursor_result(rows, limit: int, serialize):
+    """``(books, next_cursor)`` from the rows of a ``cursor_page`` statement."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1].create_At, rows[-1].id) if has_more else None
+    return [serialize(row) for row in rows], next_cursor
+
+
+def count_user_books(user_id: str):
+    # Answered from ix_books_user_id_create_at without touching rows
+    return select(func.count()).select_from(Book).where(Book.user_id == user_id)
+
+
+def normalize_ids(ids):
+    """Strip and de-duplicate IDs while keeping the caller's order."""
+    return list(dict.fromkeys(book_id.strip() for book_id in ids if book_id.strip()))
+
+
+def books_by_ids(ids):
+    # Rows are cached as book details, so they carry the full cover
+    return select(*book_columns(thumbnail=False)).where(Book.id.in_(ids))
+
+
+def search_books(dialect: str, q: str, terms):
+    """Relevance-ordered statement of BookRead columns plus ``score``."""
+    if dialect == "mysql":
+        score = match(Book.title, Book.author, Book.caption, Book.summary, against=q)
+        return (
+            select(*book_columns(), score.label("score"))
+            .where(score > 0)
+            .order_by(score.desc(), Book.id)
+        )
+    if dialect == "sqlite":
+        fts = table(BOOKS_FTS_TABLE, column("book_id"))
+        # FTS5 rank is bm25, lower is better; negate so higher means better
+        rank = literal_column(f"{BOOKS_FTS_TABLE}.rank")
+        return (
+            select(*book_columns(), (-rank).label("score"))
+            .join(fts, fts.c.book_id == Book.id)
+            .where(
+                text(f"{BOOKS_FTS_TABLE} MATCH :fts_query").bindparams(
+                    fts_query=fts5_query(terms)
+                )
+            )
+            .order_by(rank, Book.id)
+        )
+    # Other backends: unranked substring match
+    conditions = [
+        getattr(Book, field).ilike(f"%{term}%")
+        for field in SEARCH_FIELDS
+        for term in terms
+    ]
+    return (
+        select(*book_columns(), literal_column("NULL").label("score"))
+        .where(or_(*conditions))
+        .order_by(Book.create_At.desc(), Book.id)
+    )
+
+
+def search_hit(row, terms):
+    book = BookRead._make(row[:-1])
+    book_dict = book.to_dict()
+    book_dict["score"] = float(row.score) if row.score is not None else None
+    book_dict["highlights"] = {
+        field: snippet
+        for field in SEARCH_FIELDS
+        if (snippet := highlight_snippet(getattr(book, field), terms))
+    }
+    return book_dict
+
+
+def bulk_book_rows(items, user_id: str):
+    """Validate bulk items in one pass. Returns ``(results, rows, covers)``:
+    per-item results, insertable rows for the valid items and the
+    ``(book_id, url)`` covers to queue. Invalid items are reported only."""
+    results, rows, covers = [], [], []
+    now = datetime.utcnow()
+    for index, item in enumerate(items):
+        try:
+            book = BookBulkItem.model_validate(item)
+        except ValidationError as e:
+            results.append(
+                {
+                    "index": index,
+                    "status": "invalid",
+                    "errors": e.errors(include_url=False, include_input=False),
+                }
+            )
+            continue
+        book_id = str(uuid.uuid4())
+        rows.append(
+            {
+                "id": book_id,
+                "title": book.title,
+                "author": book.author,
+                "caption": book.caption,
+                "summary": book.summary,
+                "cover_image": None,
+                "user_id": user_id,
+                "create_At": now,
+            }
+        )
+        if book.cover_image_url:
+            covers.append((book_id, book.cover_image_url))
+        results.append({"index": index, "status": "created", "id": book_id})
+    return results, rows, covers
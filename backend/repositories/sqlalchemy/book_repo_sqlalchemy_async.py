@@ -0,0 +1,315 @@
+from repositories.interfaces.book_repo_interface import BookRepoInterface
+from repositories.sqlalchemy import book_queries
+from repositories.sqlalchemy.book_repo_sqlalchemy import (
+    BULK_INSERT_CHUNK,
+    MAX_BATCH_IDS,
+    MAX_BULK_ITEMS,
+    STREAM_BATCH_SIZE,
+    USER_BOOKS_LIMIT,
+)
+from models.book.book_model import Book
+from database.routing import pin_primary
+from utils.response import api_response
+from celery_temp.dispatch import queue_book_cover, queue_release_images
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.cache import book_cache
+from utils.pagination import clamp_limit
+from utils.search import extract_terms
+from utils.upload import UploadRejected, read_image_upload
+
+
+class BookRepoSqlAlchemyAsync(BookRepoInterface):
+    """AsyncSession twin of BookRepoSqlAlchemy: same statements, same envelopes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _all(self, stmt):
+        return (await self.db.execute(stmt)).all()
+
+    async def get_books(self, fields: str = None):
+        try:
+            stmt, serialize = book_queries.select_books(fields)
+            db_book = await self._all(stmt.order_by(Book.create_At.desc()))
+            if not db_book:
+                return api_response(message="Books Not Found!")
+            list_books = [serialize(book) for book in db_book]
+            return api_response(data=list_books)
+        except ValueError as e:
+            return api_response(status_code=400, error=str(e))
+        except Exception as e:
+            return api_response(error=str(e))
+
+    def iter_books(self, batch_size: int = STREAM_BATCH_SIZE, fields: str = None):
+        # Not a coroutine: fields are validated now, rows arrive as an
+        # async generator once the response starts
+        stmt, serialize = book_queries.select_books(fields)
+        stmt = book_queries.newest_first(stmt).execution_options(yield_per=batch_size)
+        return self._stream_books(stmt, serialize)
+
+    async def _stream_books(self, stmt, serialize):
+        try:
+            result = await self.db.stream(stmt)
+            async for book in result:
+                yield serialize(book)
+        finally:
+            await self.db.close()
+
+    async def get_books_with_pagination(
+        self, page: int = 1, limit: int = 3, fields: str = None
+    ):
+        try:
+            page = max(page, 1)
+            limit = clamp_limit(limit)
+            stmt, serialize = book_queries.select_books(fields)
+            stmt = (
+                stmt.order_by(Book.create_At.desc())
+                .offset((page - 1) * limit)
+                .limit(limit)
+            )
+            db_book = await self._all(stmt)
+            if not db_book:
+                return api_response(message="Books Not Found!")
+            list_books = [serialize(book) for book in db_book]
+            return api_response(data=list_books)
+        except ValueError as e:
+            return api_response(status_code=400, error=str(e))
+        except Exception as e:
+            return api_response(error=str(e))
+
+    async def get_books_with_cursor(
+        self, cursor: str = None, limit: int = 3, fields: str = None
+    ):
+        try:
+            limit = clamp_limit(limit)
+            stmt, serialize = book_queries.select_books(fields, ("create_At", "id"))
+            rows = await self._all(book_queries.cursor_page(stmt, cursor, limit))
+            list_books, next_cursor = book_queries.cursor_result(rows, limit, serialize)
+            return api_response(
+                data={"books": list_books, "next_cursor": next_cursor},
+                message=None if list_books else "Books Not Found!",
+            )
+        except ValueError as e:
+            return api_response(status_code=400, error=str(e))
+        except Exception as e:
+            return api_response(error=str(e))
+
+    async def get_book_with_ID(self, book_id: str):
+        try:
+            # Copies in and out of the cache: callers may mutate their response
+            book_dict = book_cache.get(book_id)
+            if book_dict is not None:
+                book_dict = dict(book_dict)
+            else:
+                db_book = await self.db.get(Book, book_id)
+                if not db_book:
+                    return api_response(status_code=404, message="Book not Found")
+                book_dict = db_book.to_dict()
+                if db_book.cover_image is not None:
+                    book_cache.set(book_id, dict(book_dict))
+            return api_response(data=book_dict, message="Success")
+        except Exception as e:
+            return api_response(error=str(e))
+
+    async def get_books_by_ids(self, ids):
+        try:
+            ids = book_queries.normalize_ids(ids)
+            if not ids:
+                return api_response(status_code=400, error="No book IDs given")
+            if len(ids) > MAX_BATCH_IDS:
+                return api_response(
+                    status_code=400,
+                    error=f"At most {MAX_BATCH_IDS} book IDs per request",
+                )
+
+            found = {}
+            for book_id in ids:
+                cached = book_cache.get(book_id)
+                if cached is not None:
+                    found[book_id] = dict(cached)
+            pending = [book_id for book_id in ids if book_id not in found]
+            if pending:
+                for book in await self._all(book_queries.books_by_ids(pending)):
+                    found[book.id] = book_queries.read_book(book)
+                    if book.cover_image is not None:
+                        book_cache.set(book.id, dict(found[book.id]))
+
+            list_books = [found[book_id] for book_id in ids if book_id in found]
+            missing = [book_id for book_id in ids if book_id not in found]
+            return api_response(
+                data={"books": list_books, "missing": missing}, message="Success"
+            )
+        except Exception as e:
+            return api_response(error=str(e))
+
+    async def get_books_by_user_id(
+        self,
+        user_id: str,
+        fields: str = None,
+        cursor: str = None,
+        limit: int = None,
+        with_count: bool = False,
+    ):
+        try:
+            stmt, serialize = book_queries.select_books(fields, ("create_At", "id"))
+            stmt = stmt.where(Book.user_id == user_id)
+            if cursor is None and limit is None and not with_count:
+                # No paging asked for: the whole list as `data`, as before
+                rows = await self._all(book_queries.newest_first(stmt))
+                list_books = [serialize(row) for row in rows]
+                if not list_books:
+                    return api_response(
+                        status_code=404, message="Books not found for this user"
+                    )
+                return api_response(data=list_books, message="Success")
+
+            limit = clamp_limit(limit or USER_BOOKS_LIMIT, default=USER_BOOKS_LIMIT)
+            stmt = book_queries.cursor_page(stmt, cursor, limit)
+            list_books, next_cursor = book_queries.cursor_result(
+                await self._all(stmt), limit, serialize
+            )
+            if not list_books and not cursor:
+                return api_response(
+                    status_code=404, message="Books not found for this user"
+                )
+            data = {"books": list_books, "next_cursor": next_cursor}
+            if with_count:
+                data["count"] = await self.db.scalar(
+                    book_queries.count_user_books(user_id)
+                )
+            return api_response(data=data, message="Success")
+        except ValueError as e:
+            return api_response(status_code=400, error=str(e))
+        except Exception as e:
+            return api_response(error=str(e))
+
+    async def search_books(self, q: str, page: int = 1, limit: int = 10):
+        try:
+            terms = extract_terms(q)
+            if not terms:
+                return api_response(status_code=400, error="Search query is required")
+            page = max(page, 1)
+            limit = clamp_limit(limit)
+
+            stmt = book_queries.search_books(self.db.bind.dialect.name, q, terms)
+            rows = await self.db.execute(stmt.offset((page - 1) * limit).limit(limit))
+            list_books = [book_queries.search_hit(row, terms) for row in rows]
+            return api_response(
+                data={"books": list_books, "page": page, "limit": limit},
+                message=None if list_books else "Books Not Found!",
+            )
+        except Exception as e:
+            return api_response(error=str(e))
+
+    async def create_book(self, book, image, principal):
+        try:
+            user_id = principal.id if principal else None
+            if not user_id:
+                return api_response(
+                    status_code=401,
+                    error="Invalid token",
+                    message="Please login to upload Books",
+                )
+
+            # Validate the image before anything is written
+            upload = await read_image_upload(image) if image else None
+            try:
+                new_book = Book(
+                    title=book.title,
+                    author=book.author,
+                    caption=book.caption,
+                    summary=book.summary,
+                    cover_image=None,
+                    user_id=user_id,
+                )
+                self.db.add(new_book)
+                await self.db.commit()
+                if upload:
+                    # Staging the blob and .delay() both block
+                    await run_in_threadpool(queue_book_cover, new_book.id, upload.file)
+            finally:
+                if upload:
+                    upload.file.close()
+
+            return api_response(message="Book created successfully")
+        except UploadRejected as e:
+            return api_response(status_code=400, error=e.error, message=e.message)
+        except Exception as e:
+            await self.db.rollback()
+            return api_response(error=str(e))
+
+    async def bulk_create_books(self, items, principal):
+        try:
+            user_id = principal.id if principal else None
+            if not user_id:
+                return api_response(
+                    status_code=401,
+                    error="Invalid token",
+                    message="Please login to upload Books",
+                )
+            if not items:
+                return api_response(status_code=400, error="No books given")
+            if len(items) > MAX_BULK_ITEMS:
+                return api_response(
+                    status_code=400,
+                    error=f"At most {MAX_BULK_ITEMS} books per request",
+                )
+
+            results, rows, covers = book_queries.bulk_book_rows(items, user_id)
+
+            for start in range(0, len(rows), BULK_INSERT_CHUNK):
+                await self.db.execute(
+                    insert(Book), rows[start : start + BULK_INSERT_CHUNK]
+                )
+            await self.db.commit()
+
+            for book_id, url in covers:
+                await run_in_threadpool(queue_book_cover, book_id, url)
+
+            return api_response(
+                data={
+                    "created": len(rows),
+                    "failed": len(items) - len(rows),
+                    "results": results,
+                },
+                message=f"Created {len(rows)} of {len(items)} books",
+            )
+        except Exception as e:
+            await self.db.rollback()
+            return api_response(error=str(e))
+
+    async def update_book(self, book_id: str, book_update):
+        try:
+            # Read-modify-write: load the row from the primary
+            pin_primary(self.db)
+            db_book = await self.db.get(Book, book_id)
+            if not db_book:
+                return api_response(status_code=404, message="Book not Found")
+            for key, value in book_update.dict(exclude_unset=True).items():
+                setattr(db_book, key, value)
+            await self.db.commit()
+            book_cache.invalidate(book_id)
+            return api_response(
+                data=db_book.to_dict(), message="Book updated successfully"
+            )
+        except Exception as e:
+            await self.db.rollback()
+            return api_response(error=str(e))
+
+    async def delete_book(self, book_id: str):
+        try:
+            pin_primary(self.db)
+            db_book = await self.db.get(Book, book_id)
+            if not db_book:
+                return api_response(status_code=404, message="Book not Found")
+            cover_image = db_book.cover_image
+            await self.db.delete(db_book)
+            await self.db.commit()
+            book_cache.invalidate(book_id)
+            await run_in_threadpool(queue_release_images, cover_image)
+            return api_response(message="Book deleted successfully")
+        except Exception as e:
+            await self.db.rollback()
+            return api_response(error=str(e))
@@ -0,0 +1,156 @@
+"""Statement builders and row shaping for the admin user listing and the
+profile endpoints, shared by the sync and async user repos (see
+book_queries).
+
+A page costs a constant number of queries whatever its size: one for the
+users joined to their profiles and, when books are embedded, one windowed
+query for at most `books` newest books of every user on the page. A profile
+is two queries: the user with its book count, then one page of its books.
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import contains_eager
+
+from models.book.book_model import BOOK_FIELDS, Book, book_columns
+from models.profile.profile_model import Profile
+from models.user.user_model import User
+from repositories.sqlalchemy.book_queries import (
+    count_user_books,
+    cursor_page,
+    cursor_result,
+    read_book,
+)
+from utils.pagination import (
+    MAX_PAGE_LIMIT,
+    clamp_limit,
+    decode_cursor,
+    encode_cursor,
+    keyset_before,
+)
+
+USERS_PAGE_LIMIT = 20
+MAX_USERS_PAGE_LIMIT = 100
+# Books embedded per user on the admin listing
+MAX_EMBEDDED_BOOKS = 10
+# Newest books shown on a profile summary unless `?include=books` pages the
+# full list
+PROFILE_BOOKS_PREVIEW = 5
+PROFILE_BOOKS_LIMIT = 20
+PROFILE_INCLUDES = ("books",)
+PROFILE_VIEWS = ("full", "summary")
+
+
+def users_page(cursor: str, limit: int):
+    """Seek one (Profile.create_At, id) DESC page of users with their profile
+    loaded from the same JOIN, fetching one extra row to know whether
+    another page exists."""
+    stmt = (
+        select(User)
+        .join(User.profile)
+        .options(contains_eager(User.profile))
+        .order_by(Profile.create_At.desc(), Profile.profile_id.desc())
+    )
+    if cursor:
+        create_at, user_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            keyset_before(Profile.create_At, Profile.profile_id, create_at, user_id)
+        )
+    return stmt.limit(limit + 1)
+
+
+def users_result(users, limit: int):
+    """``(users, next_cursor)`` from the rows of a ``users_page`` statement."""
+    has_more = len(users) > limit
+    users = users[:limit]
+    last = users[-1] if has_more else None
+    next_cursor = encode_cursor(last.profile.create_At, last.id) if last else None
+    return users, next_cursor
+
+
+def newest_books_per_user(user_ids, per_user: int):
+    """BookRead rows of the `per_user` newest books of each user, ranked with
+    ROW_NUMBER() so the cap is applied by the database."""
+    rank = (
+        func.row_number()
+        .over(
+            partition_by=Book.user_id,
+            order_by=(Book.create_At.desc(), Book.id.desc()),
+        )
+        .label("rank")
+    )
+    ranked = select(*book_columns(), rank).where(Book.user_id.in_(user_ids)).subquery()
+    return (
+        select(*(ranked.c[name] for name in BOOK_FIELDS))
+        .where(ranked.c.rank <= per_user)
+        .order_by(ranked.c.user_id, ranked.c.rank)
+    )
+
+
+def user_summaries(users, book_rows=None):
+    """Admin listing entries. ``books`` is only present when `book_rows`
+    (from ``newest_books_per_user``) is given; the ``User.books``
+    relationship is never loaded."""
+    books = None
+    if book_rows is not None:
+        books = defaultdict(list)
+        for row in book_rows:
+            books[row.user_id].append(read_book(row))
+    summaries = []
+    for user in users:
+        summary = {"id": user.id, "profile": user.profile.to_dict()}
+        if books is not None:
+            summary["books"] = books[user.id]
+        summaries.append(summary)
+    return summaries
+
+
+def user_with_book_count(*criteria):
+    """The user, its profile (same JOIN) and a correlated ``book_count``."""
+    book_count = count_user_books(User.id).scalar_subquery()
+    return (
+        select(User, book_count.label("book_count"))
+        .outerjoin(User.profile)
+        .options(contains_eager(User.profile))
+        .where(*criteria)
+    )
+
+
+def is_summary_view(view: str = None, include: str = None) -> bool:
+    """True when the caller opted in to the profile summary (``view=summary``,
+    or `include` to page its books); the default is the full profile with
+    every book. Raises ``ValueError`` on an unknown `view`."""
+    if view and view not in PROFILE_VIEWS:
+        raise ValueError(f"Unknown view: {view}")
+    return view == "summary" or bool(include)
+
+
+def profile_books_page(include: str = None, cursor: str = None, limit: int = None):
+    """``(cursor, limit)`` for the books embedded in a profile: the newest
+    ``PROFILE_BOOKS_PREVIEW`` by default, a cursor page with
+    ``include=books``. Raises ``ValueError`` on an unknown `include`."""
+    if include and include not in PROFILE_INCLUDES:
+        raise ValueError(f"Unknown include: {include}")
+    if include != "books":
+        return None, PROFILE_BOOKS_PREVIEW
+    return cursor, clamp_limit(limit, PROFILE_BOOKS_LIMIT, MAX_PAGE_LIMIT)
+
+
+def user_books(user_id: str, cursor: str, limit: int):
+    return cursor_page(
+        select(*book_columns()).where(Book.user_id == user_id), cursor, limit
+    )
+
+
+def profile_summary(user, book_count: int, book_rows, limit: int):
+    """Profile fields, ``book_count`` and one page of the user's books; the
+    ``User.books`` relationship is never loaded."""
+    books, next_cursor = cursor_result(book_rows, limit, read_book)
+    return {
+        "id": user.id,
+        "profile": user.profile.to_dict() if user.profile else None,
+        "book_count": book_count,
+        "books": books,
+        "next_cursor": next_cursor,
+    }
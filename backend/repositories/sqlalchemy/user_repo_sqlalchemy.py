@@ -1,16 +1,27 @@
 from repositories.interfaces.user_repo_interface import UserRepoInterface
 from fastapi import UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from models.user.user_model import User
 from models.profile.profile_model import Profile
+from database.routing import pin_primary
+from repositories.sqlalchemy import user_queries
+from repositories.sqlalchemy.book_queries import count_user_books
+from repositories.sqlalchemy.user_queries import (
+    MAX_EMBEDDED_BOOKS,
+    MAX_USERS_PAGE_LIMIT,
+    USERS_PAGE_LIMIT,
+)
+from utils.pagination import clamp_limit
 from utils.response import api_response
-from celery_temp.tasks import update_profile_image
+from utils.upload import UploadRejected, read_image_upload
+from celery_temp.dispatch import queue_profile_image, queue_release_images
+from middleware.password_pool import PasswordPoolBusy, password_pool
 from middleware.auth import (
     get_password_hash,
     verify_password,
     create_access_token,
-    decode_access_token,
-    check_admin,
 )
+from middleware.principal import is_admin
 
 
 class UserRepoSqlAlchemy(UserRepoInterface):
@@ -19,11 +30,14 @@ class UserRepoSqlAlchemy(UserRepoInterface):
 
     def login(self, user):
         try:
+            # A replica may not have a just-created account yet
+            pin_primary(self.db)
             db_user = self.db.query(User).filter(User.email == user.email).first()
 
             if not db_user:
                 return api_response(status_code=404, error="User not found")
-            if not verify_password(user.password, db_user.password):
+            # bcrypt is CPU-bound; it runs in the password process pool
+            if not password_pool.call(verify_password, user.password, db_user.password):
                 return api_response(status_code=401, error="Invalid password")
 
             token_access = create_access_token(
@@ -37,15 +51,19 @@ class UserRepoSqlAlchemy(UserRepoInterface):
             return api_response(
                 data={"access_token": token_access, "token_type": "bearer"}
             )
+        except PasswordPoolBusy as e:
+            return api_response(status_code=503, error=str(e))
         except Exception as e:
             return api_response(status_code=500, error=str(e))
 
     def create_user(self, user):
         try:
+            # The duplicate-email check must see the primary
+            pin_primary(self.db)
             if self.db.query(User).filter(User.email == user.email).first():
                 return api_response(status_code=400, error="User already exists")
 
-            hashed_password = get_password_hash(user.password)
+            hashed_password = password_pool.call(get_password_hash, user.password)
             new_user = User(
                 username=user.username,
                 email=user.email,
@@ -62,63 +80,106 @@ class UserRepoSqlAlchemy(UserRepoInterface):
             return api_response(
                 data=new_user.to_dict(), message="User created successfully"
             )
+        except PasswordPoolBusy as e:
+            return api_response(status_code=503, error=str(e))
         except Exception as e:
             self.db.rollback()
             return api_response(status_code=500, error=str(e))
 
-    def get_all_users(self, credentials):
+    def get_all_users(
+        self,
+        principal,
+        cursor: str = None,
+        limit: int = USERS_PAGE_LIMIT,
+        books: int = 0,
+    ):
         try:
-            is_admin = check_admin(credentials.credentials)
-            if not is_admin:
+            if not is_admin(principal):
                 return api_response(
                     status_code=401,
                     error="Invalid token",
                     message="Only ADMIN can access",
                 )
-            users = (
-                self.db.query(User)
-                .join(User.profile)
-                .order_by(Profile.create_At.desc())
-                .all()
-            )
+            limit = clamp_limit(limit, USERS_PAGE_LIMIT, MAX_USERS_PAGE_LIMIT)
+            users = self.db.scalars(user_queries.users_page(cursor, limit)).all()
+            users, next_cursor = user_queries.users_result(users, limit)
 
-            user_list = []
-            for user in users:
-                user_dict = user.to_dict()
-                user_list.append(user_dict)
-            return api_response(data=user_list)
+            book_rows = None
+            books = min(books or 0, MAX_EMBEDDED_BOOKS)
+            if books > 0 and users:
+                book_rows = self.db.execute(
+                    user_queries.newest_books_per_user(
+                        [user.id for user in users], books
+                    )
+                ).all()
+            return api_response(
+                data={
+                    "users": user_queries.user_summaries(users, book_rows),
+                    "next_cursor": next_cursor,
+                }
+            )
+        except ValueError as e:
+            return api_response(status_code=400, error=str(e))
         except Exception as e:
             return api_response(status_code=500, error=str(e))
         finally:
             self.db.close()
 
-    def get_profile(self, credentials):
+    def _profile_summary(self, user, book_count, cursor, limit):
+        book_rows = self.db.execute(
+            user_queries.user_books(user.id, cursor, limit)
+        ).all()
+        return user_queries.profile_summary(user, book_count, book_rows, limit)
+
+    def get_profile(
+        self,
+        principal,
+        include: str = None,
+        cursor: str = None,
+        limit: int = 20,
+        view: str = None,
+    ):
         try:
-            token = credentials.credentials
-            payload = decode_access_token(token)
-            if not payload or "sub" not in payload:
+            if principal is None:
                 return api_response(
                     status_code=401, error="Invalid token", message="Invalid token"
                 )
-            email = payload["sub"]
-            user = self.db.query(User).filter(User.email == email).first()
-            if not user:
-                return api_response(status_code=404, error="User not found")
-            user_dict = user.to_dict()
-            # user_dict.pop("books", None)
+            if not user_queries.is_summary_view(view, include):
+                return api_response(data=principal.to_dict(), message="Success")
+            cursor, limit = user_queries.profile_books_page(include, cursor, limit)
+            book_count = self.db.scalar(count_user_books(principal.id))
+            user_dict = self._profile_summary(principal, book_count, cursor, limit)
             return api_response(data=user_dict, message="Success")
-
+        except ValueError as e:
+            return api_response(status_code=400, error=str(e))
         except Exception as e:
             return api_response(status_code=500, error=str(e))
 
-    def get_user_by_id(self, user_id: str):
+    def get_user_by_id(
+        self,
+        user_id: str,
+        include: str = None,
+        cursor: str = None,
+        limit: int = 20,
+        view: str = None,
+    ):
         try:
-            user = self.db.query(User).filter(User.id == user_id).first()
-            if not user:
+            if not user_queries.is_summary_view(view, include):
+                user = self.db.query(User).filter(User.id == user_id).first()
+                if not user:
+                    return api_response(status_code=404, error="User not found")
+                return api_response(data=user.to_dict(), message="Success")
+            cursor, limit = user_queries.profile_books_page(include, cursor, limit)
+            row = self.db.execute(
+                user_queries.user_with_book_count(User.id == user_id)
+            ).first()
+            if not row:
                 return api_response(status_code=404, error="User not found")
-            user_dict = user.to_dict()
+            user_dict = self._profile_summary(*row, cursor, limit)
 
             return api_response(data=user_dict, message="Success")
+        except ValueError as e:
+            return api_response(status_code=400, error=str(e))
         except Exception as e:
             return api_response(status_code=500, error=str(e))
 
@@ -129,31 +190,31 @@ class UserRepoSqlAlchemy(UserRepoInterface):
             if not file:
                 return api_response(status_code=400, error="File is required")
 
-            file_bytes = await file.read()
-            if not file_bytes:
-                return api_response(status_code=400, error="Empty file uploaded")
-
-            update_profile_image.delay(user_id, file_bytes)
+            upload = await read_image_upload(file)
+            try:
+                # Staging the blob and .delay() both block
+                await run_in_threadpool(queue_profile_image, user_id, upload.file)
+            finally:
+                upload.file.close()
             return api_response(message=f"Image updated successfully")
+        except UploadRejected as e:
+            return api_response(status_code=400, error=e.error, message=e.message)
         except Exception as e:
             self.db.rollback()
             return api_response(status_code=500, error=str(e))
         finally:
             self.db.close()
 
-    def update_user(self, body, credentials):
+    def update_user(self, body, principal):
         try:
-            token = credentials.credentials
-            payload = decode_access_token(token)
-            if not payload or "id" not in payload:
+            if principal is None:
                 return api_response(
                     status_code=401, error="Invalid token", message="Invalid token"
                 )
-            user_id = payload["id"]
-            user = self.db.query(User).filter(User.id == user_id).first()
-
-            if not user:
-                return api_response(status_code=404, error="User not found")
+            # get_principal read the principal from the primary; the
+            # uniqueness check and the UPDATE go there too
+            pin_primary(self.db)
+            user = principal
             if body.email is not None:
                 # Check if new email already exists for another user
                 existing_email = (
@@ -168,7 +229,13 @@ class UserRepoSqlAlchemy(UserRepoInterface):
                         message="Email already exists, please use another email",
                     )
 
-            for key, value in body.dict(exclude_unset=True).items():
+            updates = body.dict(exclude_unset=True)
+            if updates.get("password"):
+                # Store the bcrypt hash, never the plain password
+                updates["password"] = password_pool.call(
+                    get_password_hash, updates["password"]
+                )
+            for key, value in updates.items():
                 if key == "profile":
                     continue
                 if hasattr(user, key) and value is not None:
@@ -185,6 +252,8 @@ class UserRepoSqlAlchemy(UserRepoInterface):
             return api_response(
                 message="User updated successfully", data=user.to_dict()
             )
+        except PasswordPoolBusy as e:
+            return api_response(status_code=503, error=str(e))
         except Exception as e:
             self.db.rollback()
             return api_response(status_code=500, error=str(e))
@@ -193,11 +262,14 @@ class UserRepoSqlAlchemy(UserRepoInterface):
 
     def delete_user(self, user_id: str):
         try:
+            pin_primary(self.db)
             user = self.db.query(User).filter(User.id == user_id).first()
             if not user:
                 return api_response(status_code=404, error="User not found")
+            profile_image = user.profile.profile_Image if user.profile else None
             self.db.delete(user)
             self.db.commit()
+            queue_release_images(profile_image)
             return api_response(message="User deleted successfully")
         except Exception as e:
             self.db.rollback()
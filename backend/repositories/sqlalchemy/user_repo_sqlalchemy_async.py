@@ -0,0 +1,283 @@
+from repositories.interfaces.user_repo_interface import UserRepoInterface
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from models.user.user_model import User
+from models.profile.profile_model import Profile
+from database.routing import pin_primary
+from repositories.sqlalchemy import user_queries
+from repositories.sqlalchemy.book_queries import count_user_books
+from repositories.sqlalchemy.user_queries import (
+    MAX_EMBEDDED_BOOKS,
+    MAX_USERS_PAGE_LIMIT,
+    USERS_PAGE_LIMIT,
+)
+from utils.pagination import clamp_limit
+from utils.response import api_response
+from utils.upload import UploadRejected, read_image_upload
+from celery_temp.dispatch import queue_profile_image, queue_release_images
+from middleware.password_pool import PasswordPoolBusy, password_pool
+from middleware.auth import (
+    get_password_hash,
+    verify_password,
+    create_access_token,
+)
+from middleware.principal import is_admin
+
+# User.to_dict() walks profile and books; lazy loads cannot run under asyncio
+USER_LOADERS = (selectinload(User.profile), selectinload(User.books))
+
+
+class UserRepoSqlAlchemyAsync(UserRepoInterface):
+    """AsyncSession twin of UserRepoSqlAlchemy: same envelopes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _first_user(self, *criteria):
+        result = await self.db.execute(
+            select(User).options(*USER_LOADERS).where(*criteria)
+        )
+        return result.scalars().first()
+
+    async def login(self, user):
+        try:
+            # A replica may not have a just-created account yet
+            pin_primary(self.db)
+            db_user = await self._first_user(User.email == user.email)
+
+            if not db_user:
+                return api_response(status_code=404, error="User not found")
+            # bcrypt is CPU-bound; it runs in the password process pool
+            if not await password_pool.run(
+                verify_password, user.password, db_user.password
+            ):
+                return api_response(status_code=401, error="Invalid password")
+
+            token_access = create_access_token(
+                data={
+                    "sub": db_user.email,
+                    "id": db_user.id,
+                    "isAdmin": db_user.profile.isAdmin if db_user.profile else False,
+                }
+            )
+
+            return api_response(
+                data={"access_token": token_access, "token_type": "bearer"}
+            )
+        except PasswordPoolBusy as e:
+            return api_response(status_code=503, error=str(e))
+        except Exception as e:
+            return api_response(status_code=500, error=str(e))
+
+    async def create_user(self, user):
+        try:
+            # The duplicate-email check must see the primary
+            pin_primary(self.db)
+            if await self.db.scalar(select(User.id).where(User.email == user.email)):
+                return api_response(status_code=400, error="User already exists")
+
+            hashed_password = await password_pool.run(get_password_hash, user.password)
+            new_user = User(
+                username=user.username,
+                email=user.email,
+                password=hashed_password,
+                books=[],
+                profile=Profile(),
+            )
+            self.db.add(new_user)
+            await self.db.commit()
+
+            return api_response(
+                data=new_user.to_dict(), message="User created successfully"
+            )
+        except PasswordPoolBusy as e:
+            return api_response(status_code=503, error=str(e))
+        except Exception as e:
+            await self.db.rollback()
+            return api_response(status_code=500, error=str(e))
+
+    async def get_all_users(
+        self,
+        principal,
+        cursor: str = None,
+        limit: int = USERS_PAGE_LIMIT,
+        books: int = 0,
+    ):
+        try:
+            if not is_admin(principal):
+                return api_response(
+                    status_code=401,
+                    error="Invalid token",
+                    message="Only ADMIN can access",
+                )
+            limit = clamp_limit(limit, USERS_PAGE_LIMIT, MAX_USERS_PAGE_LIMIT)
+            result = await self.db.scalars(user_queries.users_page(cursor, limit))
+            users, next_cursor = user_queries.users_result(result.all(), limit)
+
+            book_rows = None
+            books = min(books or 0, MAX_EMBEDDED_BOOKS)
+            if books > 0 and users:
+                result = await self.db.execute(
+                    user_queries.newest_books_per_user(
+                        [user.id for user in users], books
+                    )
+                )
+                book_rows = result.all()
+            return api_response(
+                data={
+                    "users": user_queries.user_summaries(users, book_rows),
+                    "next_cursor": next_cursor,
+                }
+            )
+        except ValueError as e:
+            return api_response(status_code=400, error=str(e))
+        except Exception as e:
+            return api_response(status_code=500, error=str(e))
+
+    async def _profile_summary(self, user, book_count, cursor, limit):
+        result = await self.db.execute(user_queries.user_books(user.id, cursor, limit))
+        return user_queries.profile_summary(user, book_count, result.all(), limit)
+
+    async def get_profile(
+        self,
+        principal,
+        include: str = None,
+        cursor: str = None,
+        limit: int = 20,
+        view: str = None,
+    ):
+        try:
+            if principal is None:
+                return api_response(
+                    status_code=401, error="Invalid token", message="Invalid token"
+                )
+            if not user_queries.is_summary_view(view, include):
+                # No lazy loading on an AsyncSession
+                await self.db.refresh(principal, ["books"])
+                return api_response(data=principal.to_dict(), message="Success")
+            cursor, limit = user_queries.profile_books_page(include, cursor, limit)
+            book_count = await self.db.scalar(count_user_books(principal.id))
+            user_dict = await self._profile_summary(
+                principal, book_count, cursor, limit
+            )
+            return api_response(data=user_dict, message="Success")
+        except ValueError as e:
+            return api_response(status_code=400, error=str(e))
+        except Exception as e:
+            return api_response(status_code=500, error=str(e))
+
+    async def get_user_by_id(
+        self,
+        user_id: str,
+        include: str = None,
+        cursor: str = None,
+        limit: int = 20,
+        view: str = None,
+    ):
+        try:
+            if not user_queries.is_summary_view(view, include):
+                user = await self._first_user(User.id == user_id)
+                if not user:
+                    return api_response(status_code=404, error="User not found")
+                return api_response(data=user.to_dict(), message="Success")
+            cursor, limit = user_queries.profile_books_page(include, cursor, limit)
+            result = await self.db.execute(
+                user_queries.user_with_book_count(User.id == user_id)
+            )
+            row = result.first()
+            if not row:
+                return api_response(status_code=404, error="User not found")
+            user_dict = await self._profile_summary(*row, cursor, limit)
+            return api_response(data=user_dict, message="Success")
+        except ValueError as e:
+            return api_response(status_code=400, error=str(e))
+        except Exception as e:
+            return api_response(status_code=500, error=str(e))
+
+    async def update_user_image(self, user_id: str, file: UploadFile):
+        try:
+            if not user_id:
+                return api_response(status_code=400, error="User ID is required")
+            if not file:
+                return api_response(status_code=400, error="File is required")
+
+            upload = await read_image_upload(file)
+            try:
+                await run_in_threadpool(queue_profile_image, user_id, upload.file)
+            finally:
+                upload.file.close()
+            return api_response(message=f"Image updated successfully")
+        except UploadRejected as e:
+            return api_response(status_code=400, error=e.error, message=e.message)
+        except Exception as e:
+            return api_response(status_code=500, error=str(e))
+
+    async def update_user(self, body, principal):
+        try:
+            if principal is None:
+                return api_response(
+                    status_code=401, error="Invalid token", message="Invalid token"
+                )
+            # get_principal read the principal from the primary; the
+            # uniqueness check and the UPDATE go there too
+            pin_primary(self.db)
+            user = principal
+            if body.email is not None:
+                # Check if new email already exists for another user
+                existing_email = await self.db.scalar(
+                    select(User.id).where(User.email == body.email, User.id != user.id)
+                )
+                if existing_email:
+                    return api_response(
+                        status_code=400,
+                        error="Email already exists",
+                        message="Email already exists, please use another email",
+                    )
+
+            updates = body.dict(exclude_unset=True)
+            if updates.get("password"):
+                # Store the bcrypt hash, never the plain password
+                updates["password"] = await password_pool.run(
+                    get_password_hash, updates["password"]
+                )
+            for key, value in updates.items():
+                if key == "profile":
+                    continue
+                if hasattr(user, key) and value is not None:
+                    setattr(user, key, value)
+
+            if body.profile is not None:
+                for key, value in body.profile.dict(exclude_unset=True).items():
+                    if hasattr(user.profile, key) and value is not None:
+                        setattr(user.profile, key, value)
+
+            await self.db.commit()
+            # The principal is loaded without books; to_dict() embeds them
+            await self.db.refresh(user, ["books"])
+
+            return api_response(
+                message="User updated successfully", data=user.to_dict()
+            )
+        except PasswordPoolBusy as e:
+            return api_response(status_code=503, error=str(e))
+        except Exception as e:
+            await self.db.rollback()
+            return api_response(status_code=500, error=str(e))
+
+    async def delete_user(self, user_id: str):
+        try:
+            pin_primary(self.db)
+            user = await self.db.get(User, user_id, options=USER_LOADERS)
+            if not user:
+                return api_response(status_code=404, error="User not found")
+            profile_image = user.profile.profile_Image if user.profile else None
+            await self.db.delete(user)
+            await self.db.commit()
+            await run_in_threadpool(queue_release_images, profile_image)
+            return api_response(message="User deleted successfully")
+        except Exception as e:
+            await self.db.rollback()
+            return api_response(status_code=500, error=str(e))
@@ -7,62 +7,159 @@ from fastapi import (
     File,
     UploadFile,
     Form,
+    Request,
 )
+from typing import Optional
+import json
 
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from database.mysql import SessionLocal
-from schemas.book.book_schema import BookCreate, BookUpdate, BookResponse
+from database.mysql import DB_ASYNC
+from database.session import get_db, run_db
+from middleware.principal import get_principal
+from models.user.user_model import User
+from schemas.book.book_schema import (
+    BookBatchRequest,
+    BookCreate,
+    BookUpdate,
+    BookResponse,
+)
 from services.book.book_service import BookService
 from repositories.sqlalchemy.book_repo_sqlalchemy import BookRepoSqlAlchemy
+from repositories.sqlalchemy.book_repo_sqlalchemy_async import BookRepoSqlAlchemyAsync
+from utils.etag import etag_response
+from utils.response import (
+    FastJSONResponse,
+    FastJSONRoute,
+    api_response,
+    astream_api_response,
+    astream_ndjson,
+    stream_api_response,
+    stream_ndjson,
+)
 
-
-router = APIRouter(prefix="/products", tags=["Books API"])
-bearer_scheme = HTTPBearer()
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# DB_ASYNC picks the repository stack; both return the same envelopes
+BookRepo = BookRepoSqlAlchemyAsync if DB_ASYNC else BookRepoSqlAlchemy
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Book lists are the big payloads, so this router skips jsonable_encoder
+router = APIRouter(prefix="/products", tags=["Books API"], route_class=FastJSONRoute)
 
 
 # GET ALL BOOK
 @router.get("/")
-def get_books(db: Session = Depends(get_db)):
-    repo = BookRepoSqlAlchemy(db)
+async def get_books(
+    request: Request,
+    stream: bool = False,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    repo = BookRepo(db)
     book_service = BookService(repo)
-    return book_service.get_books()
+    # Streaming keeps memory flat for large catalogues
+    wants_ndjson = NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    if wants_ndjson or stream:
+        try:
+            rows = book_service.iter_books(fields=fields)
+        except ValueError as e:
+            return api_response(status_code=400, error=str(e))
+        # The async stack hands back an async generator
+        is_async = hasattr(rows, "__aiter__")
+        if wants_ndjson:
+            encode = astream_ndjson if is_async else stream_ndjson
+            return StreamingResponse(encode(rows), media_type=NDJSON_MEDIA_TYPE)
+        encode = astream_api_response if is_async else stream_api_response
+        # Same envelope as the non-streamed path when nothing matches
+        return StreamingResponse(
+            encode(rows, empty_message="Books Not Found!"),
+            media_type="application/json",
+        )
+    return etag_response(
+        request,
+        await run_db(book_service.get_books, fields),
+        response_class=FastJSONResponse,
+    )
 
 
 # GET BOOK WITH PANIGATION
 @router.get("/pagination")
-def get_books_with_pagination(
+async def get_books_with_pagination(
     page: int = 1,
     limit: int = 3,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    repo = BookRepoSqlAlchemy(db)
+    repo = BookRepo(db)
     book_service = BookService(repo)
-    return book_service.get_books_with_pagination(page, limit)
+    # Any `cursor` (empty for the first page) switches to keyset pagination,
+    # `page` stays for older mobile builds
+    if cursor is not None:
+        return await run_db(book_service.get_books_with_cursor, cursor, limit, fields)
+    return await run_db(book_service.get_books_with_pagination, page, limit, fields)
 
 
 # GET BOOK WITH ID
 @router.get("/book/{book_id}")
-def get_book_with_ID(book_id: str, db: Session = Depends(get_db)):
-    repo = BookRepoSqlAlchemy(db)
+async def get_book_with_ID(
+    book_id: str, request: Request, db: Session = Depends(get_db)
+):
+    repo = BookRepo(db)
     book_service = BookService(repo)
-    return book_service.get_book_with_ID(book_id)
+    return etag_response(
+        request,
+        await run_db(book_service.get_book_with_ID, book_id),
+        response_class=FastJSONResponse,
+    )
+
+
+# GET BOOKS BY IDS
+@router.get("/batch")
+async def get_books_by_ids(ids: str, db: Session = Depends(get_db)):
+    repo = BookRepo(db)
+    book_service = BookService(repo)
+    return await run_db(book_service.get_books_by_ids, ids.split(","))
+
+
+# GET BOOKS BY IDS (long lists)
+@router.post("/batch")
+async def post_books_by_ids(body: BookBatchRequest, db: Session = Depends(get_db)):
+    repo = BookRepo(db)
+    book_service = BookService(repo)
+    return await run_db(book_service.get_books_by_ids, body.ids)
 
 
 # GET BOOK WITH USER_ID
 @router.get("/user/{user_id}")
-def get_books_by_user_id(user_id: str, db: Session = Depends(get_db)):
-    repo = BookRepoSqlAlchemy(db)
+async def get_books_by_user_id(
+    user_id: str,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    count: bool = False,
+    db: Session = Depends(get_db),
+):
+    repo = BookRepo(db)
     book_service = BookService(repo)
-    return book_service.get_books_by_user_id(user_id)
+    # Without cursor/limit/count `data` is the full list; any of them opts in
+    # to the {books, next_cursor} keyset envelope (20 per page by default)
+    return await run_db(
+        book_service.get_books_by_user_id, user_id, fields, cursor, limit, count
+    )
+
+
+# SEARCH BOOKS
+@router.get("/search")
+async def search_books(
+    q: str = "",
+    page: int = 1,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+):
+    repo = BookRepo(db)
+    book_service = BookService(repo)
+    return await run_db(book_service.search_books, q, page, limit)
 
 
 # Create Product
@@ -70,10 +167,42 @@ def get_books_by_user_id(user_id: str, db: Session = Depends(get_db)):
 async def create_book(
     book: BookCreate = Depends(BookCreate.as_form),
     image: UploadFile = File(None),
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    principal: Optional[User] = Depends(get_principal),
+    db: Session = Depends(get_db),
+):
+
+    repo = BookRepo(db)
+    book_service = BookService(repo)
+    return await book_service.create_book(book, image, principal)
+
+
+def _parse_bulk_body(body: bytes, content_type: str):
+    """A JSON array, or one JSON object per line for NDJSON bodies."""
+    try:
+        if NDJSON_MEDIA_TYPE in content_type:
+            return [json.loads(line) for line in body.splitlines() if line.strip()]
+        items = json.loads(body)
+    except ValueError as e:
+        raise ValueError(f"Malformed request body: {e}") from e
+    if not isinstance(items, list):
+        raise ValueError("Request body must be a JSON array of books")
+    return items
+
+
+# Bulk create Products
+@router.post("/bulk")
+async def bulk_create_books(
+    request: Request,
+    principal: Optional[User] = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
+    try:
+        items = _parse_bulk_body(
+            await request.body(), request.headers.get("content-type", "")
+        )
+    except ValueError as e:
+        return api_response(status_code=400, error=str(e))
 
-    repo = BookRepoSqlAlchemy(db)
+    repo = BookRepo(db)
     book_service = BookService(repo)
-    return await book_service.create_book(book, image, credentials)
+    return await run_db(book_service.bulk_create_books, items, principal)
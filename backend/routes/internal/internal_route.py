@@ -0,0 +1,42 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request
+
+from database.pool import pool_stats
+from database.routing import replica_health
+from middleware.password_pool import password_pool
+from middleware.principal import get_principal, is_admin
+from models.user.user_model import User
+from utils.blob_store import blob_store
+from utils.cache import book_cache, token_cache
+from utils.response import api_response
+
+router = APIRouter(prefix="/internal", tags=["Internal API"])
+
+
+# RUNTIME STATS (connection pools, replicas, caches, startup)
+@router.get("/stats")
+def get_stats(
+    request: Request,
+    principal: Optional[User] = Depends(get_principal),
+):
+    # The database profile decides, not the token's isAdmin claim
+    if not is_admin(principal):
+        return api_response(
+            status_code=401,
+            error="Invalid token",
+            message="Only ADMIN can access",
+        )
+    return api_response(
+        data={
+            "pools": pool_stats(),
+            "replicas": replica_health(),
+            "caches": {
+                "books": book_cache.stats(),
+                "tokens": token_cache.stats(),
+            },
+            "password_pool": password_pool.stats(),
+            "blob_staging": blob_store.stats(),
+            "startup": getattr(request.app.state, "startup_timings", {}),
+        }
+    )
@@ -3,10 +3,14 @@ from fastapi import (
     Depends,
     File,
     UploadFile,
+    Request,
 )
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import Optional
 from sqlalchemy.orm import Session
-from database.mysql import SessionLocal
+from database.mysql import DB_ASYNC
+from database.session import get_db, run_db
+from middleware.principal import get_principal
+from models.user.user_model import User
 from schemas.user.user_schema import (
     UserCreate,
     UserResponse,
@@ -15,64 +19,86 @@ from schemas.user.user_schema import (
 )
 from services.user.user_service import UserService
 from repositories.sqlalchemy.user_repo_sqlalchemy import UserRepoSqlAlchemy
-
+from repositories.sqlalchemy.user_repo_sqlalchemy_async import UserRepoSqlAlchemyAsync
+from utils.etag import etag_response
 
 router = APIRouter(prefix="/users", tags=["Users API"])
-bearer_scheme = HTTPBearer()
-
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# DB_ASYNC picks the repository stack; both return the same envelopes
+UserRepo = UserRepoSqlAlchemyAsync if DB_ASYNC else UserRepoSqlAlchemy
 
 
 # SIGN IN
 @router.post("/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    repo = UserRepoSqlAlchemy(db)
+async def login(user: UserLogin, db: Session = Depends(get_db)):
+    repo = UserRepo(db)
     user_service = UserService(repo)
-    return user_service.login(user)
+    return await run_db(user_service.login, user)
 
 
 # SIGN UP
 @router.post("/create")
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    repo = UserRepoSqlAlchemy(db)
+async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+    repo = UserRepo(db)
     user_service = UserService(repo)
-    return user_service.create_user(user)
+    return await run_db(user_service.create_user, user)
 
 
 # GET ALL USERS
 @router.get("/")
-def get_all_users(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+async def get_all_users(
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    books: int = 0,
+    principal: Optional[User] = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    repo = UserRepoSqlAlchemy(db)
+    repo = UserRepo(db)
     user_service = UserService(repo)
-    return user_service.get_all_users(credentials)
+    # Keyset-paginated; `books` embeds up to that many newest books per user
+    return await run_db(user_service.get_all_users, principal, cursor, limit, books)
 
 
 # PROFILE
 @router.get("/profile")
-def get_profile(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+async def get_profile(
+    request: Request,
+    include: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    view: Optional[str] = None,
+    principal: Optional[User] = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    repo = UserRepoSqlAlchemy(db)
+    repo = UserRepo(db)
     user_service = UserService(repo)
-    return user_service.get_profile(credentials)
+    # The full profile with every book by default; `view=summary` returns
+    # book_count + the newest books, and `include=books` pages the full list
+    return etag_response(
+        request,
+        await run_db(user_service.get_profile, principal, include, cursor, limit, view),
+        private=True,
+    )
 
 
 # GET USER BY ID
 @router.get("/{user_id}")
-def get_user_by_id(user_id: str, db: Session = Depends(get_db)):
-    repo = UserRepoSqlAlchemy(db)
+async def get_user_by_id(
+    user_id: str,
+    request: Request,
+    include: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    view: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    repo = UserRepo(db)
     user_service = UserService(repo)
-    return user_service.get_user_by_id(user_id)
+    return etag_response(
+        request,
+        await run_db(
+            user_service.get_user_by_id, user_id, include, cursor, limit, view
+        ),
+    )
 
 
 # UPDATE USER IMAGE
@@ -82,7 +108,7 @@ async def update_user_image(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
 ):
-    repo = UserRepoSqlAlchemy(db)
+    repo = UserRepo(db)
     user_service = UserService(repo)
     return await user_service.update_user_image(user_id, file)
 
@@ -91,17 +117,17 @@ async def update_user_image(
 @router.put("/profile")
 async def update_user(
     body: UserUpdate,
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    principal: Optional[User] = Depends(get_principal),
     db: Session = Depends(get_db),
 ):
-    repo = UserRepoSqlAlchemy(db)
+    repo = UserRepo(db)
     user_service = UserService(repo)
-    return user_service.update_user(body, credentials)
+    return await run_db(user_service.update_user, body, principal)
 
 
 # DELETE USER
 @router.delete("/{user_id}")
-def delete_user(user_id: str, db: Session = Depends(get_db)):
-    repo = UserRepoSqlAlchemy(db)
+async def delete_user(user_id: str, db: Session = Depends(get_db)):
+    repo = UserRepo(db)
     user_service = UserService(repo)
-    return user_service.delete_user(user_id)
+    return await run_db(user_service.delete_user, user_id)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator, validator
 from pydantic.config import ConfigDict
 from datetime import datetime
 from typing import Optional, List, Dict, Any
@@ -37,6 +37,22 @@ class BookUpdate(BookBase):
     pass
 
 
+class BookBulkItem(BookBase):
+    # Covers are referenced, never sent inline in a bulk payload
+    cover_image_url: Optional[str] = None
+
+    @field_validator("cover_image_url")
+    @classmethod
+    def check_cover_image_url(cls, value):
+        if value is not None and not value.startswith(("http://", "https://")):
+            raise ValueError("cover_image_url must be an http(s) URL")
+        return value
+
+
+class BookBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, description="Book IDs to fetch")
+
+
 class BookResponse(BookBase):
     title: str
     author: str
@@ -5,20 +5,48 @@ class BookService:
     def __init__(self, book_repo: BookRepoInterface):
         self.book_repo = book_repo
 
-    def get_books(self):
-        return self.book_repo.get_books()
+    def get_books(self, fields: str = None):
+        return self.book_repo.get_books(fields)
 
-    def get_books_with_pagination(self, page: int = 1, limit: int = 3):
-        return self.book_repo.get_books_with_pagination(page, limit)
+    def iter_books(self, batch_size: int = 500, fields: str = None):
+        return self.book_repo.iter_books(batch_size, fields)
+
+    def get_books_with_pagination(
+        self, page: int = 1, limit: int = 3, fields: str = None
+    ):
+        return self.book_repo.get_books_with_pagination(page, limit, fields)
+
+    def get_books_with_cursor(
+        self, cursor: str = None, limit: int = 3, fields: str = None
+    ):
+        return self.book_repo.get_books_with_cursor(cursor, limit, fields)
 
     def get_book_with_ID(self, book_id: str):
         return self.book_repo.get_book_with_ID(book_id)
 
-    def get_books_by_user_id(self, user_id: str):
-        return self.book_repo.get_books_by_user_id(user_id)
-
-    async def create_book(self, book, image, credentials):
-        return await self.book_repo.create_book(book, image, credentials)
+    def get_books_by_ids(self, ids):
+        return self.book_repo.get_books_by_ids(ids)
+
+    def get_books_by_user_id(
+        self,
+        user_id: str,
+        fields: str = None,
+        cursor: str = None,
+        limit: int = None,
+        with_count: bool = False,
+    ):
+        return self.book_repo.get_books_by_user_id(
+            user_id, fields, cursor, limit, with_count
+        )
+
+    def search_books(self, q: str, page: int = 1, limit: int = 10):
+        return self.book_repo.search_books(q, page, limit)
+
+    async def create_book(self, book, image, principal):
+        return await self.book_repo.create_book(book, image, principal)
+
+    def bulk_create_books(self, items, principal):
+        return self.book_repo.bulk_create_books(items, principal)
 
     def update_book(self, book_id: str, book_update):
         return self.book_repo.update_book(book_id, book_update)
@@ -18,20 +18,40 @@ class UserService:
     def create_user(self, user: UserCreate):
         return self.user_repo.create_user(user)
 
-    def get_all_users(self, credentials):
-        return self.user_repo.get_all_users(credentials)
-
-    def get_profile(self, credentials):
-        return self.user_repo.get_profile(credentials)
-
-    def get_user_by_id(self, user_id: str):
-        return self.user_repo.get_user_by_id(user_id)
+    def get_all_users(
+        self,
+        principal,
+        cursor: str = None,
+        limit: int = 20,
+        books: int = 0,
+    ):
+        return self.user_repo.get_all_users(principal, cursor, limit, books)
+
+    def get_profile(
+        self,
+        principal,
+        include: str = None,
+        cursor: str = None,
+        limit: int = 20,
+        view: str = None,
+    ):
+        return self.user_repo.get_profile(principal, include, cursor, limit, view)
+
+    def get_user_by_id(
+        self,
+        user_id: str,
+        include: str = None,
+        cursor: str = None,
+        limit: int = 20,
+        view: str = None,
+    ):
+        return self.user_repo.get_user_by_id(user_id, include, cursor, limit, view)
 
     def update_user_image(self, user_id: str, file: UploadFile = File(...)):
         return self.user_repo.update_user_image(user_id, file)
 
-    def update_user(self, body: UserUpdate, credentials):
-        return self.user_repo.update_user(body, credentials)
+    def update_user(self, body: UserUpdate, principal):
+        return self.user_repo.update_user(body, principal)
 
     def delete_user(self, user_id: str):
         return self.user_repo.delete_user(user_id)
@@ -0,0 +1,312 @@
+import threading
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+from sqlalchemy.pool import StaticPool
+
+import database.session
+from database.mysql import Base
+from database.session import run_db
+from middleware.auth import decode_access_token
+from middleware.principal import load_user
+from models.book.book_model import Book
+from models.user.user_model import User
+from repositories.sqlalchemy.book_repo_sqlalchemy_async import BookRepoSqlAlchemyAsync
+from repositories.sqlalchemy.user_repo_sqlalchemy_async import UserRepoSqlAlchemyAsync
+from schemas.user.user_schema import UserUpdate
+from utils.cache import book_cache
+
+
+@pytest_asyncio.fixture
+async def async_db():
+    """AsyncSession trên SQLite in-memory (aiosqlite)"""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    AsyncTestingSession = async_sessionmaker(engine, expire_on_commit=False)
+    async with AsyncTestingSession() as db:
+        yield db
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def seeded_books(async_db):
+    """Tạo 7 sách, hai cuốn cuối trùng create_At để kiểm tra tie-break theo id"""
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    async_db.add_all(
+        [
+            Book(
+                id=f"book-{i}",
+                title=f"Book {i}",
+                author="Author",
+                caption="Caption",
+                summary="Summary",
+                user_id="user-1",
+                create_At=base + timedelta(minutes=min(i, 5)),
+            )
+            for i in range(7)
+        ]
+    )
+    await async_db.commit()
+
+
+class TestBookRepoSqlAlchemyAsync:
+    """Tests cho BookRepoSqlAlchemyAsync trên aiosqlite"""
+
+    @pytest.fixture(autouse=True)
+    def clear_book_cache(self):
+        book_cache.clear()
+        yield
+        book_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_cursor_pagination_walks_all_rows(self, async_db, seeded_books):
+        """Test duyệt hết các trang theo cursor giống hệt repo sync"""
+        # Arrange
+        repo = BookRepoSqlAlchemyAsync(async_db)
+        seen, cursor = [], ""
+
+        # Act
+        while cursor is not None:
+            result = await repo.get_books_with_cursor(cursor, 2)
+            seen.extend(book["id"] for book in result["data"]["books"])
+            cursor = result["data"]["next_cursor"]
+
+        # Assert
+        assert seen == [f"book-{i}" for i in range(6, -1, -1)]
+
+    @pytest.mark.asyncio
+    async def test_get_books_with_fields(self, async_db, seeded_books):
+        """Test ?fields= và phân trang offset trên AsyncSession"""
+        repo = BookRepoSqlAlchemyAsync(async_db)
+
+        result = await repo.get_books_with_pagination(1, 2, "title")
+
+        assert result["data"] == [{"title": "Book 6"}, {"title": "Book 5"}]
+
+    @pytest.mark.asyncio
+    async def test_iter_books_streams_all_rows(self, async_db, seeded_books):
+        """Test iter_books trả về async generator đủ sách"""
+        repo = BookRepoSqlAlchemyAsync(async_db)
+
+        rows = [row async for row in repo.iter_books(batch_size=2)]
+
+        assert len(rows) == 7
+        assert rows[0]["id"] == "book-6"
+
+    @pytest.mark.asyncio
+    async def test_iter_books_rejects_unknown_field(self, async_db):
+        """Test fields sai bị báo ngay, trước khi stream"""
+        repo = BookRepoSqlAlchemyAsync(async_db)
+
+        with pytest.raises(ValueError):
+            repo.iter_books(fields="password")
+
+    @pytest.mark.asyncio
+    async def test_get_book_with_id(self, async_db, seeded_books):
+        """Test lấy sách theo ID và 404 khi không tồn tại"""
+        repo = BookRepoSqlAlchemyAsync(async_db)
+
+        found = await repo.get_book_with_ID("book-3")
+        missing = await repo.get_book_with_ID("nope")
+
+        assert found["data"]["title"] == "Book 3"
+        assert missing["status_code"] == 404
+
+    @pytest.mark.asyncio
+    async def test_user_listing_with_count(self, async_db, seeded_books):
+        """Test danh sách sách theo user kèm count"""
+        repo = BookRepoSqlAlchemyAsync(async_db)
+
+        result = await repo.get_books_by_user_id("user-1", "id", None, 3, True)
+
+        assert [book["id"] for book in result["data"]["books"]] == [
+            "book-6",
+            "book-5",
+            "book-4",
+        ]
+        assert result["data"]["count"] == 7
+
+    @pytest.mark.asyncio
+    async def test_search_books_uses_fts(self, async_db, seeded_books):
+        """Test tìm kiếm dùng FTS5 của SQLite"""
+        repo = BookRepoSqlAlchemyAsync(async_db)
+
+        result = await repo.search_books("Book 3")
+
+        assert result["data"]["books"][0]["id"] == "book-3"
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_books(self, async_db, mock_celery_task):
+        """Test tạo sách hàng loạt trên AsyncSession"""
+        # Arrange
+        repo = BookRepoSqlAlchemyAsync(async_db)
+        items = [
+            {"title": "A", "author": "X", "caption": "c", "summary": "s"},
+            {"title": "", "author": "X", "caption": "c", "summary": "s"},
+        ]
+
+        # Act
+        result = await repo.bulk_create_books(items, Mock(id="user-1"))
+
+        # Assert
+        assert result["data"]["created"] == 1
+        assert result["data"]["failed"] == 1
+        listing = await repo.get_books_by_user_id("user-1")
+        assert listing["data"][0]["title"] == "A"
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete_book(self, async_db, seeded_books):
+        """Test cập nhật và xóa sách"""
+        repo = BookRepoSqlAlchemyAsync(async_db)
+        update = Mock()
+        update.dict.return_value = {"title": "Renamed"}
+
+        updated = await repo.update_book("book-1", update)
+        deleted = await repo.delete_book("book-1")
+
+        assert updated["data"]["title"] == "Renamed"
+        assert deleted["message"] == "Book deleted successfully"
+        assert (await repo.get_book_with_ID("book-1"))["status_code"] == 404
+
+
+class TestUserRepoSqlAlchemyAsync:
+    """Tests cho UserRepoSqlAlchemyAsync trên aiosqlite"""
+
+    @pytest.mark.asyncio
+    async def test_create_login_and_profile(self, async_db, sample_user_data):
+        """Test đăng ký, đăng nhập, lấy profile rồi cập nhật bằng principal từ token"""
+        # Arrange
+        repo = UserRepoSqlAlchemyAsync(async_db)
+        user = Mock(**sample_user_data)
+
+        # Act
+        with patch("middleware.auth.SECRET_KEY", "test-secret"):
+            created = await repo.create_user(user)
+            duplicate = await repo.create_user(user)
+            login = await repo.login(user)
+            payload = decode_access_token(login["data"]["access_token"])
+        principal = await load_user(async_db, payload["id"])
+        profile = await repo.get_profile(principal)
+        summary = await repo.get_profile(principal, view="summary")
+        updated = await repo.update_user(UserUpdate(username="renamed"), principal)
+
+        # Assert
+        assert created["data"]["profile"]["email"] == sample_user_data["email"]
+        assert created["data"]["books"] == []
+        assert duplicate["status_code"] == 400
+        assert profile["data"]["id"] == created["data"]["id"]
+        assert profile["data"]["books"] == []
+        assert summary["data"]["book_count"] == 0
+        assert updated["data"]["profile"]["username"] == "renamed"
+        assert updated["data"]["books"] == []
+
+    @pytest.mark.asyncio
+    async def test_get_user_by_id_loads_books(self, async_db, sample_user_data):
+        """Test get_user_by_id nạp sẵn profile và books (không lazy load)"""
+        # Arrange
+        repo = UserRepoSqlAlchemyAsync(async_db)
+        created = await repo.create_user(Mock(**sample_user_data))
+        user_id = created["data"]["id"]
+        async_db.add(Book(title="T", author="A", user_id=user_id))
+        await async_db.commit()
+        async_db.expunge_all()
+
+        # Act
+        result = await repo.get_user_by_id(user_id)
+
+        # Assert
+        assert result["data"]["books"][0]["title"] == "T"
+        assert result["data"]["profile"]["username"] == sample_user_data["username"]
+
+    @pytest.mark.asyncio
+    async def test_get_all_users_pages_with_books(self, async_db, sample_user_data):
+        """Test danh sách admin phân trang theo cursor và nhúng sách không lazy load"""
+        # Arrange
+        repo = UserRepoSqlAlchemyAsync(async_db)
+        for i in range(3):
+            await repo.create_user(
+                Mock(username=f"user{i}", email=f"user{i}@example.com", password="pw")
+            )
+        user_ids = [user.id for user in (await async_db.scalars(select(User))).all()]
+        async_db.add_all(
+            Book(title=f"T{j}", author="A", user_id=user_id)
+            for user_id in user_ids
+            for j in range(3)
+        )
+        await async_db.commit()
+        async_db.expunge_all()
+        seen, cursor = [], ""
+
+        admin = Mock(profile=Mock(isAdmin=True))
+
+        # Act
+        while cursor is not None:
+            result = await repo.get_all_users(admin, cursor, 2, 2)
+            seen.extend(result["data"]["users"])
+            cursor = result["data"]["next_cursor"]
+
+        # Assert
+        assert sorted(user["id"] for user in seen) == sorted(user_ids)
+        assert all(len(user["books"]) == 2 for user in seen)
+        assert seen[0]["profile"]["email"].endswith("@example.com")
+
+    @pytest.mark.asyncio
+    async def test_delete_user_releases_profile_image(self, async_db, sample_user_data):
+        """Test xoá user xoá luôn profile và trả tham chiếu ảnh đại diện"""
+        # Arrange
+        repo = UserRepoSqlAlchemyAsync(async_db)
+        created = await repo.create_user(Mock(**sample_user_data))
+        user_id = created["data"]["id"]
+        user = await async_db.get(User, user_id, options=[selectinload(User.profile)])
+        user.profile.profile_Image = "https://x/avatar_medium"
+        await async_db.commit()
+        async_db.expunge_all()
+
+        # Act
+        with patch("celery_temp.tasks.release_images.delay") as release:
+            result = await repo.delete_user(user_id)
+
+        # Assert
+        assert result["message"] == "User deleted successfully"
+        assert await async_db.get(User, user_id) is None
+        release.assert_called_once_with(["https://x/avatar_medium"])
+
+    @pytest.mark.asyncio
+    async def test_login_wrong_password(self, async_db, sample_user_data):
+        """Test đăng nhập sai mật khẩu trả về 401"""
+        repo = UserRepoSqlAlchemyAsync(async_db)
+        await repo.create_user(Mock(**sample_user_data))
+
+        result = await repo.login(Mock(email=sample_user_data["email"], password="x"))
+
+        assert result["status_code"] == 401
+
+
+class TestRunDb:
+    """Tests cho run_db"""
+
+    @pytest.mark.asyncio
+    async def test_sync_mode_runs_in_threadpool(self):
+        """Test chế độ sync chạy call trong threadpool, không chặn event loop"""
+        with patch.object(database.session, "DB_ASYNC", False):
+            thread = await run_db(threading.get_ident)
+
+        assert thread != threading.get_ident()
+
+    @pytest.mark.asyncio
+    async def test_async_mode_awaits_coroutine(self):
+        """Test chế độ async await coroutine của repo"""
+
+        async def call(value):
+            return value
+
+        with patch.object(database.session, "DB_ASYNC", True):
+            result = await run_db(call, 42)
+
+        assert result == 42
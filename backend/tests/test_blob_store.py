@@ -0,0 +1,136 @@
+import io
+import time
+import pytest
+from unittest.mock import patch
+
+from PIL import Image
+
+from celery_temp import tasks
+from celery_temp.dispatch import queue_profile_image
+from models.book.book_model import Book
+from utils.blob_store import BlobStore, blob_digest, is_blob_ref, staged_at
+from utils.renditions import render
+
+IMAGE = b"\xff\xd8\xff" + b"\x01" * 1000
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"), ttl=60)
+    with patch("celery_temp.dispatch.blob_store", store), patch(
+        "celery_temp.tasks.blob_store", store
+    ):
+        yield store
+
+
+class TestBlobStore:
+    """Tests cho blob staging store: content-addressed, claim theo reference, TTL cleanup"""
+
+    def test_put_returns_reference_to_content(self, store):
+        """Test put trả về reference nhỏ, đọc lại đúng nội dung"""
+        # Act
+        ref = store.put(io.BytesIO(IMAGE))
+
+        # Assert
+        assert is_blob_ref(ref)
+        assert abs(staged_at(ref) - time.time()) < 5
+        with store.open(ref) as staged:
+            assert staged.read() == IMAGE
+
+    def test_identical_uploads_share_one_object(self, store):
+        """Test cùng nội dung chỉ lưu 1 object; object bị xoá khi claim cuối được release"""
+        # Arrange
+        first = store.put(io.BytesIO(IMAGE))
+        second = store.put(io.BytesIO(IMAGE))
+
+        # Act & Assert
+        assert first != second
+        assert store.stats() == {"claims": 2, "objects": 1, "bytes": len(IMAGE)}
+        store.release(first)
+        with store.open(second) as staged:
+            assert staged.read() == IMAGE
+        store.release(second)
+        assert store.stats() == {"claims": 0, "objects": 0, "bytes": 0}
+
+    def test_cleanup_removes_expired_claims(self, store):
+        """Test cleanup xoá blob quá TTL chưa được worker dùng, giữ blob còn hạn"""
+        # Arrange
+        with patch("utils.blob_store.time.time", return_value=time.time() - 120):
+            expired = store.put(io.BytesIO(IMAGE))
+        fresh = store.put(io.BytesIO(b"\x89PNG\r\n\x1a\n"))
+
+        # Act
+        removed = store.cleanup()
+
+        # Assert
+        assert removed == 1
+        with pytest.raises(FileNotFoundError):
+            store.path(expired)
+        assert store.stats()["objects"] == 1
+        store.path(fresh)
+
+    def test_rejects_foreign_reference(self, store):
+        """Test reference không hợp lệ (path traversal) bị từ chối"""
+        with pytest.raises(ValueError):
+            store.path("../../etc/passwd")
+
+
+class TestStagedTasks:
+    """Tests cho dispatch/task: broker chỉ nhận reference, worker release blob sau khi upload"""
+
+    def test_dispatch_stages_file_and_queues_reference(self, store):
+        """Test queue_profile_image stage file và chỉ gửi reference qua broker"""
+        with patch("celery_temp.tasks.update_profile_image.delay") as delay:
+            queue_profile_image("user-1", io.BytesIO(IMAGE))
+
+        user_id, ref = delay.call_args.args
+        assert user_id == "user-1"
+        assert is_blob_ref(ref)
+        assert store.stats()["claims"] == 1
+
+    def test_dispatch_releases_blob_when_broker_fails(self, store):
+        """Test gửi task lỗi thì blob đã stage được release"""
+        with patch(
+            "celery_temp.tasks.update_profile_image.delay",
+            side_effect=ConnectionError("redis down"),
+        ):
+            with pytest.raises(ConnectionError):
+                queue_profile_image("user-1", io.BytesIO(IMAGE))
+
+        assert store.stats()["claims"] == 0
+
+    def test_worker_uploads_from_path_and_releases(self, store, db_session):
+        """Test worker render ảnh từ path của blob rồi release blob"""
+        # Arrange
+        db_session.add(Book(id="book-1", title="A", author="X", user_id="u1"))
+        db_session.commit()
+        buffer = io.BytesIO()
+        Image.new("RGB", (40, 30), "red").save(buffer, format="JPEG")
+        ref = store.put(io.BytesIO(buffer.getvalue()))
+
+        # Act
+        with patch("celery_temp.tasks.SessionLocal", return_value=db_session), patch(
+            "utils.renditions.rendition_pool.render", wraps=render
+        ) as render_mock, patch(
+            "utils.cloudinary.upload_rendition",
+            side_effect=lambda data, public_id: f"https://x/{public_id}",
+        ):
+            tasks.upload_image_and_update_book("book-1", ref)
+
+        # Assert
+        assert render_mock.call_args.args[0].endswith(ref)
+        assert store.stats()["claims"] == 0
+        book = db_session.get(Book, "book-1")
+        assert book.cover_image == f"https://x/{blob_digest(ref)}_large"
+
+    def test_worker_passes_remote_url_through(self, store, db_session):
+        """Test URL ảnh từ xa được chuyển thẳng cho Cloudinary"""
+        db_session.add(Book(id="book-1", title="A", author="X", user_id="u1"))
+        db_session.commit()
+
+        with patch("celery_temp.tasks.SessionLocal", return_value=db_session), patch(
+            "utils.cloudinary.upload_image"
+        ) as upload:
+            tasks.upload_image_and_update_book("book-1", "https://example.com/a.jpg")
+
+        upload.assert_called_once_with("https://example.com/a.jpg")
@@ -0,0 +1,465 @@
+import io
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from models.book.book_model import Book
+from repositories.sqlalchemy import book_queries
+from repositories.sqlalchemy.book_repo_sqlalchemy import (
+    MAX_BATCH_IDS,
+    BookRepoSqlAlchemy,
+)
+from schemas.book.book_schema import BookUpdate
+from tools import bench_read_models
+from utils.cache import book_cache
+from utils.search import highlight_snippet
+from utils.pagination import (
+    DEFAULT_PAGE_LIMIT,
+    MAX_PAGE_LIMIT,
+    clamp_limit,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+class TestBookRepoSqlAlchemy:
+    """Tests cho BookRepoSqlAlchemy trên SQLite"""
+
+    @pytest.fixture(autouse=True)
+    def clear_book_cache(self):
+        book_cache.clear()
+        yield
+        book_cache.clear()
+
+    @pytest.fixture
+    def seeded_books(self, db_session):
+        """Tạo 7 sách, hai cuốn cuối trùng create_At để kiểm tra tie-break theo id"""
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        books = [
+            Book(
+                id=f"book-{i}",
+                title=f"Book {i}",
+                author="Author",
+                caption="Caption",
+                summary="Summary",
+                user_id="user-1",
+                create_At=base + timedelta(minutes=min(i, 5)),
+            )
+            for i in range(7)
+        ]
+        db_session.add_all(books)
+        db_session.commit()
+        return books
+
+    def test_cursor_roundtrip(self):
+        """Test encode/decode cursor giữ nguyên (create_At, id)"""
+        created = datetime(2024, 5, 6, 7, 8, 9)
+
+        assert decode_cursor(encode_cursor(created, "book-1")) == (created, "book-1")
+
+    def test_decode_invalid_cursor(self):
+        """Test cursor không hợp lệ báo ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_cursor_pagination_walks_all_rows(self, db_session, seeded_books):
+        """Test duyệt hết các trang theo cursor không trùng, không sót"""
+        # Arrange
+        repo = BookRepoSqlAlchemy(db_session)
+        seen, cursor = [], ""
+
+        # Act
+        while cursor is not None:
+            result = repo.get_books_with_cursor(cursor, 2)
+            seen.extend(book["id"] for book in result["data"]["books"])
+            cursor = result["data"]["next_cursor"]
+
+        # Assert
+        assert seen == [f"book-{i}" for i in range(6, -1, -1)]
+
+    def test_list_reads_skip_identity_map(self, db_session, seeded_books):
+        """Test danh sách đọc bằng read model, không đưa Book nào vào Session"""
+        # Arrange
+        repo = BookRepoSqlAlchemy(db_session)
+        expected = [book.to_dict() for book in reversed(seeded_books)]
+        db_session.expunge_all()
+
+        # Act
+        result = repo.get_books()
+        repo.get_books_with_cursor("", 3)
+        repo.search_books("Book")
+
+        # Assert
+        assert [book["id"] for book in result["data"]] == [
+            book["id"] for book in expected
+        ]
+        assert sorted(result["data"], key=lambda b: b["id"]) == sorted(
+            expected, key=lambda b: b["id"]
+        )
+        assert len(db_session.identity_map) == 0
+
+    def test_read_models_benchmark_runs(self):
+        """Test script benchmark chạy được với kích thước nhỏ"""
+        results = bench_read_models.run(sizes=(20,), repeat=1, out=io.StringIO())
+
+        assert [r["path"] for r in results] == ["orm to_dict", "read model"]
+        assert all(r["seconds"] > 0 and r["peak_bytes"] > 0 for r in results)
+
+    def test_iter_books_streams_all_rows(self, db_session, seeded_books):
+        """Test iter_books trả về đủ sách theo từng batch"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        rows = list(repo.iter_books(batch_size=2))
+
+        assert len(rows) == len(seeded_books)
+        assert rows[0]["id"] == "book-6"
+
+    def test_cursor_pagination_invalid_cursor(self, db_session):
+        """Test cursor sai định dạng trả về 400"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        result = repo.get_books_with_cursor("###", 2)
+
+        assert result["status_code"] == 400
+
+    def test_clamp_limit(self):
+        """Test limit quá lớn bị giới hạn bởi MAX_PAGE_LIMIT, limit <= 0 về mặc định"""
+        assert clamp_limit(MAX_PAGE_LIMIT * 10) == MAX_PAGE_LIMIT
+        assert clamp_limit(0) == DEFAULT_PAGE_LIMIT
+        assert clamp_limit(5) == 5
+
+    def test_search_books_ranks_and_highlights(self, db_session):
+        """Test tìm kiếm full-text (FTS5) xếp hạng theo độ liên quan và highlight"""
+        # Arrange
+        db_session.add_all(
+            [
+                Book(
+                    id="py",
+                    title="Python Python Cookbook",
+                    author="David Beazley",
+                    caption="Recipes",
+                    summary="Recipes for Python 3",
+                    user_id="user-1",
+                ),
+                Book(
+                    id="go",
+                    title="The Go Programming Language",
+                    author="Alan Donovan",
+                    caption="Go",
+                    summary="Covers Python interop briefly",
+                    user_id="user-1",
+                ),
+                Book(
+                    id="rust",
+                    title="Rust in Action",
+                    author="Tim McNamara",
+                    caption="Systems",
+                    summary="Systems programming",
+                    user_id="user-1",
+                ),
+            ]
+        )
+        db_session.commit()
+        repo = BookRepoSqlAlchemy(db_session)
+
+        # Act
+        result = repo.search_books("python", 1, 10)
+
+        # Assert
+        books = result["data"]["books"]
+        assert [book["id"] for book in books] == ["py", "go"]
+        assert books[0]["score"] > books[1]["score"]
+        assert books[0]["highlights"]["title"].startswith("<mark>Python</mark>")
+        assert "title" not in books[1]["highlights"]
+
+    def test_search_highlights_escape_stored_html(self):
+        """Test snippet highlight escape HTML do người dùng nhập, chỉ giữ thẻ <mark>"""
+        snippet = highlight_snippet(
+            '<script>alert("python")</script> Python', ["python"]
+        )
+
+        assert snippet == (
+            "&lt;script&gt;alert(&quot;<mark>python</mark>&quot;)&lt;/script&gt; "
+            "<mark>Python</mark>"
+        )
+
+    def test_search_books_follows_updates_and_deletes(self, db_session):
+        """Test chỉ mục FTS5 được đồng bộ khi sửa/xoá sách"""
+        # Arrange
+        book = Book(
+            id="b1",
+            title="Old Title",
+            author="Someone",
+            caption="c",
+            summary="s",
+            user_id="user-1",
+        )
+        db_session.add(book)
+        db_session.commit()
+        repo = BookRepoSqlAlchemy(db_session)
+
+        # Act & Assert
+        book.title = "Fresh Title"
+        db_session.commit()
+        assert repo.search_books("old", 1, 10)["data"]["books"] == []
+        assert len(repo.search_books("fresh", 1, 10)["data"]["books"]) == 1
+
+        db_session.delete(book)
+        db_session.commit()
+        assert repo.search_books("fresh", 1, 10)["data"]["books"] == []
+
+    def test_search_books_requires_query(self, db_session):
+        """Test truy vấn rỗng hoặc chỉ có ký tự đặc biệt trả về 400"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        assert repo.search_books('"*()', 1, 10)["status_code"] == 400
+
+    def test_get_book_with_id_reads_through_cache(self, db_session):
+        """Test lấy sách theo ID lần hai được phục vụ từ cache"""
+        # Arrange
+        db_session.add(
+            Book(
+                id="cached",
+                title="Cached",
+                author="A",
+                caption="c",
+                summary="s",
+                cover_image="https://example.com/cover.jpg",
+                user_id="user-1",
+            )
+        )
+        db_session.commit()
+        repo = BookRepoSqlAlchemy(db_session)
+
+        # Act
+        first = repo.get_book_with_ID("cached")
+        hits_before = book_cache.stats()["hits"]
+        second = repo.get_book_with_ID("cached")
+
+        # Assert
+        assert first == second
+        assert book_cache.stats()["hits"] == hits_before + 1
+
+    def test_cached_book_is_copied_to_callers(self, db_session):
+        """Test response lấy từ cache là bản sao: sửa response không làm hỏng cache"""
+        # Arrange
+        db_session.add(
+            Book(
+                id="cached",
+                title="Cached",
+                author="A",
+                cover_image="https://example.com/cover.jpg",
+                user_id="user-1",
+            )
+        )
+        db_session.commit()
+        repo = BookRepoSqlAlchemy(db_session)
+
+        # Act
+        repo.get_book_with_ID("cached")["data"]["title"] = "changed"
+        repo.get_book_with_ID("cached")["data"].pop("title")
+        repo.get_books_by_ids(["cached"])["data"]["books"][0]["title"] = "changed"
+
+        # Assert
+        assert repo.get_book_with_ID("cached")["data"]["title"] == "Cached"
+        assert book_cache.get("cached")["title"] == "Cached"
+
+    def test_book_without_cover_is_not_cached(self, db_session, seeded_books):
+        """Test sách chưa có ảnh bìa (đang chờ Celery) không được cache"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        repo.get_book_with_ID("book-1")
+
+        assert book_cache.get("book-1") is None
+
+    def test_update_and_delete_invalidate_cache(self, db_session):
+        """Test sửa/xoá sách làm mất hiệu lực cache"""
+        # Arrange
+        db_session.add(
+            Book(
+                id="b1",
+                title="Before",
+                author="A",
+                caption="c",
+                summary="s",
+                cover_image="https://example.com/cover.jpg",
+                user_id="user-1",
+            )
+        )
+        db_session.commit()
+        repo = BookRepoSqlAlchemy(db_session)
+        repo.get_book_with_ID("b1")
+
+        # Act & Assert
+        repo.update_book(
+            "b1", BookUpdate(title="After", author="A", caption="c", summary="s")
+        )
+        assert repo.get_book_with_ID("b1")["data"]["title"] == "After"
+
+        with patch("celery_temp.tasks.release_images.delay") as release:
+            deleted = repo.delete_book("b1")
+        assert deleted["message"] == "Book deleted successfully"
+        assert repo.get_book_with_ID("b1")["status_code"] == 404
+        release.assert_called_once_with(["https://example.com/cover.jpg"])
+
+    def test_get_books_by_ids_keeps_order_and_reports_missing(
+        self, db_session, seeded_books
+    ):
+        """Test lấy nhiều sách theo ID giữ thứ tự yêu cầu và báo ID không tồn tại"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        result = repo.get_books_by_ids(["book-3", "nope", "book-1", "book-3"])
+
+        assert [book["id"] for book in result["data"]["books"]] == ["book-3", "book-1"]
+        assert result["data"]["missing"] == ["nope"]
+
+    def test_get_books_by_ids_rejects_too_many(self, db_session):
+        """Test vượt quá MAX_BATCH_IDS trả về 400"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        result = repo.get_books_by_ids([f"id-{i}" for i in range(MAX_BATCH_IDS + 1)])
+
+        assert result["status_code"] == 400
+
+    def test_fields_project_columns(self, db_session, seeded_books):
+        """Test ?fields= chỉ SELECT các cột được yêu cầu"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        stmt, _ = book_queries.select_books("id,title")
+        result = repo.get_books_with_pagination(1, 2, "title,create_At")
+
+        assert [c["name"] for c in stmt.column_descriptions] == ["id", "title"]
+        assert result["data"] == [
+            {"title": "Book 6", "create_At": "2024-01-01 12:05:00"},
+            {"title": "Book 5", "create_At": "2024-01-01 12:05:00"},
+        ]
+
+    def test_fields_with_cursor_pagination(self, db_session, seeded_books):
+        """Test cursor vẫn hoạt động khi không yêu cầu create_At/id"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        first = repo.get_books_with_cursor("", 3, "title")
+        second = repo.get_books_with_cursor(first["data"]["next_cursor"], 3, "title")
+
+        assert first["data"]["books"][0] == {"title": "Book 6"}
+        assert second["data"]["books"][0] == {"title": "Book 3"}
+
+    def test_fields_rejects_unknown_column(self, db_session):
+        """Test trường không nằm trong whitelist trả về 400"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        result = repo.get_books_by_user_id("user-1", "id,password")
+
+        assert result["status_code"] == 400
+        assert "password" in result["error"]
+
+    def test_get_books_by_user_id_paginates_with_count(self, db_session, seeded_books):
+        """Test sách theo user có thứ tự ổn định, phân trang cursor và count"""
+        # Arrange
+        db_session.add(
+            Book(
+                id="other",
+                title="Other",
+                author="A",
+                caption="c",
+                summary="s",
+                user_id="user-2",
+            )
+        )
+        db_session.commit()
+        repo = BookRepoSqlAlchemy(db_session)
+
+        # Act
+        first = repo.get_books_by_user_id("user-1", "id", None, 4, True)
+        second = repo.get_books_by_user_id(
+            "user-1", "id", first["data"]["next_cursor"], 4
+        )
+
+        # Assert
+        assert [b["id"] for b in first["data"]["books"]] == [
+            "book-6",
+            "book-5",
+            "book-4",
+            "book-3",
+        ]
+        assert first["data"]["count"] == 7
+        assert [b["id"] for b in second["data"]["books"]] == [
+            "book-2",
+            "book-1",
+            "book-0",
+        ]
+        assert second["data"]["next_cursor"] is None
+        assert "count" not in second["data"]
+
+    def test_get_books_by_user_id_without_paging_returns_full_list(self, db_session):
+        """Test không truyền cursor/limit thì trả về toàn bộ danh sách như cũ"""
+        # Arrange
+        db_session.add_all(
+            [
+                Book(
+                    id=f"book-{i:02d}",
+                    title=f"Book {i}",
+                    author="A",
+                    caption="c",
+                    summary="s",
+                    user_id="user-1",
+                )
+                for i in range(25)
+            ]
+        )
+        db_session.commit()
+        repo = BookRepoSqlAlchemy(db_session)
+
+        # Act
+        result = repo.get_books_by_user_id("user-1", "id")
+
+        # Assert
+        assert isinstance(result["data"], list)
+        assert len(result["data"]) == 25
+
+    def test_get_books_by_user_id_not_found(self, db_session):
+        """Test user không có sách trả về 404"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        assert repo.get_books_by_user_id("nobody")["status_code"] == 404
+
+    def test_bulk_create_books_reports_per_item(self, db_session, mock_celery_task):
+        """Test tạo sách hàng loạt: item hợp lệ được insert, item lỗi được báo cáo"""
+        # Arrange
+        repo = BookRepoSqlAlchemy(db_session)
+        principal = Mock(id="user-1")
+        items = [
+            {"title": "A", "author": "X", "caption": "c", "summary": "s"},
+            {"title": "", "author": "X", "caption": "c", "summary": "s"},
+            {
+                "title": "B",
+                "author": "Y",
+                "caption": "c",
+                "summary": "s",
+                "cover_image_url": "https://example.com/b.jpg",
+            },
+        ]
+
+        # Act
+        result = repo.bulk_create_books(items, principal)
+
+        # Assert
+        data = result["data"]
+        assert (data["created"], data["failed"]) == (2, 1)
+        assert [r["status"] for r in data["results"]] == [
+            "created",
+            "invalid",
+            "created",
+        ]
+        assert db_session.query(Book).filter(Book.user_id == "user-1").count() == 2
+        mock_celery_task["book"].assert_called_once_with(
+            data["results"][2]["id"], "https://example.com/b.jpg"
+        )
+
+    def test_bulk_create_books_requires_token(self, db_session):
+        """Test tạo sách hàng loạt không có principal (token không hợp lệ) trả về 401"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        result = repo.bulk_create_books([{"title": "A"}], None)
+
+        assert result["status_code"] == 401
@@ -60,6 +60,77 @@ class TestBookRoutes:
             data = response.json()
             assert data == []
 
+    def test_get_books_stream_ndjson(self, client):
+        """Test API stream sách dạng NDJSON khi Accept là application/x-ndjson"""
+        # Arrange
+        rows = [{"id": f"book-{i}", "title": f"Book {i}"} for i in range(250)]
+
+        with patch(
+            "services.book.book_service.BookService.iter_books"
+        ) as mock_iter, patch(
+            "services.book.book_service.BookService.get_books"
+        ) as mock_get_books:
+            mock_iter.return_value = iter(rows)
+
+            # Act
+            response = client.get(
+                "/products/", headers={"Accept": "application/x-ndjson"}
+            )
+
+            # Assert
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            lines = response.text.splitlines()
+            assert [json.loads(line) for line in lines] == rows
+            mock_get_books.assert_not_called()
+
+    def test_get_books_stream_json_array(self, client):
+        """Test API stream sách với ?stream=1 giữ nguyên envelope api_response"""
+        # Arrange
+        rows = [{"id": f"book-{i}", "title": f"Sách {i}"} for i in range(150)]
+
+        with patch("services.book.book_service.BookService.iter_books") as mock_iter:
+            mock_iter.return_value = iter(rows)
+
+            # Act
+            response = client.get("/products/?stream=1")
+
+            # Assert
+            assert response.status_code == 200
+            assert response.json() == {"status_code": 200, "data": rows}
+
+    def test_get_books_stream_empty(self, client):
+        """Test API stream khi không có sách trả về cùng envelope với bản không stream"""
+        with patch("services.book.book_service.BookService.iter_books") as mock_iter:
+            mock_iter.return_value = iter([])
+
+            response = client.get("/products/?stream=1")
+
+            assert response.json() == {
+                "status_code": 200,
+                "message": "Books Not Found!",
+            }
+
+    def test_get_books_stream_invalid_fields(self, client):
+        """Test API stream với fields không hợp lệ trả về 400 trước khi stream"""
+        response = client.get("/products/?stream=1&fields=id,password")
+
+        assert response.status_code == 200
+        assert response.json()["status_code"] == 400
+
+    def test_get_books_with_fields(self, client):
+        """Test API truyền tham số fields xuống service"""
+        with patch(
+            "services.book.book_service.BookService.get_books_by_user_id"
+        ) as mock_get_books:
+            mock_get_books.return_value = {"status_code": 200, "data": []}
+
+            client.get("/products/user/user-1?fields=id,title")
+
+            mock_get_books.assert_called_once_with(
+                "user-1", "id,title", None, None, False
+            )
+
     def test_get_books_with_pagination_default(self, client):
         """Test API phân trang với tham số mặc định"""
         # Arrange
@@ -133,6 +204,44 @@ class TestBookRoutes:
             data = response.json()
             assert data["status_code"] == 400
 
+    def test_get_books_with_cursor_first_page(self, client):
+        """Test API phân trang theo cursor: cursor rỗng lấy trang đầu"""
+        # Arrange
+        with patch(
+            "services.book.book_service.BookService.get_books_with_cursor"
+        ) as mock_cursor, patch(
+            "services.book.book_service.BookService.get_books_with_pagination"
+        ) as mock_pagination:
+            mock_cursor.return_value = {
+                "status_code": 200,
+                "data": {"books": [{"id": "book-1"}], "next_cursor": "next"},
+            }
+
+            # Act
+            response = client.get("/products/pagination?cursor=&limit=1")
+
+            # Assert
+            assert response.status_code == 200
+            assert response.json()["data"]["next_cursor"] == "next"
+            mock_cursor.assert_called_once_with("", 1, None)
+            mock_pagination.assert_not_called()
+
+    def test_search_books(self, client):
+        """Test API tìm kiếm sách với q, page, limit"""
+        with patch(
+            "services.book.book_service.BookService.search_books"
+        ) as mock_search:
+            mock_search.return_value = {
+                "status_code": 200,
+                "data": {"books": [{"id": "book-1"}], "page": 1, "limit": 5},
+            }
+
+            response = client.get("/products/search?q=python&limit=5")
+
+            assert response.status_code == 200
+            assert response.json()["data"]["books"][0]["id"] == "book-1"
+            mock_search.assert_called_once_with("python", 1, 5)
+
     def test_get_book_by_id_success(self, client):
         """Test API lấy sách theo ID thành công"""
         # Arrange
@@ -160,6 +269,47 @@ class TestBookRoutes:
             assert data["id"] == book_id
             assert data["title"] == "Test Book"
 
+    def test_get_book_by_id_etag_not_modified(self, client):
+        """Test API trả về 304 khi If-None-Match khớp ETag"""
+        # Arrange
+        payload = {"status_code": 200, "data": {"id": "book-1"}, "message": "Success"}
+
+        with patch(
+            "services.book.book_service.BookService.get_book_with_ID"
+        ) as mock_get_book:
+            mock_get_book.return_value = payload
+            first = client.get("/products/book/book-1")
+            etag = first.headers["etag"]
+
+            # Act
+            second = client.get(
+                "/products/book/book-1", headers={"If-None-Match": etag}
+            )
+            changed = client.get(
+                "/products/book/book-1", headers={"If-None-Match": '"stale"'}
+            )
+
+            # Assert
+            assert first.json() == payload
+            assert second.status_code == 304
+            assert second.content == b""
+            assert second.headers["etag"] == etag
+            assert changed.status_code == 200
+
+    def test_get_book_by_id_error_has_no_etag(self, client):
+        """Test phản hồi lỗi không gắn ETag"""
+        with patch(
+            "services.book.book_service.BookService.get_book_with_ID"
+        ) as mock_get_book:
+            mock_get_book.return_value = {
+                "status_code": 404,
+                "message": "Book not Found",
+            }
+
+            response = client.get("/products/book/missing")
+
+            assert "etag" not in response.headers
+
     def test_get_book_by_id_not_found(self, client):
         """Test API lấy sách theo ID không tồn tại"""
         # Arrange
@@ -178,6 +328,24 @@ class TestBookRoutes:
             data = response.json()
             assert data["status_code"] == 404
 
+    def test_get_books_by_ids(self, client):
+        """Test API lấy nhiều sách theo danh sách ID (GET và POST)"""
+        with patch(
+            "services.book.book_service.BookService.get_books_by_ids"
+        ) as mock_batch:
+            mock_batch.return_value = {
+                "status_code": 200,
+                "data": {"books": [{"id": "a"}], "missing": ["b"]},
+            }
+
+            get_response = client.get("/products/batch?ids=a,b")
+            post_response = client.post("/products/batch", json={"ids": ["a", "b"]})
+
+            assert get_response.json()["data"]["missing"] == ["b"]
+            assert post_response.json() == get_response.json()
+            assert mock_batch.call_args_list[0].args == (["a", "b"],)
+            assert mock_batch.call_args_list[1].args == (["a", "b"],)
+
     def test_get_books_by_user_id_success(self, client):
         """Test API lấy sách theo user ID thành công"""
         # Arrange
@@ -388,6 +556,43 @@ class TestBookRoutes:
             data = response.json()
             assert data["status_code"] == 400
 
+    def test_bulk_create_books_json_and_ndjson(
+        self, client, auth_token, sample_book_data
+    ):
+        """Test API tạo sách hàng loạt nhận JSON array và NDJSON"""
+        with patch(
+            "services.book.book_service.BookService.bulk_create_books"
+        ) as mock_bulk:
+            mock_bulk.return_value = {"status_code": 200, "data": {"created": 2}}
+
+            client.post(
+                "/products/bulk",
+                json=[sample_book_data, sample_book_data],
+                headers={"Authorization": auth_token},
+            )
+            client.post(
+                "/products/bulk",
+                content="\n".join([json.dumps(sample_book_data)] * 2) + "\n",
+                headers={
+                    "Authorization": auth_token,
+                    "Content-Type": "application/x-ndjson",
+                },
+            )
+
+            assert mock_bulk.call_count == 2
+            for call in mock_bulk.call_args_list:
+                assert call.args[0] == [sample_book_data, sample_book_data]
+
+    def test_bulk_create_books_malformed_body(self, client, auth_token):
+        """Test API tạo sách hàng loạt với body không phải mảng JSON"""
+        response = client.post(
+            "/products/bulk",
+            json={"title": "not a list"},
+            headers={"Authorization": auth_token},
+        )
+
+        assert response.json()["status_code"] == 400
+
     def test_input_validation_missing_required_fields(self, client, auth_token):
         """Test validation với dữ liệu thiếu trường bắt buộc"""
         # Arrange - missing title
@@ -456,12 +661,8 @@ class TestBookRoutes:
         results = []
 
         def make_request():
-            with patch(
-                "services.book.book_service.BookService.get_books"
-            ) as mock_get_books:
-                mock_get_books.return_value = [{"id": "book-1", "title": "Book 1"}]
-                response = client.get("/products/")
-                results.append(response.status_code)
+            response = client.get("/products/")
+            results.append(response.status_code)
 
         # Tạo 10 threads đồng thời
         threads = []
@@ -469,13 +670,20 @@ class TestBookRoutes:
             thread = threading.Thread(target=make_request)
             threads.append(thread)
 
-        # Chạy tất cả threads
-        for thread in threads:
-            thread.start()
+        # Patch một lần bên ngoài các thread: patch lồng nhau từ nhiều thread
+        # khôi phục sai thứ tự và để lại mock trên BookService
+        with patch(
+            "services.book.book_service.BookService.get_books"
+        ) as mock_get_books:
+            mock_get_books.return_value = [{"id": "book-1", "title": "Book 1"}]
+
+            # Chạy tất cả threads
+            for thread in threads:
+                thread.start()
 
-        # Đợi tất cả threads hoàn thành
-        for thread in threads:
-            thread.join()
+            # Đợi tất cả threads hoàn thành
+            for thread in threads:
+                thread.join()
 
         # Assert tất cả requests đều thành công
         assert len(results) == 10
@@ -65,7 +65,7 @@ class TestBookService:
         result = book_service.get_books_with_pagination()
 
         # Assert
-        mock_book_repo.get_books_with_pagination.assert_called_once_with(1, 3)
+        mock_book_repo.get_books_with_pagination.assert_called_once_with(1, 3, None)
         assert result == expected_result
 
     def test_get_books_with_pagination_custom_params(
@@ -87,7 +87,38 @@ class TestBookService:
         result = book_service.get_books_with_pagination(page, limit)
 
         # Assert
-        mock_book_repo.get_books_with_pagination.assert_called_once_with(2, 5)
+        mock_book_repo.get_books_with_pagination.assert_called_once_with(2, 5, None)
+        assert result == expected_result
+
+    def test_get_books_with_cursor(self, book_service, mock_book_repo):
+        """Test phân trang theo cursor chuyển tiếp cursor và limit xuống repo"""
+        # Arrange
+        expected_result = {
+            "status_code": 200,
+            "data": {"books": [{"id": "book-4"}], "next_cursor": "abc"},
+        }
+        mock_book_repo.get_books_with_cursor.return_value = expected_result
+
+        # Act
+        result = book_service.get_books_with_cursor("cursor-token", 10)
+
+        # Assert
+        mock_book_repo.get_books_with_cursor.assert_called_once_with(
+            "cursor-token", 10, None
+        )
+        assert result == expected_result
+
+    def test_search_books(self, book_service, mock_book_repo):
+        """Test tìm kiếm sách chuyển tiếp q, page, limit xuống repo"""
+        # Arrange
+        expected_result = {"status_code": 200, "data": {"books": [], "page": 2}}
+        mock_book_repo.search_books.return_value = expected_result
+
+        # Act
+        result = book_service.search_books("python", 2, 5)
+
+        # Assert
+        mock_book_repo.search_books.assert_called_once_with("python", 2, 5)
         assert result == expected_result
 
     def test_get_book_with_valid_id(self, book_service, mock_book_repo):
@@ -137,7 +168,9 @@ class TestBookService:
         result = book_service.get_books_by_user_id(user_id)
 
         # Assert
-        mock_book_repo.get_books_by_user_id.assert_called_once_with(user_id)
+        mock_book_repo.get_books_by_user_id.assert_called_once_with(
+            user_id, None, None, None, False
+        )
         assert result == expected_books
 
     def test_get_books_by_user_id_no_books(self, book_service, mock_book_repo):
@@ -150,7 +183,9 @@ class TestBookService:
         result = book_service.get_books_by_user_id(user_id)
 
         # Assert
-        mock_book_repo.get_books_by_user_id.assert_called_once_with(user_id)
+        mock_book_repo.get_books_by_user_id.assert_called_once_with(
+            user_id, None, None, None, False
+        )
         assert result == []
 
     @pytest.mark.asyncio
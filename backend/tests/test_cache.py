@@ -0,0 +1,121 @@
+import io
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+
+from jose import jwt
+
+from middleware.auth import check_admin, create_access_token, decode_access_token
+from tools import bench_token_cache
+from utils.cache import TTLCache, token_cache
+
+
+class TestTTLCache:
+    """Tests cho TTLCache (LRU + TTL)"""
+
+    def test_get_set_counts_hits_and_misses(self):
+        """Test get/set đếm hit và miss"""
+        cache = TTLCache(maxsize=2, ttl=60)
+
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_evicts_least_recently_used(self):
+        """Test vượt maxsize thì loại bỏ phần tử ít dùng nhất"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_expire_after_ttl(self):
+        """Test phần tử hết hạn sau ttl"""
+        cache = TTLCache(maxsize=2, ttl=10)
+        with patch("utils.cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("utils.cache.time.monotonic", return_value=109.0):
+            assert cache.get("a") == 1
+        with patch("utils.cache.time.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+
+    def test_invalidate(self):
+        """Test invalidate xoá phần tử khỏi cache"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+
+        cache.invalidate("a")
+
+        assert cache.get("a") is None
+
+
+class TestTokenCache:
+    """Tests cho cache JWT đã xác thực (decode_access_token / check_admin)"""
+
+    @pytest.fixture(autouse=True)
+    def secret(self):
+        token_cache.clear()
+        with patch("middleware.auth.SECRET_KEY", "test-secret"):
+            yield
+        token_cache.clear()
+
+    def test_token_verified_once(self):
+        """Test token chỉ được verify một lần, các lần sau lấy từ cache"""
+        # Arrange
+        token = create_access_token({"sub": "a@example.com", "isAdmin": True})
+
+        # Act
+        with patch("middleware.auth.jwt.decode", wraps=jwt.decode) as mock_decode:
+            first = decode_access_token(token)
+            is_admin = check_admin(token)
+            second = decode_access_token(token)
+
+        # Assert
+        mock_decode.assert_called_once()
+        assert first == second
+        assert first["sub"] == "a@example.com"
+        assert is_admin is True
+        assert token_cache.stats()["hits"] == 2
+
+    def test_entry_expires_with_token(self):
+        """Test entry hết hạn cùng lúc với exp của token"""
+        token = create_access_token({"sub": "a@example.com"}, timedelta(seconds=30))
+
+        with patch.object(token_cache, "set", wraps=token_cache.set) as mock_set:
+            decode_access_token(token)
+
+        assert 0 < mock_set.call_args.kwargs["ttl"] <= 30
+
+    def test_invalid_and_expired_tokens_not_cached(self):
+        """Test token sai chữ ký hoặc hết hạn trả về None và không vào cache"""
+        expired = create_access_token({"sub": "a@example.com"}, timedelta(seconds=-1))
+
+        assert decode_access_token("not-a-token") is None
+        assert decode_access_token(expired) is None
+        assert check_admin("not-a-token") is False
+        assert token_cache.stats()["size"] == 0
+
+    def test_cached_claims_cannot_be_mutated(self):
+        """Test sửa payload trả về không làm hỏng entry trong cache"""
+        token = create_access_token({"sub": "a@example.com", "isAdmin": False})
+
+        decode_access_token(token)["isAdmin"] = True
+
+        assert check_admin(token) is False
+
+    def test_benchmark_runs(self):
+        """Test script benchmark chạy được với số vòng nhỏ"""
+        result = bench_token_cache.run(number=5, repeat=1, out=io.StringIO())
+
+        assert result["hit_seconds"] < result["verify_seconds"]
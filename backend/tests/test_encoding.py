@@ -0,0 +1,104 @@
+from datetime import datetime
+import pytest
+from unittest.mock import patch
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+import utils.encoding
+from utils.encoding import encode_json, format_datetime
+from utils.response import (
+    FastJSONResponse,
+    FastJSONRoute,
+    api_response,
+    astream_api_response,
+)
+
+ENVELOPE = api_response(
+    data=[
+        {
+            "id": "book-1",
+            "title": "Lập trình Python",
+            "summary": 'Quotes " and \\ slashes / and emoji 📚',
+            "cover_image": None,
+            "score": 1.5,
+            "highlights": {},
+            "count": 3,
+            "isAdmin": False,
+        }
+    ],
+    message="Success",
+)
+
+
+class TestEncoding:
+    """Tests cho encode_json / FastJSONResponse"""
+
+    def test_byte_compatible_with_json_response(self):
+        """Test FastJSONResponse cho ra đúng các byte của JSONResponse"""
+        assert FastJSONResponse(ENVELOPE).body == JSONResponse(ENVELOPE).body
+
+    def test_stdlib_fallback_same_bytes(self):
+        """Test khi không có orjson vẫn cho ra cùng byte"""
+        with patch.object(utils.encoding, "orjson", None):
+            fallback = encode_json(ENVELOPE)
+
+        assert fallback == encode_json(ENVELOPE)
+
+    def test_datetime_encoded_in_api_format(self):
+        """Test datetime được format khi encode, giống strftime cũ"""
+        created = datetime(2024, 1, 2, 3, 4, 5, 678901)
+
+        with patch.object(utils.encoding, "orjson", None):
+            fallback = encode_json({"create_At": created})
+
+        assert format_datetime(created) == created.strftime("%Y-%m-%d %H:%M:%S")
+        assert (
+            encode_json({"create_At": created})
+            == b'{"create_At":"2024-01-02 03:04:05"}'
+        )
+        assert fallback == b'{"create_At":"2024-01-02 03:04:05"}'
+
+    def test_fast_json_route(self):
+        """Test route class opt-in trả về FastJSONResponse cho cả endpoint sync và async"""
+        # Arrange
+        router = APIRouter(route_class=FastJSONRoute)
+
+        @router.get("/sync/{item_id}")
+        def sync_endpoint(item_id: str, q: str = ""):
+            return api_response(data={"id": item_id, "q": q})
+
+        @router.get("/async")
+        async def async_endpoint():
+            return api_response(data={"at": datetime(2024, 1, 1)})
+
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+
+        # Act
+        sync_response = client.get("/sync/abc?q=x")
+        async_response = client.get("/async")
+
+        # Assert
+        assert sync_response.json() == {
+            "status_code": 200,
+            "data": {"id": "abc", "q": "x"},
+        }
+        assert async_response.content == (
+            b'{"status_code":200,"data":{"at":"2024-01-01 00:00:00"}}'
+        )
+        assert client.get("/openapi.json").status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_async_stream_empty_matches_envelope(self):
+        """Test astream_api_response không có dòng nào trả về envelope giống bản không stream"""
+
+        async def no_rows():
+            return
+            yield
+
+        chunks = [c async for c in astream_api_response(no_rows(), empty_message="X")]
+
+        assert "".join(chunks) == encode_json(api_response(message="X")).decode()
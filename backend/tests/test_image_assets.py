@@ -0,0 +1,163 @@
+import io
+import pytest
+from unittest.mock import patch
+
+from PIL import Image
+
+from celery_temp import tasks
+from models.book.book_model import Book
+from models.image.image_asset_model import ImageAsset
+from models.profile.profile_model import Profile
+from models.user.user_model import User
+from repositories.sqlalchemy.book_repo_sqlalchemy import BookRepoSqlAlchemy
+from repositories.sqlalchemy.user_repo_sqlalchemy import UserRepoSqlAlchemy
+from utils.cache import image_cache
+from utils.image_assets import (
+    StoredImage,
+    acquire_image,
+    image_digest,
+    release_image,
+)
+
+
+def _jpeg(color: str) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+AVATAR = _jpeg("red")
+URL = f"https://res.cloudinary.com/test/image/upload/v1/Books_Project/{image_digest(AVATAR)}_large"
+
+
+def _rendition_url(data, public_id):
+    return f"https://res.cloudinary.com/test/image/upload/v1/Books_Project/{public_id}"
+
+
+@pytest.fixture
+def cloudinary():
+    image_cache.clear()
+    with patch(
+        "utils.cloudinary.upload_rendition", side_effect=_rendition_url
+    ) as upload, patch(
+        "utils.cloudinary.delete_image", return_value=True
+    ) as destroy, patch(
+        "utils.renditions.rendition_pool.workers", 0
+    ):
+        yield {"upload": upload, "delete": destroy}
+    image_cache.clear()
+
+
+class TestImageAssets:
+    """Tests cho dedup ảnh theo SHA-256 và đếm tham chiếu"""
+
+    def test_identical_bytes_upload_once(self, db_session, cloudinary):
+        """Test cùng nội dung chỉ render/upload 1 lần, các lần sau dùng lại URL và tăng ref_count"""
+        # Act
+        first = acquire_image(db_session, AVATAR)
+        image_cache.clear()  # the second lookup goes to the table
+        second = acquire_image(db_session, AVATAR)
+        third = acquire_image(db_session, AVATAR)  # served from the cache
+
+        # Assert
+        assert first == second == third
+        assert first.url == URL
+        assert first.thumb_url.endswith("_thumb")
+        assert cloudinary["upload"].call_count == 3  # one per rendition
+        asset = db_session.get(ImageAsset, image_digest(AVATAR))
+        assert asset.ref_count == 3
+
+    def test_destroys_only_at_last_reference(self, db_session, cloudinary):
+        """Test delete chỉ xoá asset khi tham chiếu cuối cùng bị bỏ"""
+        # Arrange
+        acquire_image(db_session, AVATAR)
+        acquire_image(db_session, AVATAR)
+
+        # Act & Assert
+        assert release_image(db_session, URL) is False
+        cloudinary["delete"].assert_not_called()
+        assert release_image(db_session, URL.replace("_large", "_medium")) is True
+        assert cloudinary["delete"].call_count == 3
+        assert cloudinary["delete"].call_args_list[0].args == (URL,)
+        assert db_session.query(ImageAsset).count() == 0
+
+    def test_reupload_after_destroy(self, db_session, cloudinary):
+        """Test asset đã bị xoá (còn trong cache) thì upload lại"""
+        acquire_image(db_session, AVATAR)
+        release_image(db_session, URL)
+        image_cache.set(image_digest(AVATAR), StoredImage(URL))
+
+        assert acquire_image(db_session, AVATAR).url == URL
+
+        assert cloudinary["upload"].call_count == 6
+        assert db_session.get(ImageAsset, image_digest(AVATAR)).ref_count == 1
+
+    def test_unindexed_url_is_deleted(self, db_session, cloudinary):
+        """Test URL upload trước khi có index (không có trong bảng) bị xoá như cũ"""
+        assert release_image(db_session, "https://res.cloudinary.com/old.jpg")
+
+        cloudinary["delete"].assert_called_once_with(
+            "https://res.cloudinary.com/old.jpg"
+        )
+
+    def test_shared_avatar_survives_other_user_change(self, db_session, cloudinary):
+        """Test 2 user dùng chung avatar: 1 user đổi avatar không xoá ảnh của user kia"""
+        # Arrange
+        for user_id in ("u1", "u2"):
+            db_session.add(
+                User(
+                    id=user_id,
+                    username=user_id,
+                    email=f"{user_id}@example.com",
+                    password="x",
+                    profile=Profile(),
+                )
+            )
+        db_session.commit()
+
+        # Act
+        with patch("celery_temp.tasks.SessionLocal", return_value=db_session):
+            tasks.update_profile_image("u1", AVATAR)
+            tasks.update_profile_image("u2", AVATAR)
+            tasks.update_profile_image("u1", _jpeg("blue"))
+
+        # Assert
+        assert cloudinary["upload"].call_count == 6
+        cloudinary["delete"].assert_not_called()
+        assert db_session.get(Profile, "u2").profile_Image == URL.replace(
+            "_large", "_medium"
+        )
+        assert db_session.get(ImageAsset, image_digest(AVATAR)).ref_count == 1
+
+    def test_deleting_books_and_users_releases_images(self, db_session, cloudinary):
+        """Test xoá sách/user giảm ref_count, asset bị xoá khi không còn tham chiếu"""
+        # Arrange
+        stored = [acquire_image(db_session, AVATAR) for _ in range(3)]
+        db_session.add_all(
+            [
+                Book(id="b1", title="A", author="X", user_id="u1", cover_image=URL),
+                Book(id="b2", title="B", author="X", user_id="u1", cover_image=URL),
+                User(
+                    id="u2",
+                    username="u2",
+                    email="u2@example.com",
+                    password="x",
+                    profile=Profile(profile_Image=stored[0].medium_url),
+                ),
+            ]
+        )
+        db_session.commit()
+
+        # Act & Assert
+        with patch("celery_temp.tasks.SessionLocal", return_value=db_session), patch(
+            "celery_temp.tasks.release_images.delay", side_effect=tasks.release_images
+        ):
+            BookRepoSqlAlchemy(db_session).delete_book("b1")
+            assert db_session.get(ImageAsset, image_digest(AVATAR)).ref_count == 2
+            UserRepoSqlAlchemy(db_session).delete_user("u2")
+            assert db_session.get(ImageAsset, image_digest(AVATAR)).ref_count == 1
+            cloudinary["delete"].assert_not_called()
+            BookRepoSqlAlchemy(db_session).delete_book("b2")
+
+        assert db_session.get(ImageAsset, image_digest(AVATAR)) is None
+        assert cloudinary["delete"].call_count == 3
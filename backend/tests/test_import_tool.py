@@ -0,0 +1,87 @@
+import importlib
+import io
+import json
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from database.mysql import Base
+from models import Book, Profile, User
+
+import_tool = importlib.import_module("tools.import")
+
+
+class TestImportTool:
+    """Tests cho CLI import hàng loạt (python -m tools.import)"""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+        Base.metadata.create_all(bind=engine)
+        yield engine
+        engine.dispose()
+
+    def _count(self, engine, model):
+        with engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(model)).scalar()
+
+    def test_import_books_resumes_from_checkpoint(self, engine, tmp_path):
+        """Test import sách JSONL, chạy lại tiếp tục từ checkpoint"""
+        # Arrange
+        source = tmp_path / "books.jsonl"
+        source.write_text(
+            "\n".join(
+                json.dumps(
+                    {
+                        "id": f"b{i}",
+                        "title": f"Book {i}",
+                        "author": "A",
+                        "user_id": "u1",
+                    }
+                )
+                for i in range(5)
+            )
+        )
+        checkpoint = tmp_path / "books.ckpt"
+        import_tool.save_checkpoint(str(checkpoint), str(source), "books", 3)
+
+        # Act
+        total = import_tool.run_import(
+            engine,
+            "books",
+            str(source),
+            batch_size=2,
+            commit_every=2,
+            checkpoint=str(checkpoint),
+            out=io.StringIO(),
+        )
+
+        # Assert
+        assert total == 5
+        assert self._count(engine, Book) == 2
+        assert json.loads(checkpoint.read_text())["rows"] == 5
+
+    def test_import_users_hashes_passwords(self, engine, tmp_path):
+        """Test import user CSV băm mật khẩu và tạo Profile"""
+        # Arrange
+        source = tmp_path / "users.csv"
+        source.write_text(
+            "username,email,password,isAdmin\n"
+            "alice,alice@example.com,secret1,true\n"
+            "bob,bob@example.com,$2b$12$alreadyhashedvalue,false\n"
+        )
+
+        # Act
+        import_tool.run_import(
+            engine, "users", str(source), workers=0, out=io.StringIO()
+        )
+
+        # Assert
+        with engine.connect() as conn:
+            passwords = dict(conn.execute(select(User.username, User.password)).all())
+            admins = conn.execute(
+                select(func.count()).select_from(Profile).where(Profile.isAdmin)
+            ).scalar()
+        assert passwords["alice"].startswith("$2b$")
+        assert passwords["bob"] == "$2b$12$alreadyhashedvalue"
+        assert admins == 1
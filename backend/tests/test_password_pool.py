@@ -0,0 +1,127 @@
+import os
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from middleware.auth import get_password_hash, verify_password
+from middleware.principal import load_user
+from concurrent.futures.process import BrokenProcessPool
+
+from middleware.password_pool import PasswordPool, PasswordPoolBusy
+from models.profile.profile_model import Profile
+from models.user.user_model import User
+from repositories.sqlalchemy.user_repo_sqlalchemy import UserRepoSqlAlchemy
+from schemas.user.user_schema import UserUpdate
+
+
+@pytest.fixture
+def pool():
+    pool = PasswordPool(workers=1, max_pending=1)
+    yield pool
+    pool.shutdown()
+
+
+class TestPasswordPool:
+    """Tests cho process pool bcrypt: giới hạn hàng đợi, từ chối nhanh, latency"""
+
+    def test_hash_and_verify_in_worker(self, pool):
+        """Test hash và verify chạy trong process worker, có đo latency"""
+        hashed = pool.call(get_password_hash, "secret123")
+
+        assert pool.call(verify_password, "secret123", hashed) is True
+        stats = pool.stats()
+        assert stats["calls"] == 2
+        assert stats["pending"] == 0
+        assert stats["latency_ms_max"] >= stats["latency_ms_avg"] > 0
+
+    @pytest.mark.asyncio
+    async def test_run_awaits_worker(self, pool):
+        """Test run() await được từ event loop"""
+        hashed = await pool.run(get_password_hash, "secret123")
+
+        assert verify_password("secret123", hashed)
+
+    def test_rejects_when_saturated(self, pool):
+        """Test đủ max_pending thì từ chối ngay, không xếp hàng"""
+        # Arrange
+        running = pool.submit(time.sleep, 0.5)
+
+        # Act
+        started = time.perf_counter()
+        with pytest.raises(PasswordPoolBusy):
+            pool.call(get_password_hash, "secret123")
+        rejected_after = time.perf_counter() - started
+        running.result()
+
+        # Assert
+        assert rejected_after < 0.1
+        assert pool.stats()["rejected"] == 1
+        assert pool.stats()["pending"] == 0
+
+    def test_recovers_from_dead_worker(self, pool):
+        """Test worker bị kill thì lần gọi sau tạo pool mới thay vì lỗi mãi"""
+        # Arrange
+        with pytest.raises(BrokenProcessPool):
+            pool.call(os._exit, 1)
+
+        # Act
+        hashed = pool.call(get_password_hash, "secret123")
+
+        # Assert
+        assert verify_password("secret123", hashed)
+        assert pool.stats()["pending"] == 0
+
+
+class TestUserRepoPasswordPool:
+    """Tests cho user repo dùng password pool"""
+
+    def test_login_busy_returns_503(self, db_session):
+        """Test pool quá tải thì login trả về 503 ngay"""
+        # Arrange
+        db_session.add(
+            User(
+                id="u1",
+                username="u",
+                email="u@example.com",
+                password="x",
+                profile=Profile(),
+            )
+        )
+        db_session.commit()
+        repo = UserRepoSqlAlchemy(db_session)
+
+        # Act
+        with patch(
+            "repositories.sqlalchemy.user_repo_sqlalchemy.password_pool.call",
+            side_effect=PasswordPoolBusy("busy"),
+        ):
+            result = repo.login(Mock(email="u@example.com", password="secret123"))
+
+        # Assert
+        assert result["status_code"] == 503
+
+    def test_update_user_hashes_password(self, db_session):
+        """Test đổi mật khẩu lưu bcrypt hash chứ không lưu mật khẩu thô"""
+        # Arrange
+        db_session.add(
+            User(
+                id="u1",
+                username="u",
+                email="u@example.com",
+                password="x",
+                profile=Profile(),
+            )
+        )
+        db_session.commit()
+        repo = UserRepoSqlAlchemy(db_session)
+
+        # Act
+        result = repo.update_user(
+            UserUpdate(password="new-secret"), load_user(db_session, "u1")
+        )
+
+        # Assert
+        assert result["status_code"] == 200
+        stored = db_session.get(User, "u1").password
+        assert stored != "new-secret"
+        assert verify_password("new-secret", stored)
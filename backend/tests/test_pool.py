@@ -0,0 +1,134 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from database.pool import InstrumentedQueuePool, instrument_engine, pool_stats
+from middleware.auth import create_access_token
+from models.profile.profile_model import Profile
+from models.user.user_model import User
+from database.session import get_db
+from main import app
+from tests.conftest import TestingSessionLocal, override_get_db
+
+
+@pytest.fixture
+def pool_engine(tmp_path):
+    """Engine SQLite file với pool 1 connection, không overflow"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    instrument_engine("test_pool", engine)
+    yield engine
+    engine.dispose()
+
+
+class TestInstrumentedPool:
+    """Tests cho pool có thống kê"""
+
+    def test_counts_checkouts_and_connects(self, pool_engine):
+        """Test đếm checkout/checkin và số connection thực tạo ra"""
+        # Act
+        for _ in range(3):
+            with pool_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        # Assert
+        stats = pool_stats()["test_pool"]
+        assert stats["checkouts"] == 3
+        assert stats["checkins"] == 3
+        assert stats["connects"] == 1
+        assert stats["checked_out"] == 0
+
+    def test_reports_checked_out_and_timeouts(self, pool_engine):
+        """Test pool hết connection: checked_out=1, checkout thứ hai timeout"""
+        # Arrange
+        conn = pool_engine.connect()
+
+        # Act
+        with pytest.raises(PoolTimeoutError):
+            pool_engine.connect()
+        stats = pool_stats()["test_pool"]
+        conn.close()
+
+        # Assert
+        assert stats["checked_out"] == 1
+        assert stats["timeouts"] == 1
+        assert stats["wait_ms_max"] >= 50
+
+    def test_stats_survive_dispose(self, pool_engine):
+        """Test engine.dispose() tạo pool mới nhưng vẫn giữ thống kê"""
+        with pool_engine.connect():
+            pass
+
+        pool_engine.dispose()
+        with pool_engine.connect():
+            pass
+
+        stats = pool_stats()["test_pool"]
+        assert stats["checkouts"] == 2
+        assert stats["connects"] == 2
+        assert stats["closes"] >= 1
+
+
+class TestInternalStatsRoute:
+    """Tests cho GET /internal/stats"""
+
+    def test_stats_admin(self, client, auth_token):
+        """Test admin xem được thống kê pool và cache"""
+        with patch("routes.internal.internal_route.is_admin", return_value=True):
+            response = client.get(
+                "/internal/stats", headers={"Authorization": auth_token}
+            )
+
+        data = response.json()["data"]
+        assert "primary" in data["pools"]
+        assert "hit_rate" in data["caches"]["books"]
+
+    def test_stats_non_admin(self, client, auth_token):
+        """Test non-admin bị từ chối"""
+        with patch("routes.internal.internal_route.is_admin", return_value=False):
+            response = client.get(
+                "/internal/stats", headers={"Authorization": auth_token}
+            )
+
+        assert response.json()["status_code"] == 401
+
+    def test_stats_demoted_admin_with_old_token(self, client):
+        """Test token cũ còn claim isAdmin nhưng profile trong DB không còn admin bị từ chối"""
+        # Arrange
+        with TestingSessionLocal() as db:
+            db.add(
+                User(
+                    id="u1",
+                    username="u",
+                    email="u@example.com",
+                    password="x",
+                    profile=Profile(isAdmin=False),
+                )
+            )
+            db.commit()
+
+        # Act
+        with patch("middleware.auth.SECRET_KEY", "test-secret"), patch.dict(
+            app.dependency_overrides, {get_db: override_get_db}
+        ):
+            token = create_access_token(
+                {"sub": "u@example.com", "id": "u1", "isAdmin": True}
+            )
+            response = client.get(
+                "/internal/stats", headers={"Authorization": f"Bearer {token}"}
+            )
+
+        # Assert
+        assert response.json()["status_code"] == 401
+
+    def test_stats_requires_token(self, client):
+        """Test không có token bị chặn bởi HTTPBearer"""
+        response = client.get("/internal/stats")
+
+        assert response.status_code == 403
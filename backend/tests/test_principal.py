@@ -0,0 +1,88 @@
+import pytest
+from unittest.mock import Mock, patch
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+from starlette.datastructures import State
+
+from middleware.auth import create_access_token
+from middleware.principal import get_principal, is_admin
+from models.profile.profile_model import Profile
+from models.user.user_model import User
+from tests.conftest import engine
+
+
+@pytest.fixture
+def user(db_session):
+    db_session.add(
+        User(
+            id="u1",
+            username="u",
+            email="u@example.com",
+            password="x",
+            profile=Profile(isAdmin=True),
+        )
+    )
+    db_session.commit()
+    db_session.expunge_all()
+
+
+@pytest.fixture
+def statements():
+    seen = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        seen.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield seen
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _credentials(token: str):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+class TestGetPrincipal:
+    """Tests cho dependency get_principal (một lần mỗi request)"""
+
+    @pytest.mark.asyncio
+    async def test_loads_user_and_profile_once(self, db_session, user, statements):
+        """Test token hợp lệ: nạp User + Profile bằng 1 query, cache trên request.state"""
+        # Arrange
+        request = Mock(state=State())
+        with patch("middleware.auth.SECRET_KEY", "test-secret"):
+            credentials = _credentials(create_access_token({"id": "u1"}))
+
+            # Act
+            principal = await get_principal(request, credentials, db_session)
+            again = await get_principal(request, credentials, db_session)
+
+        # Assert
+        assert again is principal
+        assert request.state.principal is principal
+        assert principal.profile.isAdmin is True
+        assert is_admin(principal)
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_resolves_to_none(self, db_session, statements):
+        """Test token không hợp lệ trả về None, không truy vấn DB"""
+        request = Mock(state=State())
+
+        principal = await get_principal(request, _credentials("bad"), db_session)
+
+        assert principal is None
+        assert not is_admin(principal)
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_resolves_to_none(self, db_session):
+        """Test token hợp lệ nhưng user đã bị xoá trả về None"""
+        request = Mock(state=State())
+        with patch("middleware.auth.SECRET_KEY", "test-secret"):
+            credentials = _credentials(create_access_token({"id": "gone"}))
+
+            principal = await get_principal(request, credentials, db_session)
+
+        assert principal is None
@@ -0,0 +1,138 @@
+import io
+import os
+import pytest
+
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image
+
+from models.book.book_model import Book
+from repositories.sqlalchemy.book_repo_sqlalchemy import BookRepoSqlAlchemy
+from utils.cache import book_cache
+from utils.renditions import RENDITION_SIZES, RenditionPool, render
+
+
+def _photo(size=(3000, 2000), orientation: int = None) -> bytes:
+    image = Image.new("RGB", size, "green")
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+class TestRender:
+    """Tests cho pipeline render: decode 1 lần, 3 kích thước, bỏ EXIF"""
+
+    def test_renders_every_size_as_webp(self):
+        """Test tạo thumb/medium/large WebP, cạnh dài đúng kích thước"""
+        # Act
+        renditions = render(_photo())
+
+        # Assert
+        assert [r.name for r in renditions] == ["large", "medium", "thumb"]
+        for rendition in renditions:
+            assert (
+                max(rendition.width, rendition.height)
+                == RENDITION_SIZES[rendition.name]
+            )
+            image = Image.open(io.BytesIO(rendition.data))
+            assert image.format == "WEBP"
+            assert not image.getexif()
+        assert len(renditions[-1].data) < len(renditions[0].data)
+
+    def test_applies_exif_orientation_and_never_upscales(self):
+        """Test xoay ảnh theo EXIF orientation và không phóng to ảnh nhỏ"""
+        renditions = render(_photo(size=(400, 200), orientation=6), image_format="JPEG")
+
+        large = renditions[0]
+        assert (large.width, large.height) == (200, 400)
+        assert not Image.open(io.BytesIO(large.data)).getexif()
+
+    def test_renders_in_worker_process(self, tmp_path):
+        """Test render chạy trong process pool, nguồn là path của file"""
+        # Arrange
+        path = tmp_path / "photo.jpg"
+        path.write_bytes(_photo())
+        pool = RenditionPool(workers=1)
+
+        # Act
+        try:
+            renditions = pool.render(str(path))
+        finally:
+            pool.shutdown()
+
+        # Assert
+        assert [r.name for r in renditions] == ["large", "medium", "thumb"]
+
+    def test_replaces_broken_pool(self, tmp_path):
+        """Test process render bị chết thì pool được tạo lại, upload sau vẫn chạy"""
+        # Arrange
+        path = tmp_path / "photo.jpg"
+        path.write_bytes(_photo())
+        pool = RenditionPool(workers=1)
+        crashed = pool._get_executor().submit(os._exit, 1)
+        with pytest.raises(BrokenProcessPool):
+            crashed.result()
+
+        # Act
+        try:
+            renditions = pool.render(str(path))
+        finally:
+            pool.shutdown()
+
+        # Assert
+        assert [r.name for r in renditions] == ["large", "medium", "thumb"]
+
+
+class TestCoverRenditions:
+    """Tests cho endpoint: danh sách trả về thumbnail, chi tiết trả về ảnh lớn"""
+
+    @pytest.fixture(autouse=True)
+    def books(self, db_session):
+        book_cache.clear()
+        db_session.add_all(
+            [
+                Book(
+                    id="b1",
+                    title="A",
+                    author="X",
+                    user_id="u1",
+                    cover_image="https://x/b1_large",
+                    cover_thumb="https://x/b1_thumb",
+                ),
+                Book(
+                    id="b2",
+                    title="B",
+                    author="Y",
+                    user_id="u1",
+                    cover_image="https://example.com/remote.jpg",
+                ),
+            ]
+        )
+        db_session.commit()
+        yield
+        book_cache.clear()
+
+    def test_list_serves_thumbnail(self, db_session):
+        """Test danh sách trả về thumbnail, sách không có rendition trả về ảnh gốc"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        books = {book["id"]: book for book in repo.get_books()["data"]}
+        only_cover = repo.get_books(fields="id,cover_image")["data"]
+
+        assert books["b1"]["cover_image"] == "https://x/b1_thumb"
+        assert books["b2"]["cover_image"] == "https://example.com/remote.jpg"
+        assert {"id": "b1", "cover_image": "https://x/b1_thumb"} in only_cover
+
+    def test_detail_serves_large(self, db_session):
+        """Test chi tiết và batch (cùng cache chi tiết) trả về ảnh lớn"""
+        repo = BookRepoSqlAlchemy(db_session)
+
+        detail = repo.get_book_with_ID("b1")["data"]
+        batch = repo.get_books_by_ids(["b1"])["data"]["books"]
+
+        assert detail["cover_image"] == "https://x/b1_large"
+        assert batch[0]["cover_image"] == "https://x/b1_large"
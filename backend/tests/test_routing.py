@@ -0,0 +1,223 @@
+import shutil
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from database.mysql import Base
+from celery_temp import tasks
+from middleware.principal import load_user
+from database.routing import ReplicaSet, RoutingSession
+from models.book.book_model import Book
+from models.profile.profile_model import Profile
+from models.user.user_model import User
+from repositories.sqlalchemy.book_repo_sqlalchemy import BookRepoSqlAlchemy
+
+
+def _book(book_id: str):
+    return Book(id=book_id, title=book_id, author="Author", user_id="user-1")
+
+
+@pytest.fixture
+def cluster(tmp_path):
+    """Primary SQLite + 2 replica là bản copy file, rồi primary có thêm 1 sách"""
+    primary_path = tmp_path / "primary.db"
+    primary = create_engine(f"sqlite:///{primary_path}")
+    Base.metadata.create_all(primary)
+    with sessionmaker(bind=primary)() as db:
+        db.add(_book("shared"))
+        db.commit()
+
+    replica_engines = []
+    for index in (1, 2):
+        path = tmp_path / f"replica{index}.db"
+        shutil.copy(primary_path, path)
+        replica_engines.append(create_engine(f"sqlite:///{path}"))
+    # Replication lag: only the primary has this row
+    with sessionmaker(bind=primary)() as db:
+        db.add(_book("primary-only"))
+        db.commit()
+
+    replicas = ReplicaSet(replica_engines, retry_after=60)
+    SessionTest = sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas)
+    yield primary, replicas, SessionTest
+    for engine in [primary, *replica_engines]:
+        engine.dispose()
+
+
+def _ids(db):
+    return set(db.scalars(select(Book.id)))
+
+
+class TestRoutingSession:
+    """Tests cho RoutingSession: đọc từ replica, ghi và read-your-writes ở primary"""
+
+    def test_reads_go_to_replica(self, cluster):
+        """Test SELECT được gửi tới replica (chưa có dòng primary-only)"""
+        _, _, SessionTest = cluster
+
+        with SessionTest() as db:
+            assert _ids(db) == {"shared"}
+
+    def test_round_robin(self, cluster):
+        """Test các replica được chọn luân phiên"""
+        _, replicas, _ = cluster
+
+        picked = [replicas.pick() for _ in range(4)]
+
+        assert picked == replicas.engines * 2
+
+    def test_session_keeps_its_replica(self, cluster):
+        """Test một session đọc từ cùng một replica, session mới chọn replica kế tiếp"""
+        # Arrange
+        _, replicas, SessionTest = cluster
+
+        # Act
+        with SessionTest() as db:
+            _ids(db)
+            first = db.replica
+            _ids(db)
+            kept = db.replica
+            replicas.mark_down(first)
+            _ids(db)
+            failed_over = db.replica
+        with SessionTest() as db:
+            _ids(db)
+            other = db.replica
+
+        # Assert
+        assert kept is first
+        assert failed_over is not first
+        assert other is failed_over
+        assert first in replicas.engines and failed_over in replicas.engines
+
+    def test_reads_after_write_stay_on_primary(self, cluster):
+        """Test sau khi ghi, session đọc từ primary (read-your-writes)"""
+        _, _, SessionTest = cluster
+
+        with SessionTest() as db:
+            db.add(_book("new"))
+            db.commit()
+            ids = _ids(db)
+
+        assert ids == {"shared", "primary-only", "new"}
+
+    def test_flush_without_commit_pins_primary(self, cluster):
+        """Test flush (chưa commit) cũng chuyển session sang primary"""
+        _, _, SessionTest = cluster
+
+        with SessionTest() as db:
+            db.add(_book("pending"))
+            db.flush()
+
+            assert "pending" in _ids(db)
+
+    def test_select_for_update_goes_to_primary(self, cluster):
+        """Test SELECT ... FOR UPDATE không được gửi tới replica"""
+        _, _, SessionTest = cluster
+
+        with SessionTest() as db:
+            ids = set(db.scalars(select(Book.id).with_for_update()))
+
+        assert "primary-only" in ids
+
+    def test_unhealthy_replica_is_skipped(self, cluster, tmp_path):
+        """Test replica lỗi kết nối bị loại, lần đọc sau dùng replica còn lại"""
+        # Arrange
+        primary, _, _ = cluster
+        broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+        healthy = create_engine(f"sqlite:///{tmp_path / 'replica2.db'}")
+        replicas = ReplicaSet([broken, healthy], retry_after=60)
+        SessionTest = sessionmaker(
+            bind=primary, class_=RoutingSession, replicas=replicas
+        )
+
+        # Act
+        with SessionTest() as db:
+            with pytest.raises(Exception):
+                _ids(db)
+        with SessionTest() as db:
+            ids = _ids(db)
+
+        # Assert
+        assert ids == {"shared"}
+        assert [replicas.pick() for _ in range(2)] == [healthy, healthy]
+        assert list(replicas.health().values()) == [False, True]
+
+    def test_all_replicas_down_falls_back_to_primary(self, cluster):
+        """Test tất cả replica đều lỗi thì đọc từ primary"""
+        _, replicas, SessionTest = cluster
+        for engine in replicas.engines:
+            replicas.mark_down(engine)
+
+        with SessionTest() as db:
+            assert "primary-only" in _ids(db)
+
+    def test_repository_reads_use_replica(self, cluster):
+        """Test repo dùng RoutingSession: đọc từ replica, ghi ở primary"""
+        _, _, SessionTest = cluster
+
+        with SessionTest() as db:
+            repo = BookRepoSqlAlchemy(db)
+            before = repo.get_book_with_ID("primary-only")
+            repo.delete_book("shared")
+            after = repo.get_books()
+
+        assert before["status_code"] == 404
+        assert [book["id"] for book in after["data"]] == ["primary-only"]
+
+    def test_tasks_read_from_primary(self, cluster):
+        """Test task Celery đọc sách/profile vừa tạo từ primary khi replica bị trễ"""
+        # Arrange
+        primary, _, SessionTest = cluster
+        with sessionmaker(bind=primary)() as db:
+            db.add(
+                User(
+                    id="user-new",
+                    username="new",
+                    email="new@example.com",
+                    password="x",
+                    profile=Profile(),
+                )
+            )
+            db.commit()
+
+        # Act
+        with patch("celery_temp.tasks.SessionLocal", SessionTest), patch(
+            "utils.cloudinary.upload_image", return_value="https://x/cover.jpg"
+        ):
+            tasks.upload_image_and_update_book(
+                "primary-only", "https://example.com/a.jpg"
+            )
+            tasks.update_profile_image("user-new", "https://example.com/b.jpg")
+
+        # Assert
+        with sessionmaker(bind=primary)() as db:
+            assert db.get(Book, "primary-only").cover_image == "https://x/cover.jpg"
+            assert db.get(Profile, "user-new").profile_Image == "https://x/cover.jpg"
+
+    def test_principal_loaded_from_primary(self, cluster):
+        """Test principal (user vừa đăng ký) đọc từ primary, các SELECT khác vẫn ở replica"""
+        # Arrange
+        primary, _, SessionTest = cluster
+        with sessionmaker(bind=primary)() as db:
+            db.add(
+                User(
+                    id="user-new",
+                    username="new",
+                    email="new@example.com",
+                    password="x",
+                    profile=Profile(),
+                )
+            )
+            db.commit()
+
+        # Act
+        with SessionTest() as db:
+            principal = load_user(db, "user-new")
+            ids = _ids(db)
+
+        # Assert
+        assert principal.id == "user-new"
+        assert principal.profile is not None
+        assert ids == {"shared"}
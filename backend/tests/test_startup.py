@@ -0,0 +1,140 @@
+import io
+import subprocess
+import sys
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+
+import main
+from models.book.book_model import Book
+from repositories.sqlalchemy.book_repo_sqlalchemy import BookRepoSqlAlchemy
+from tools import importtime, schema
+
+
+class TestStartup:
+    """Tests cho khởi động app: không DDL lúc import, import lười"""
+
+    def test_import_skips_heavy_integrations(self):
+        """Test import main không kết nối DB và không nạp celery/cloudinary/loguru"""
+        code = (
+            "import sys, main; "
+            "print(sorted(m for m in ('celery', 'cloudinary', 'loguru', 'redis') "
+            "if m in sys.modules))"
+        )
+
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "[]"
+
+    def test_lifespan_phases(self):
+        """Test lifespan chạy phase schema khi bật DB_CREATE_TABLES và ghi thời gian"""
+        with patch.object(main, "DB_CREATE_TABLES", True), patch.object(
+            main, "create_all_tables"
+        ) as mock_create, patch.object(main, "dispose") as mock_dispose:
+            with TestClient(main.app):
+                timings = main.app.state.startup_timings
+
+        mock_create.assert_called_once_with(main.engine)
+        mock_dispose.assert_called_once()
+        assert "schema_ms" in timings
+        assert "pool_warmup_ms" not in timings
+
+    def test_schema_cli_create_and_drop(self, tmp_path):
+        """Test python -m tools.schema create/drop trên SQLite"""
+        # Arrange
+        url = f"sqlite:///{tmp_path / 'schema.db'}"
+        engine = create_engine(url)
+
+        # Act
+        schema.main(["create", "--database-url", url], out=io.StringIO())
+        created = set(inspect(engine).get_table_names())
+        schema.main(["drop", "--yes", "--database-url", url], out=io.StringIO())
+        dropped = set(inspect(engine).get_table_names())
+
+        # Assert
+        assert {"Users", "Books", "Profile"} <= created
+        assert not {"Users", "Books", "Profile"} & dropped
+
+    def test_schema_cli_migrate_adds_missing_indexes(self, tmp_path):
+        """Test migrate tạo index còn thiếu trên bảng đã tồn tại, chạy lại không lỗi"""
+        # Arrange
+        url = f"sqlite:///{tmp_path / 'schema.db'}"
+        engine = create_engine(url)
+        schema.main(["create", "--database-url", url], out=io.StringIO())
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX ix_books_create_at_id")
+            conn.exec_driver_sql("DROP INDEX ix_books_user_id_create_at")
+            conn.exec_driver_sql("DROP INDEX ix_profile_create_at_id")
+
+        # Act
+        out = io.StringIO()
+        schema.main(["migrate", "--database-url", url], out=out)
+        again = schema.migrate(engine)
+
+        # Assert
+        indexes = {
+            index["name"]
+            for table in ("Books", "Profile")
+            for index in inspect(engine).get_indexes(table)
+        }
+        for name in (
+            "ix_books_create_at_id",
+            "ix_books_user_id_create_at",
+            "ix_profile_create_at_id",
+        ):
+            assert name in indexes
+            assert name in out.getvalue()
+        assert again == []
+        engine.dispose()
+
+    def test_search_on_table_built_without_index(self, tmp_path):
+        """Test bảng Books tạo trước khi có search: lỗi trước migrate, tìm được sau migrate"""
+        # Arrange
+        url = f"sqlite:///{tmp_path / 'schema.db'}"
+        engine = create_engine(url)
+        schema.main(["create", "--database-url", url], out=io.StringIO())
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE books_fts")
+            for trigger in ("books_fts_ai", "books_fts_ad", "books_fts_au"):
+                conn.exec_driver_sql(f"DROP TRIGGER {trigger}")
+        with Session(engine) as db:
+            db.add(Book(id="b1", title="Learning Python", author="A", user_id="u1"))
+            db.commit()
+
+        # Act
+        with Session(engine) as db:
+            before = BookRepoSqlAlchemy(db).search_books("python")
+        created = schema.migrate(engine)
+        with Session(engine) as db:
+            after = BookRepoSqlAlchemy(db).search_books("python")
+
+        # Assert
+        assert "no such table" in before["error"]
+        assert created == ["books_fts"]
+        assert [book["id"] for book in after["data"]["books"]] == ["b1"]
+        engine.dispose()
+
+    def test_importtime_digest(self):
+        """Test phân tích output -X importtime"""
+        lines = [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |   json.decoder",
+            "import time:       300 |        400 | json",
+            "import time:      1000 |       5000 | main",
+            "import time:      4000 |       4000 |   fastapi",
+        ]
+
+        report = importtime.digest(importtime.parse_importtime(lines), top=2)
+
+        assert report["total_ms"] == 5.4
+        assert report["modules"] == 4
+        assert [entry["module"] for entry in report["cumulative"]] == [
+            "main",
+            "fastapi",
+        ]
+        assert report["self"][0] == {"module": "fastapi", "ms": 4.0}
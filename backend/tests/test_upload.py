@@ -0,0 +1,135 @@
+import io
+import pytest
+from unittest.mock import Mock, patch
+
+from starlette.datastructures import UploadFile
+
+from models.book.book_model import Book
+from repositories.sqlalchemy.book_repo_sqlalchemy import BookRepoSqlAlchemy
+from repositories.sqlalchemy.user_repo_sqlalchemy import UserRepoSqlAlchemy
+from schemas.book.book_schema import BookCreate
+from utils.blob_store import BlobStore, is_blob_ref
+from utils.upload import UploadRejected, read_image_upload, sniff_image_type
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 100
+
+
+def _upload(content: bytes, size=None):
+    return UploadFile(io.BytesIO(content), size=size, filename="image.jpg")
+
+
+class TestReadImageUpload:
+    """Tests cho read_image_upload: đọc theo chunk, giới hạn dung lượng, sniff magic bytes"""
+
+    def test_sniff_image_type(self):
+        """Test nhận diện JPEG/PNG theo magic bytes"""
+        assert sniff_image_type(JPEG) == "image/jpeg"
+        assert sniff_image_type(PNG) == "image/png"
+        assert sniff_image_type(b"GIF89a") is None
+
+    @pytest.mark.asyncio
+    async def test_spools_image_in_chunks(self):
+        """Test copy ảnh vào file tạm theo chunk, trả về handle đã rewind"""
+        # Act
+        upload = await read_image_upload(_upload(PNG), chunk_size=16)
+
+        # Assert
+        assert upload.content_type == "image/png"
+        assert upload.size == len(PNG)
+        assert upload.file.read() == PNG
+        upload.file.close()
+
+    @pytest.mark.asyncio
+    async def test_rejects_past_budget_without_reading_rest(self):
+        """Test vượt giới hạn thì dừng đọc ngay, không đọc hết file"""
+        # Arrange
+        source = _upload(JPEG + b"\x00" * 1000)
+
+        # Act
+        with pytest.raises(UploadRejected) as exc:
+            await read_image_upload(source, max_bytes=200, chunk_size=64)
+
+        # Assert
+        assert exc.value.error == "File size exceeds the limit"
+        assert source.file.tell() <= 256
+
+    @pytest.mark.asyncio
+    async def test_rejects_declared_size_before_reading(self):
+        """Test size Starlette đã ghi nhận vượt giới hạn thì từ chối, không đọc byte nào"""
+        source = _upload(JPEG, size=10 * 1024 * 1024)
+
+        with pytest.raises(UploadRejected):
+            await read_image_upload(source)
+
+        assert source.file.tell() == 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_image_despite_content_type(self):
+        """Test không tin Content-Type của client: nội dung không phải JPEG/PNG bị từ chối"""
+        with pytest.raises(UploadRejected) as exc:
+            await read_image_upload(_upload(b"not an image"))
+
+        assert exc.value.message == "Only JPEG and PNG files are allowed"
+
+    @pytest.mark.asyncio
+    async def test_rejects_empty_file(self):
+        """Test file rỗng bị từ chối"""
+        with pytest.raises(UploadRejected) as exc:
+            await read_image_upload(_upload(b""))
+
+        assert exc.value.error == "Empty file uploaded"
+
+
+class TestRepoUploadIntake:
+    """Tests cho repo: ảnh được kiểm tra trước khi ghi DB / queue task"""
+
+    @pytest.mark.asyncio
+    async def test_invalid_image_creates_no_book(self, db_session, mock_celery_task):
+        """Test ảnh không hợp lệ trả về 400 và không tạo sách"""
+        # Arrange
+        repo = BookRepoSqlAlchemy(db_session)
+        book = BookCreate(title="A", author="X", caption="c", summary="s")
+
+        # Act
+        result = await repo.create_book(
+            book, _upload(b"not an image"), Mock(id="user-1")
+        )
+
+        # Assert
+        assert result["status_code"] == 400
+        assert result["error"] == "Invalid file type"
+        assert db_session.query(Book).count() == 0
+        mock_celery_task["book"].assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_valid_image_queues_cover(
+        self, db_session, mock_celery_task, tmp_path
+    ):
+        """Test ảnh hợp lệ: tạo sách, ảnh được stage và task chỉ nhận reference"""
+        repo = BookRepoSqlAlchemy(db_session)
+        book = BookCreate(title="A", author="X", caption="c", summary="s")
+        store = BlobStore(str(tmp_path), ttl=60)
+
+        with patch("celery_temp.dispatch.blob_store", store):
+            result = await repo.create_book(book, _upload(JPEG), Mock(id="user-1"))
+
+        assert result["message"] == "Book created successfully"
+        book_id, ref = mock_celery_task["book"].call_args.args
+        assert book_id == db_session.query(Book).one().id
+        assert is_blob_ref(ref)
+        with store.open(ref) as staged:
+            assert staged.read() == JPEG
+
+    @pytest.mark.asyncio
+    async def test_profile_image_too_large(self, db_session, mock_celery_task):
+        """Test ảnh profile quá lớn trả về 400, không queue task"""
+        repo = UserRepoSqlAlchemy(db_session)
+
+        result = await repo.update_user_image(
+            "user-1", _upload(JPEG, size=6 * 1024 * 1024)
+        )
+
+        assert result["status_code"] == 400
+        assert result["message"] == "File size should be less than 5MB"
+        mock_celery_task["profile"].assert_not_called()
@@ -0,0 +1,250 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from sqlalchemy import event
+
+from middleware.principal import load_user
+from models.book.book_model import Book
+from models.profile.profile_model import Profile
+from models.user.user_model import User
+from repositories.sqlalchemy.user_queries import (
+    MAX_EMBEDDED_BOOKS,
+    PROFILE_BOOKS_PREVIEW,
+)
+from repositories.sqlalchemy.user_repo_sqlalchemy import UserRepoSqlAlchemy
+from tests.conftest import engine
+
+
+@pytest.fixture
+def seeded_users(db_session):
+    """5 user (2 user cuối trùng create_At), mỗi user có i + 1 sách"""
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    for i in range(5):
+        user_id = f"user-{i}"
+        db_session.add(
+            User(
+                id=user_id,
+                username=f"user{i}",
+                email=f"user{i}@example.com",
+                password="hashed",
+                profile=Profile(create_At=base + timedelta(minutes=min(i, 3))),
+                books=[
+                    Book(
+                        id=f"{user_id}-book-{j}",
+                        title=f"Book {j}",
+                        author="Author",
+                        create_At=base + timedelta(minutes=j),
+                    )
+                    for j in range(i + 1)
+                ],
+            )
+        )
+    db_session.commit()
+    db_session.expunge_all()
+
+
+@pytest.fixture
+def heavy_uploader(db_session):
+    """1 user có 8 sách"""
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    db_session.add(
+        User(
+            id="heavy",
+            username="heavy",
+            email="heavy@example.com",
+            password="hashed",
+            profile=Profile(),
+            books=[
+                Book(
+                    id=f"book-{j}",
+                    title=f"Book {j}",
+                    author="Author",
+                    create_At=base + timedelta(minutes=j),
+                )
+                for j in range(8)
+            ],
+        )
+    )
+    db_session.commit()
+    db_session.expunge_all()
+
+
+@pytest.fixture
+def statements():
+    """Ghi lại các câu SQL được gửi tới engine test"""
+    seen = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        seen.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield seen
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def admin():
+    """Principal có quyền admin"""
+    return Mock(id="admin", profile=Mock(isAdmin=True))
+
+
+class TestGetAllUsers:
+    """Tests cho danh sách user của admin: keyset pagination, không N+1"""
+
+    def test_pages_walk_all_users(self, db_session, seeded_users, admin):
+        """Test duyệt hết các trang theo Profile.create_At, tie-break theo id"""
+        # Arrange
+        repo = UserRepoSqlAlchemy(db_session)
+        seen, cursor = [], ""
+
+        # Act
+        while cursor is not None:
+            result = repo.get_all_users(admin, cursor, 2)
+            seen.extend(user["id"] for user in result["data"]["users"])
+            cursor = result["data"]["next_cursor"]
+
+        # Assert
+        assert seen == ["user-4", "user-3", "user-2", "user-1", "user-0"]
+
+    def test_constant_queries_per_page(
+        self, db_session, seeded_users, admin, statements
+    ):
+        """Test một trang chỉ tốn 1 query (2 khi kèm sách), bất kể số user"""
+        # Arrange
+        repo = UserRepoSqlAlchemy(db_session)
+
+        # Act
+        without_books = repo.get_all_users(admin, None, 5)
+        count_without_books = len(statements)
+        with_books = repo.get_all_users(admin, None, 5, 2)
+
+        # Assert
+        assert count_without_books == 1
+        assert len(statements) == 3
+        users = without_books["data"]["users"]
+        assert users[0]["profile"]["email"] == "user4@example.com"
+        assert "books" not in users[0]
+        books = {user["id"]: user["books"] for user in with_books["data"]["users"]}
+        assert [book["id"] for book in books["user-4"]] == [
+            "user-4-book-4",
+            "user-4-book-3",
+        ]
+        assert [book["id"] for book in books["user-0"]] == ["user-0-book-0"]
+
+    def test_embedded_books_are_capped(self, db_session, seeded_users, admin):
+        """Test số sách nhúng cho mỗi user bị giới hạn bởi MAX_EMBEDDED_BOOKS"""
+        repo = UserRepoSqlAlchemy(db_session)
+
+        with patch(
+            "repositories.sqlalchemy.user_repo_sqlalchemy.MAX_EMBEDDED_BOOKS", 1
+        ):
+            result = repo.get_all_users(admin, None, 5, MAX_EMBEDDED_BOOKS)
+
+        assert all(len(user["books"]) == 1 for user in result["data"]["users"])
+
+    def test_non_admin_rejected(self, db_session):
+        """Test user không phải admin nhận 401"""
+        repo = UserRepoSqlAlchemy(db_session)
+
+        result = repo.get_all_users(Mock(profile=Mock(isAdmin=False)))
+
+        assert result["status_code"] == 401
+        assert repo.get_all_users(None)["status_code"] == 401
+
+    def test_invalid_cursor(self, db_session, admin):
+        """Test cursor sai định dạng trả về 400"""
+        repo = UserRepoSqlAlchemy(db_session)
+
+        assert repo.get_all_users(admin, "###")["status_code"] == 400
+
+
+class TestProfileSummary:
+    """Tests cho profile dạng tóm tắt: book_count + sách mới nhất"""
+
+    def test_default_is_full_profile(self, db_session, heavy_uploader):
+        """Test không truyền view thì trả về profile đầy đủ kèm toàn bộ sách như cũ"""
+        # Arrange
+        repo = UserRepoSqlAlchemy(db_session)
+        principal = load_user(db_session, "heavy")
+
+        # Act
+        by_id = repo.get_user_by_id("heavy")["data"]
+        profile = repo.get_profile(principal)["data"]
+
+        # Assert
+        for data in (by_id, profile):
+            assert len(data["books"]) == 8
+            assert "book_count" not in data
+            assert "next_cursor" not in data
+        assert repo.get_user_by_id("missing")["status_code"] == 404
+
+    def test_summary_counts_and_previews_books(
+        self, db_session, heavy_uploader, statements
+    ):
+        """Test profile trả book_count và PROFILE_BOOKS_PREVIEW sách mới nhất, 2 query"""
+        # Arrange
+        repo = UserRepoSqlAlchemy(db_session)
+
+        # Act
+        result = repo.get_user_by_id("heavy", view="summary")
+
+        # Assert
+        data = result["data"]
+        assert len(statements) == 2
+        assert data["book_count"] == 8
+        assert data["profile"]["email"] == "heavy@example.com"
+        assert [book["id"] for book in data["books"]] == [
+            f"book-{j}" for j in range(7, 7 - PROFILE_BOOKS_PREVIEW, -1)
+        ]
+
+    def test_include_books_pages_full_list(self, db_session, heavy_uploader):
+        """Test ?include=books duyệt hết sách theo cursor"""
+        # Arrange
+        repo = UserRepoSqlAlchemy(db_session)
+        seen, cursor = [], ""
+
+        # Act
+        while cursor is not None:
+            result = repo.get_user_by_id("heavy", "books", cursor, 3)
+            seen.extend(book["id"] for book in result["data"]["books"])
+            cursor = result["data"]["next_cursor"]
+
+        # Assert
+        assert seen == [f"book-{j}" for j in range(7, -1, -1)]
+
+    def test_get_profile_for_principal(self, db_session, heavy_uploader, statements):
+        """Test get_profile dùng principal có sẵn, không tìm lại user"""
+        # Arrange
+        repo = UserRepoSqlAlchemy(db_session)
+        principal = load_user(db_session, "heavy")
+        statements.clear()
+
+        # Act
+        result = repo.get_profile(principal, view="summary")
+
+        # Assert
+        assert result["data"]["id"] == "heavy"
+        assert result["data"]["book_count"] == 8
+        assert len(statements) == 2
+        assert repo.get_profile(None)["status_code"] == 401
+
+    def test_user_without_books(self, db_session, seeded_users):
+        """Test user chưa có sách (không có profile) vẫn trả về book_count = 0"""
+        db_session.add(User(id="empty", username="e", email="e@e.com", password="x"))
+        db_session.commit()
+        repo = UserRepoSqlAlchemy(db_session)
+
+        result = repo.get_user_by_id("empty", view="summary")
+
+        assert result["data"]["book_count"] == 0
+        assert result["data"]["books"] == []
+        assert result["data"]["profile"] is None
+
+    def test_unknown_include_and_missing_user(self, db_session):
+        """Test include/view không hỗ trợ trả 400, user không tồn tại trả 404"""
+        repo = UserRepoSqlAlchemy(db_session)
+
+        assert repo.get_user_by_id("heavy", "friends")["status_code"] == 400
+        assert repo.get_user_by_id("heavy", view="compact")["status_code"] == 400
+        assert repo.get_user_by_id("missing")["status_code"] == 404
@@ -129,6 +129,31 @@ class TestUserRoutes:
             assert data["message"] == "Success"
             assert data["data"]["username"] == "testuser"
 
+    def test_get_profile_etag_not_modified(self, client, auth_token):
+        """Test API profile trả về 304 khi If-None-Match khớp ETag, chỉ cache riêng theo token"""
+        with patch(
+            "services.user.user_service.UserService.get_profile"
+        ) as mock_get_profile:
+            mock_get_profile.return_value = {
+                "status_code": 200,
+                "data": {"id": "user-123"},
+                "message": "Success",
+            }
+            first = client.get("/users/profile", headers={"Authorization": auth_token})
+
+            response = client.get(
+                "/users/profile",
+                headers={
+                    "Authorization": auth_token,
+                    "If-None-Match": "W/" + first.headers["etag"],
+                },
+            )
+
+            assert response.status_code == 304
+            for headers in (first.headers, response.headers):
+                assert headers["cache-control"] == "private"
+                assert headers["vary"] == "Authorization"
+
     def test_get_profile_unauthorized(self, client):
         """Test API lấy profile không có token"""
         # Act
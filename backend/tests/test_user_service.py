@@ -165,7 +165,9 @@ class TestUserService:
         result = user_service.get_all_users(mock_credentials)
 
         # Assert
-        mock_user_repo.get_all_users.assert_called_once_with(mock_credentials)
+        mock_user_repo.get_all_users.assert_called_once_with(
+            mock_credentials, None, 20, 0
+        )
         assert result == expected_result
         assert result["status_code"] == 200
         assert len(result["data"]) == 2
@@ -187,7 +189,9 @@ class TestUserService:
         result = user_service.get_all_users(mock_credentials)
 
         # Assert
-        mock_user_repo.get_all_users.assert_called_once_with(mock_credentials)
+        mock_user_repo.get_all_users.assert_called_once_with(
+            mock_credentials, None, 20, 0
+        )
         assert result == expected_result
         assert result["status_code"] == 401
         assert "Only ADMIN can access" in result["message"]
@@ -211,7 +215,9 @@ class TestUserService:
         result = user_service.get_profile(mock_credentials)
 
         # Assert
-        mock_user_repo.get_profile.assert_called_once_with(mock_credentials)
+        mock_user_repo.get_profile.assert_called_once_with(
+            mock_credentials, None, None, 20, None
+        )
         assert result == expected_result
         assert result["status_code"] == 200
         assert result["data"]["username"] == "testuser"
@@ -233,7 +239,9 @@ class TestUserService:
         result = user_service.get_profile(mock_credentials)
 
         # Assert
-        mock_user_repo.get_profile.assert_called_once_with(mock_credentials)
+        mock_user_repo.get_profile.assert_called_once_with(
+            mock_credentials, None, None, 20, None
+        )
         assert result == expected_result
         assert result["status_code"] == 401
         assert result["error"] == "Invalid token"
@@ -258,7 +266,9 @@ class TestUserService:
         result = user_service.get_user_by_id(user_id)
 
         # Assert
-        mock_user_repo.get_user_by_id.assert_called_once_with(user_id)
+        mock_user_repo.get_user_by_id.assert_called_once_with(
+            user_id, None, None, 20, None
+        )
         assert result == expected_result
         assert result["status_code"] == 200
         assert result["data"]["id"] == user_id
@@ -279,7 +289,9 @@ class TestUserService:
         result = user_service.get_user_by_id(user_id)
 
         # Assert
-        mock_user_repo.get_user_by_id.assert_called_once_with(user_id)
+        mock_user_repo.get_user_by_id.assert_called_once_with(
+            user_id, None, None, 20, None
+        )
         assert result == expected_result
         assert result["status_code"] == 404
         assert result["error"] == "User not found"
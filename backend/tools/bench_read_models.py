@@ -0,0 +1,111 @@
+"""Benchmark the book list read path: ORM ``Book.to_dict()`` vs BookRead rows.
+
+    python -m tools.bench_read_models
+    python -m tools.bench_read_models --sizes 1000 10000 --repeat 5
+
+Each size is seeded into an in-memory SQLite database, then both paths load
+and serialize every row in a fresh Session. Time is the best of ``--repeat``
+runs; peak memory is measured in a separate tracemalloc run.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from database.mysql import Base
+from models.book.book_model import Book
+from repositories.sqlalchemy import book_queries
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def seed(engine, size: int):
+    base = datetime(2024, 1, 1)
+    rows = [
+        {
+            "id": f"book-{i:07d}",
+            "title": f"Book title {i}",
+            "author": f"Author {i % 500}",
+            "caption": "A caption of typical length for a book card",
+            "summary": "A summary sentence that is a bit longer than the caption " * 2,
+            "cover_image": f"https://res.cloudinary.com/demo/image/upload/{i}.jpg",
+            "user_id": f"user-{i % 1000}",
+            "create_At": base + timedelta(seconds=i),
+        }
+        for i in range(size)
+    ]
+    with engine.begin() as conn:
+        conn.execute(Book.__table__.delete())
+        conn.execute(insert(Book), rows)
+
+
+def orm_path(db: Session):
+    books = db.query(Book).order_by(Book.create_At.desc(), Book.id.desc()).all()
+    return [book.to_dict() for book in books]
+
+
+def read_model_path(db: Session):
+    stmt, serialize = book_queries.select_books()
+    return [serialize(row) for row in db.execute(book_queries.newest_first(stmt))]
+
+
+PATHS = (("orm to_dict", orm_path), ("read model", read_model_path))
+
+
+def measure(engine, path, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        with Session(engine) as db:
+            started = time.perf_counter()
+            path(db)
+            best = min(best, time.perf_counter() - started)
+    with Session(engine) as db:
+        tracemalloc.start()
+        try:
+            path(db)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def run(sizes=DEFAULT_SIZES, repeat: int = 3, out=sys.stdout):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    results = []
+    print(f"{'rows':>8}  {'path':<12} {'time ms':>10} {'peak MiB':>10}", file=out)
+    for size in sizes:
+        seed(engine, size)
+        for name, path in PATHS:
+            seconds, peak = measure(engine, path, repeat)
+            results.append(
+                {"rows": size, "path": name, "seconds": seconds, "peak_bytes": peak}
+            )
+            print(
+                f"{size:>8}  {name:<12} {seconds * 1000:>10.1f} "
+                f"{peak / 2**20:>10.1f}",
+                file=out,
+            )
+    engine.dispose()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.bench_read_models",
+        description=__doc__.splitlines()[0],
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark the verified-JWT cache: full HS256 verification vs a cache hit.
+
+    python -m tools.bench_token_cache
+    python -m tools.bench_token_cache --number 20000 --decodes 3
+
+``--decodes`` is how many times one request checks its token (route,
+check_admin, repository); the saving per request is that many verifications
+minus one, since the first check still verifies and fills the cache.
+"""
+
+import argparse
+import sys
+import time
+from unittest.mock import patch
+
+import middleware.auth
+from middleware.auth import create_access_token, decode_access_token
+from utils.cache import token_cache
+
+BENCH_SECRET = "bench-secret"
+
+
+def per_call(func, token: str, number: int, repeat: int):
+    """Best-of-`repeat` seconds per call of ``func(token)``."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func(token)
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def uncached(token: str):
+    token_cache.clear()
+    return decode_access_token(token)
+
+
+def run(number: int = 10000, repeat: int = 5, decodes: int = 3, out=sys.stdout):
+    with patch.object(middleware.auth, "SECRET_KEY", BENCH_SECRET):
+        token = create_access_token(
+            {"sub": "bench@example.com", "id": "bench-user", "isAdmin": True}
+        )
+        miss = per_call(uncached, token, number, repeat)
+        token_cache.clear()
+        decode_access_token(token)
+        hit = per_call(decode_access_token, token, number, repeat)
+    token_cache.clear()
+    saved = (miss - hit) * (decodes - 1)
+    result = {"verify_seconds": miss, "hit_seconds": hit, "saved_per_request": saved}
+    print(f"verify + decode   {miss * 1e6:>8.2f} us/call", file=out)
+    print(f"cache hit         {hit * 1e6:>8.2f} us/call", file=out)
+    print(
+        f"saved per request {saved * 1e6:>8.2f} us ({decodes} token checks)",
+        file=out,
+    )
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.bench_token_cache",
+        description=__doc__.splitlines()[0],
+    )
+    parser.add_argument("--number", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--decodes", type=int, default=3)
+    args = parser.parse_args(argv)
+    run(args.number, args.repeat, args.decodes)
+
+
+if __name__ == "__main__":
+    main()
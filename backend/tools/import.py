@@ -0,0 +1,224 @@
+"""Offline bulk import of books or users from CSV / JSONL files.
+
+    python -m tools.import books books.jsonl --checkpoint books.ckpt
+    python -m tools.import users users.csv --workers 8 --commit-every 50000
+
+Rows are streamed from the file, inserted with Core executemany chunks and
+committed every ``--commit-every`` rows. After each commit the number of
+consumed rows is written to the checkpoint file, and re-running the same
+command resumes from there. Plain-text passwords are bcrypt-hashed in a
+process pool; values that already look like bcrypt hashes are kept as is.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import create_engine, insert
+
+from middleware.auth import get_password_hash
+from models import Book, Profile, User
+
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+TRUE_VALUES = ("1", "true", "yes", "y")
+
+
+def iter_records(path: str, fmt: str = None):
+    """Yield one dict per CSV row / JSONL line without loading the file."""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _parse_datetime(value):
+    if not value:
+        return datetime.utcnow()
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in TRUE_VALUES
+
+
+def book_rows(records):
+    rows = [
+        {
+            "id": record.get("id") or str(uuid.uuid4()),
+            "title": record["title"],
+            "author": record["author"],
+            "caption": record.get("caption"),
+            "summary": record.get("summary"),
+            "cover_image": record.get("cover_image") or None,
+            "user_id": record["user_id"],
+            "create_At": _parse_datetime(record.get("create_At")),
+        }
+        for record in records
+    ]
+    return [(Book.__table__, rows)]
+
+
+def user_rows(records, pool=None):
+    passwords = [record["password"] for record in records]
+    to_hash = [i for i, p in enumerate(passwords) if not p.startswith(BCRYPT_PREFIXES)]
+    plain = [passwords[i] for i in to_hash]
+    hashed = (
+        pool.map(get_password_hash, plain, chunksize=max(len(plain) // 32, 1))
+        if pool
+        else map(get_password_hash, plain)
+    )
+    for i, value in zip(to_hash, hashed):
+        passwords[i] = value
+
+    users, profiles = [], []
+    for record, password in zip(records, passwords):
+        user_id = record.get("id") or str(uuid.uuid4())
+        users.append(
+            {
+                "id": user_id,
+                "username": record["username"],
+                "email": record["email"],
+                "password": password,
+            }
+        )
+        profiles.append(
+            {
+                "profile_id": user_id,
+                "isAdmin": _parse_bool(record.get("isAdmin")),
+                "isAuthor": _parse_bool(record.get("isAuthor")),
+                "profile_Image": record.get("profile_Image") or None,
+                "create_At": _parse_datetime(record.get("create_At")),
+            }
+        )
+    # Profiles reference Users, so Users go first
+    return [(User.__table__, users), (Profile.__table__, profiles)]
+
+
+def load_checkpoint(path: str, source: str, kind: str) -> int:
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("source") != source or state.get("kind") != kind:
+        raise SystemExit(f"Checkpoint {path} belongs to another import")
+    return int(state["rows"])
+
+
+def save_checkpoint(path: str, source: str, kind: str, rows: int):
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"source": source, "kind": kind, "rows": rows}, f)
+    os.replace(tmp, path)
+
+
+def run_import(
+    engine,
+    kind: str,
+    path: str,
+    fmt: str = None,
+    batch_size: int = 1000,
+    commit_every: int = 10000,
+    workers: int = None,
+    checkpoint: str = None,
+    out=sys.stderr,
+):
+    """Import ``path`` into ``engine``; returns the total rows consumed."""
+    source = os.path.abspath(path)
+    done = load_checkpoint(checkpoint, source, kind)
+    records = islice(iter_records(path, fmt), done, None)
+    if done:
+        print(f"Resuming {kind} import after {done} rows", file=out)
+
+    pool = ProcessPoolExecutor(workers) if kind == "users" and workers != 0 else None
+    started = time.perf_counter()
+    imported = uncommitted = 0
+    try:
+        with engine.connect() as conn:
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                tables = book_rows(batch) if kind == "books" else user_rows(batch, pool)
+                for table, rows in tables:
+                    conn.execute(insert(table), rows)
+                imported += len(batch)
+                uncommitted += len(batch)
+                if uncommitted >= commit_every:
+                    conn.commit()
+                    uncommitted = 0
+                    save_checkpoint(checkpoint, source, kind, done + imported)
+                    rate = imported / (time.perf_counter() - started)
+                    print(
+                        f"{kind}: {done + imported} rows ({rate:,.0f} rows/sec)",
+                        file=out,
+                    )
+            conn.commit()
+            save_checkpoint(checkpoint, source, kind, done + imported)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    rate = imported / elapsed if elapsed else 0.0
+    print(
+        f"Imported {imported} {kind} in {elapsed:.1f}s ({rate:,.0f} rows/sec)",
+        file=out,
+    )
+    return done + imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.import", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("kind", choices=("books", "users"))
+    parser.add_argument("path", help="CSV or JSONL file")
+    parser.add_argument("--format", choices=("csv", "jsonl"), dest="fmt")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--commit-every", type=int, default=10000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="password hashing processes (default: CPU count, 0 = inline)",
+    )
+    parser.add_argument("--checkpoint", help="file recording committed progress")
+    parser.add_argument("--database-url", help="defaults to the app database")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        from database.mysql import engine
+
+    run_import(
+        engine,
+        args.kind,
+        args.path,
+        fmt=args.fmt,
+        batch_size=args.batch_size,
+        commit_every=args.commit_every,
+        workers=args.workers,
+        checkpoint=args.checkpoint,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Digest of ``python -X importtime`` for the app's cold start.
+
+    python -m tools.importtime
+    python -m tools.importtime --module main --top 30 --json
+
+Runs the import in a fresh interpreter, then prints the total import time and
+the slowest modules by cumulative and by self time.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+# "import time:   self [us] | cumulative | imported package"
+_PREFIX = "import time:"
+
+
+def parse_importtime(lines):
+    """``[(module, self_us, cumulative_us, depth)]`` from -X importtime output."""
+    entries = []
+    for line in lines:
+        if not line.startswith(_PREFIX):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len(_PREFIX) :].split("|")
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue  # the header line
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), self_us, cumulative_us, depth))
+    return entries
+
+
+def digest(entries, top: int = 20):
+    # Top-level imports (depth 0) add up to the whole import
+    total_us = sum(entry[2] for entry in entries if entry[3] == 0)
+    by_cumulative = sorted(entries, key=lambda entry: entry[2], reverse=True)
+    by_self = sorted(entries, key=lambda entry: entry[1], reverse=True)
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(entries),
+        "cumulative": [
+            {"module": name, "ms": round(cumulative / 1000, 1)}
+            for name, _, cumulative, _ in by_cumulative[:top]
+        ],
+        "self": [
+            {"module": name, "ms": round(self_us / 1000, 1)}
+            for name, self_us, _, _ in by_self[:top]
+        ],
+    }
+
+
+def profile_import(module: str):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr.splitlines())
+
+
+def main(argv=None, out=sys.stdout):
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.importtime", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    report = digest(profile_import(args.module), args.top)
+    if args.json:
+        print(json.dumps(report), file=out)
+        return report
+
+    print(
+        f"import {args.module}: {report['total_ms']} ms, {report['modules']} modules",
+        file=out,
+    )
+    for title in ("cumulative", "self"):
+        print(f"\nSlowest by {title} time:", file=out)
+        for entry in report[title]:
+            print(f"  {entry['ms']:>8.1f} ms  {entry['module']}", file=out)
+    return report
+
+
+if __name__ == "__main__":
+    main()
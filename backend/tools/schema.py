@@ -0,0 +1,76 @@
+"""Create, migrate or drop the database schema, as a deploy step not at import.
+
+python -m tools.schema create
+python -m tools.schema migrate
+python -m tools.schema drop --yes
+python -m tools.schema create --database-url sqlite:///./dev.db
+
+`create` skips tables that already exist, so indexes added to a model later
+never reach them; `migrate` also creates those missing indexes (and, on
+SQLite, the books_fts search table).
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import create_engine, inspect
+
+from database.mysql import Base
+from models import create_all_tables
+from models.book.book_model import BOOKS_FTS_TABLE, create_sqlite_search
+
+
+def _index_names(conn, table_name: str) -> set:
+    return {index["name"] for index in inspect(conn).get_indexes(table_name)}
+
+
+def migrate(engine) -> list:
+    """Create missing tables, then the model indexes missing from existing
+    ones (on SQLite also the search table); the names of those created."""
+    create_all_tables(engine)
+    created = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = _index_names(conn, table.name)
+            for index in table.indexes:
+                if index.name not in existing:
+                    # Dialect-specific indexes (ddl_if) are skipped elsewhere
+                    index.create(conn)
+            created += sorted(_index_names(conn, table.name) - existing)
+        if conn.dialect.name == "sqlite":
+            if not inspect(conn).has_table(BOOKS_FTS_TABLE):
+                created.append(BOOKS_FTS_TABLE)
+            create_sqlite_search(conn)
+    return created
+
+
+def main(argv=None, out=sys.stdout):
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.schema", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("action", choices=("create", "migrate", "drop"))
+    parser.add_argument("--database-url", help="defaults to the app database")
+    parser.add_argument("--yes", action="store_true", help="confirm `drop`")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        from database.mysql import engine
+
+    if args.action == "create":
+        # create_all skips tables that already exist, so this is safe to re-run
+        create_all_tables(engine)
+    elif args.action == "migrate":
+        created = migrate(engine)
+        print(f"Indexes created: {', '.join(created) or 'none'}", file=out)
+    else:
+        if not args.yes:
+            parser.error("drop deletes every table, pass --yes to confirm")
+        Base.metadata.drop_all(bind=engine)
+    names = ", ".join(sorted(Base.metadata.tables))
+    print(f"Schema {args.action}: {names}", file=out)
+
+
+if __name__ == "__main__":
+    main()
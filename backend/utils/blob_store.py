@@ -0,0 +1,147 @@
+"""Content-addressed staging store for uploads handed to Celery workers.
+
+Image bytes never travel through the Redis broker. The API writes an upload
+once to ``objects/<sha256>`` under ``BLOB_STAGING_DIR`` (a directory shared
+with the workers) and queues a small reference instead. Each ``put`` also
+hard-links a claim ``claims/<sha256>.<token>`` to the object; the reference
+is ``<sha256>.<token>``, the token starting with the staging time. Identical
+uploads share one object, and ``release`` drops a claim and removes the
+object with its last claim (``st_nlink``). ``cleanup`` removes claims older
+than the TTL that no task ever consumed, then objects left without claims.
+"""
+
+import hashlib
+import os
+import re
+import secrets
+import tempfile
+import time
+from contextlib import contextmanager
+
+BLOB_STAGING_DIR = os.getenv(
+    "BLOB_STAGING_DIR", os.path.join(tempfile.gettempdir(), "books-app-blobs")
+)
+BLOB_STAGING_TTL = int(os.getenv("BLOB_STAGING_TTL", "86400"))
+COPY_CHUNK_SIZE = 64 * 1024
+
+_REF = re.compile(r"^([0-9a-f]{64})\.([0-9a-f]{16})$")
+
+
+def is_blob_ref(value) -> bool:
+    return isinstance(value, str) and _REF.match(value) is not None
+
+
+def staged_at(ref: str) -> int:
+    """Unix time the reference was issued."""
+    return int(ref.split(".")[1][:8], 16)
+
+
+def blob_digest(ref: str) -> str:
+    """SHA-256 hex digest of the staged bytes."""
+    return ref.split(".")[0]
+
+
+class BlobStore:
+    def __init__(self, root: str, ttl: int):
+        self.root = root
+        self.ttl = ttl
+        self._objects = os.path.join(root, "objects")
+        self._claims = os.path.join(root, "claims")
+        self._tmp = os.path.join(root, "tmp")
+
+    def _ensure_dirs(self):
+        for path in (self._objects, self._claims, self._tmp):
+            os.makedirs(path, exist_ok=True)
+
+    def _claim_path(self, ref: str) -> str:
+        if not is_blob_ref(ref):
+            raise ValueError(f"Invalid blob reference: {ref!r}")
+        return os.path.join(self._claims, ref)
+
+    def put(self, file) -> str:
+        """Stage the rest of `file` (a binary file object); returns its reference."""
+        self._ensure_dirs()
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in iter(lambda: file.read(COPY_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+            ref = f"{digest.hexdigest()}.{int(time.time()):08x}{secrets.token_hex(4)}"
+            object_path = os.path.join(self._objects, digest.hexdigest())
+            claim_path = os.path.join(self._claims, ref)
+            try:
+                # Identical bytes already staged: claim that object
+                os.link(object_path, claim_path)
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                os.replace(tmp_path, object_path)
+                os.link(object_path, claim_path)
+            return ref
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def path(self, ref: str) -> str:
+        """Filesystem path of a staged blob; FileNotFoundError once released."""
+        path = self._claim_path(ref)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Staged blob {ref} is gone")
+        return path
+
+    @contextmanager
+    def open(self, ref: str):
+        with open(self.path(ref), "rb") as file:
+            yield file
+
+    def release(self, ref: str):
+        """Drop one claim; the object goes with its last claim."""
+        claim = self._claim_path(ref)
+        try:
+            os.remove(claim)
+        except FileNotFoundError:
+            return
+        self._remove_unclaimed(os.path.join(self._objects, blob_digest(ref)))
+
+    def _remove_unclaimed(self, object_path: str, cutoff: float = None):
+        try:
+            stat = os.stat(object_path)
+            if stat.st_nlink == 1 and (cutoff is None or stat.st_mtime < cutoff):
+                os.remove(object_path)
+        except FileNotFoundError:
+            pass
+
+    def cleanup(self, max_age: int = None) -> int:
+        """Remove claims older than `max_age` (default the TTL); returns the
+        number removed."""
+        if not os.path.isdir(self.root):
+            return 0
+        cutoff = time.time() - (self.ttl if max_age is None else max_age)
+        removed = 0
+        for entry in os.scandir(self._claims):
+            # Claims share the object's inode, so their age is in the name
+            if is_blob_ref(entry.name) and staged_at(entry.name) < cutoff:
+                self.release(entry.name)
+                removed += 1
+        # Objects whose put() crashed before the claim was linked
+        for entry in os.scandir(self._objects):
+            self._remove_unclaimed(entry.path, cutoff)
+        for entry in os.scandir(self._tmp):
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        return removed
+
+    def stats(self) -> dict:
+        if not os.path.isdir(self.root):
+            return {"claims": 0, "objects": 0, "bytes": 0}
+        objects = list(os.scandir(self._objects))
+        return {
+            "claims": sum(1 for _ in os.scandir(self._claims)),
+            "objects": len(objects),
+            "bytes": sum(entry.stat().st_size for entry in objects),
+        }
+
+
+blob_store = BlobStore(BLOB_STAGING_DIR, BLOB_STAGING_TTL)
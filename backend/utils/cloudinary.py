@@ -42,6 +42,23 @@ def upload_image(image_bytes):
         return None
 
 
+def upload_rendition(image_bytes, public_id):
+    """Upload an already resized and encoded rendition as is (no transformation)."""
+    try:
+        result = cloudinary.uploader.upload(
+            image_bytes,
+            folder="Books_Project",
+            public_id=public_id,
+            overwrite=True,
+            resource_type="image",
+        )
+        return cloudinary.CloudinaryImage(result["public_id"]).build_url()
+
+    except Exception as e:
+        print(f"Error uploading rendition: {e}")
+        return None
+
+
 def delete_image(cloudinary_url):
     try:
         public_id = extract_public_id(cloudinary_url)
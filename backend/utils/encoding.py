@@ -0,0 +1,36 @@
+import json
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback produces the same bytes, only slower
+    orjson = None
+
+
+def format_datetime(value: datetime) -> str:
+    """``"%Y-%m-%d %H:%M:%S"`` for naive datetimes, without strftime's cost."""
+    return value.isoformat(" ", "seconds")
+
+
+def _default(obj):
+    if isinstance(obj, datetime):
+        return format_datetime(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode_json(content) -> bytes:
+    """Encode `content` the way Starlette's JSONResponse does (compact, UTF-8,
+    no ASCII escaping), with datetimes in the API's format. Uses orjson when
+    installed; floats in exponent notation are spelled ``1e-06`` by the
+    stdlib and ``1e-6`` by orjson, everything else is byte-identical."""
+    if orjson is not None:
+        return orjson.dumps(
+            content, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME
+        )
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
@@ -0,0 +1,40 @@
+import hashlib
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag: a content hash of the exact response bytes."""
+    return '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so a W/ prefix is ignored
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+# Per-token resources: only the caller's own cache may keep them
+PRIVATE_CACHE_HEADERS = {"Cache-Control": "private", "Vary": "Authorization"}
+
+
+def etag_response(
+    request: Request, payload, response_class=JSONResponse, private: bool = False
+):
+    """Render ``payload`` once, tag it and answer a matching If-None-Match with
+    304. Error envelopes are returned untouched so they are never cached.
+    `private` marks a response that depends on the Authorization header."""
+    if isinstance(payload, dict) and payload.get("status_code", 200) != 200:
+        return payload
+    response = response_class(content=payload)
+    etag = make_etag(response.body)
+    headers = {"ETag": etag, **(PRIVATE_CACHE_HEADERS if private else {})}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
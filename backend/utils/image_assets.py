@@ -0,0 +1,146 @@
+"""Content-hash deduplication of stored images.
+
+Before uploading, the workers look up the SHA-256 of the image bytes in
+``image_cache`` and then the ``ImageAssets`` table. Identical bytes reuse the
+stored renditions and take a reference instead of paying for another render
+and upload. New bytes are rendered locally (``utils.renditions``) and only
+the small renditions are uploaded. ``release_image`` drops a reference and
+destroys the renditions only when the last one goes away.
+"""
+
+import hashlib
+import os
+from typing import NamedTuple, Optional
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models.image.image_asset_model import ImageAsset
+from utils import cloudinary
+from utils.blob_store import COPY_CHUNK_SIZE
+from utils.cache import image_cache
+from utils.renditions import rendition_pool
+
+
+class StoredImage(NamedTuple):
+    url: str
+    medium_url: Optional[str] = None
+    thumb_url: Optional[str] = None
+
+
+def image_digest(source):
+    """SHA-256 hex digest of raw bytes or a local file; None for a remote URL."""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    if isinstance(source, str) and os.path.isfile(source):
+        digest = hashlib.sha256()
+        with open(source, "rb") as file:
+            for chunk in iter(lambda: file.read(COPY_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    return None
+
+
+def _stored(asset) -> StoredImage:
+    return StoredImage(asset.url, asset.medium_url, asset.thumb_url)
+
+
+def _add_reference(db, digest: str):
+    """Take a reference on an indexed asset; its StoredImage, or None if not
+    indexed."""
+    stored = image_cache.get(digest)
+    if stored is None:
+        asset = db.get(ImageAsset, digest)
+        if asset is None:
+            return None
+        stored = _stored(asset)
+    claimed = db.execute(
+        update(ImageAsset)
+        .where(ImageAsset.sha256 == digest)
+        .values(ref_count=ImageAsset.ref_count + 1)
+    ).rowcount
+    if not claimed:
+        # Destroyed since it was cached
+        image_cache.invalidate(digest)
+        return None
+    db.commit()
+    image_cache.set(digest, stored)
+    return stored
+
+
+def _upload_renditions(source, digest: str):
+    urls = {}
+    for rendition in rendition_pool.render(source):
+        # Named after the content, so a concurrent upload of the same bytes
+        # overwrites the same assets
+        url = cloudinary.upload_rendition(rendition.data, f"{digest}_{rendition.name}")
+        if not url:
+            for uploaded in urls.values():
+                cloudinary.delete_image(uploaded)
+            return None
+        urls[rendition.name] = url
+    return StoredImage(urls["large"], urls["medium"], urls["thumb"])
+
+
+def acquire_image(db, source, digest: str = None):
+    """StoredImage for `source` (bytes, a local path or a remote URL), rendering
+    and uploading only bytes not seen before. Each call that returns one
+    takes a reference."""
+    digest = digest or image_digest(source)
+    if digest is None:
+        # A remote URL cannot be hashed or rendered without fetching it
+        url = cloudinary.upload_image(source)
+        return StoredImage(url) if url else None
+    stored = _add_reference(db, digest)
+    if stored:
+        return stored
+
+    stored = _upload_renditions(source, digest)
+    if not stored:
+        return None
+    db.add(ImageAsset(sha256=digest, ref_count=1, **stored._asdict()))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker indexed the same bytes (and public IDs) first
+        db.rollback()
+        return _add_reference(db, digest)
+    image_cache.set(digest, stored)
+    return stored
+
+
+def release_image(db, url: str) -> bool:
+    """Drop one reference to the asset `url` (any rendition) belongs to; True
+    if its renditions were destroyed."""
+    if not url:
+        return False
+    asset = db.scalars(
+        select(ImageAsset).where(
+            or_(
+                ImageAsset.url == url,
+                ImageAsset.medium_url == url,
+                ImageAsset.thumb_url == url,
+            )
+        )
+    ).first()
+    if asset is None:
+        # Not indexed (uploaded before the index, or from a remote URL)
+        return cloudinary.delete_image(url)
+    digest, stored = asset.sha256, _stored(asset)
+    db.execute(
+        update(ImageAsset)
+        .where(ImageAsset.sha256 == digest)
+        .values(ref_count=ImageAsset.ref_count - 1)
+    )
+    # A concurrent acquire between the two statements keeps the row alive
+    destroyed = db.execute(
+        delete(ImageAsset).where(ImageAsset.sha256 == digest, ImageAsset.ref_count <= 0)
+    ).rowcount
+    db.commit()
+    if not destroyed:
+        return False
+    image_cache.invalidate(digest)
+    for rendition_url in stored:
+        if rendition_url:
+            cloudinary.delete_image(rendition_url)
+    return True
@@ -0,0 +1,39 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_LIMIT = 3
+MAX_PAGE_LIMIT = 100
+
+
+def clamp_limit(limit, default=DEFAULT_PAGE_LIMIT, maximum=MAX_PAGE_LIMIT):
+    if not limit or limit < 1:
+        return default
+    return min(limit, maximum)
+
+
+def encode_cursor(create_at: datetime, row_id: str) -> str:
+    """Opaque cursor for the last row of a page ordered by (create_At, id) DESC."""
+    raw = json.dumps([create_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return ``(create_at, row_id)``; raises ``ValueError`` on a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        create_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(create_at), str(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_before(create_col, id_col, create_at: datetime, row_id: str):
+    """``(create_col, id_col) < (create_at, row_id)`` written out so MySQL can
+    range-scan the composite index (it does not optimize row comparisons)."""
+    return or_(
+        create_col < create_at,
+        and_(create_col == create_at, id_col < row_id),
+    )
@@ -0,0 +1,120 @@
+"""Worker-side image renditions.
+
+An upload is decoded once (JPEG decodes straight at the largest rendition's
+scale via ``draft``), rotated per its EXIF orientation, and resized in a
+cascade into the ``RENDITION_SIZES`` renditions, each encoded as WebP (or
+JPEG) without EXIF. Only these small artifacts are uploaded, instead of the
+full-resolution original plus a remote transformation. The CPU-bound work
+runs in a process pool so a Celery worker's threads keep uploading; a pool
+broken by a dead render process is replaced.
+"""
+
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
+
+from PIL import Image, ImageOps
+
+# Longest edge in pixels, largest first
+RENDITION_SIZES = {"large": 1200, "medium": 480, "thumb": 160}
+RENDITION_FORMAT = os.getenv("RENDITION_FORMAT", "WEBP").upper()
+RENDITION_QUALITY = int(os.getenv("RENDITION_QUALITY", "80"))
+# 0 renders in the calling process
+RENDITION_WORKERS = int(
+    os.getenv("RENDITION_WORKERS", str(min(2, os.cpu_count() or 1)))
+)
+
+
+class Rendition(NamedTuple):
+    name: str
+    data: bytes
+    width: int
+    height: int
+
+
+def _decode(source):
+    image = Image.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+    edge = max(RENDITION_SIZES.values())
+    # JPEG only: let libjpeg decode at the smallest scale still >= edge
+    image.draft("RGB", (edge, edge))
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    if RENDITION_FORMAT == "WEBP" and has_alpha:
+        return image.convert("RGBA")
+    return image.convert("RGB")
+
+
+def render(source, sizes: dict = None, image_format: str = None) -> list:
+    """Renditions of `source` (a path or raw bytes), largest first."""
+    sizes = sizes or RENDITION_SIZES
+    image_format = image_format or RENDITION_FORMAT
+    current = _decode(source)
+    icc_profile = current.info.get("icc_profile")
+    renditions = []
+    for name, edge in sorted(sizes.items(), key=lambda item: -item[1]):
+        # Each rendition is resized from the previous, larger one
+        current = current.copy()
+        current.thumbnail((edge, edge), Image.LANCZOS)
+        # Drop EXIF (GPS, camera) and the rest of the source metadata
+        current.info = {}
+        out = io.BytesIO()
+        current.save(
+            out,
+            format=image_format,
+            quality=RENDITION_QUALITY,
+            icc_profile=icc_profile,
+        )
+        renditions.append(Rendition(name, out.getvalue(), *current.size))
+    return renditions
+
+
+class RenditionPool:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a worker that holds DB connections is not safe
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reset_executor(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def render(self, source) -> list:
+        # Prefork Celery children are daemonic and may not start processes;
+        # they already are pool processes, so they render in place
+        if self.workers <= 0 or multiprocessing.current_process().daemon:
+            return render(source)
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                return executor.submit(render, source).result()
+            except BrokenProcessPool:
+                # A render process died (killed, out of memory on a huge
+                # image); replace the pool and retry once, so only an image
+                # that kills it again fails its task
+                self._reset_executor(executor)
+                if attempt:
+                    raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+rendition_pool = RenditionPool(RENDITION_WORKERS)
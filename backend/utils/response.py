@@ -1,3 +1,14 @@
+import functools
+import inspect
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+from utils.encoding import encode_json
+
+STREAM_FLUSH_ROWS = 100
+
+
 def api_response(status_code=200, data=None, error=None, message=None):
     response = {"status_code": status_code}
     if data is not None:
@@ -7,3 +18,116 @@ def api_response(status_code=200, data=None, error=None, message=None):
     if message is not None:
         response["message"] = message
     return response
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded by ``encode_json``: same bytes, less CPU, and
+    datetimes are formatted during encoding."""
+
+    def render(self, content) -> bytes:
+        return encode_json(content)
+
+
+class FastJSONRoute(APIRoute):
+    """Opt-in route class (``APIRouter(route_class=FastJSONRoute)``): dict and
+    list results are sent as FastJSONResponse instead of going through
+    jsonable_encoder and the stdlib encoder."""
+
+    def __init__(self, path, endpoint, **kwargs):
+        kwargs.setdefault("response_class", FastJSONResponse)
+        status_code = kwargs.get("status_code") or 200
+        super().__init__(path, _encode_result(endpoint, status_code), **kwargs)
+
+
+def _encode_result(endpoint, status_code):
+    def to_response(result):
+        if isinstance(result, (dict, list)):
+            return FastJSONResponse(result, status_code=status_code)
+        return result
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            return to_response(await endpoint(*args, **kwargs))
+
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            return to_response(endpoint(*args, **kwargs))
+
+    return wrapper
+
+
+def _dumps(obj):
+    # Same bytes as the (Fast)JSONResponse body for the same object
+    return encode_json(obj).decode("utf-8")
+
+
+def stream_ndjson(rows):
+    """Encode rows as newline-delimited JSON, flushing every STREAM_FLUSH_ROWS rows."""
+    buffer = []
+    for row in rows:
+        buffer.append(_dumps(row))
+        if len(buffer) >= STREAM_FLUSH_ROWS:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def _envelope_chunk(buffer, status_code, opened):
+    prefix = "," if opened else '{"status_code":%d,"data":[' % status_code
+    return prefix + ",".join(buffer)
+
+
+def _envelope_close(status_code, opened, empty_message):
+    if opened:
+        return "]}"
+    if empty_message is not None:
+        return _dumps(api_response(status_code, message=empty_message))
+    return '{"status_code":%d,"data":[]}' % status_code
+
+
+def stream_api_response(rows, status_code=200, empty_message=None):
+    """Encode the api_response envelope incrementally with `data` as a JSON array.
+    The envelope opens with the first flushed rows, so with `empty_message`
+    no rows gives ``api_response(message=empty_message)`` like the
+    non-streamed path."""
+    buffer, opened = [], False
+    for row in rows:
+        buffer.append(_dumps(row))
+        if len(buffer) >= STREAM_FLUSH_ROWS:
+            yield _envelope_chunk(buffer, status_code, opened)
+            buffer, opened = [], True
+    if buffer:
+        yield _envelope_chunk(buffer, status_code, opened)
+        opened = True
+    yield _envelope_close(status_code, opened, empty_message)
+
+
+async def astream_ndjson(rows):
+    """stream_ndjson for async iterables."""
+    buffer = []
+    async for row in rows:
+        buffer.append(_dumps(row))
+        if len(buffer) >= STREAM_FLUSH_ROWS:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+async def astream_api_response(rows, status_code=200, empty_message=None):
+    """stream_api_response for async iterables."""
+    buffer, opened = [], False
+    async for row in rows:
+        buffer.append(_dumps(row))
+        if len(buffer) >= STREAM_FLUSH_ROWS:
+            yield _envelope_chunk(buffer, status_code, opened)
+            buffer, opened = [], True
+    if buffer:
+        yield _envelope_chunk(buffer, status_code, opened)
+        opened = True
+    yield _envelope_close(status_code, opened, empty_message)
@@ -0,0 +1,47 @@
+import html
+import re
+
+SNIPPET_WIDTH = 80
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def extract_terms(query: str):
+    """Lower-cased word tokens of a free-text query, de-duplicated in order."""
+    terms = []
+    for term in _TERM_RE.findall((query or "").lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+
+def fts5_query(terms):
+    # Quote every term so user input can never be parsed as FTS5 syntax
+    return " OR ".join('"%s"' % term for term in terms)
+
+
+def highlight_snippet(text: str, terms, width: int = SNIPPET_WIDTH):
+    """Cut a window of ``text`` around the first matching term and wrap every
+    match in <mark> tags. The text itself is HTML-escaped, so the <mark> tags
+    are the only markup. Returns None when no term occurs in ``text``."""
+    if not text or not terms:
+        return None
+    pattern = re.compile(
+        r"\b(%s)\b" % "|".join(re.escape(term) for term in terms), re.IGNORECASE
+    )
+    first = pattern.search(text)
+    if not first:
+        return None
+    start = max(first.start() - width // 2, 0)
+    end = min(start + width, len(text))
+    window = text[start:end]
+    pieces, last = [], 0
+    for match in pattern.finditer(window):
+        pieces.append(html.escape(window[last : match.start()]))
+        pieces.append(f"{HIGHLIGHT_START}{html.escape(match.group(0))}{HIGHLIGHT_END}")
+        last = match.end()
+    pieces.append(html.escape(window[last:]))
+    snippet = "".join(pieces)
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(text) else "")
@@ -0,0 +1,85 @@
+"""Bounded intake for image uploads.
+
+The upload is copied in chunks into a SpooledTemporaryFile (memory up to
+``SPOOL_MAX_MEMORY``, disk beyond). The copy stops as soon as it exceeds
+the byte budget, and the first chunk is sniffed for JPEG/PNG magic bytes
+rather than trusting the client's ``Content-Type``. Downstream code gets a
+rewound file handle, never the whole image as one ``bytes`` object.
+"""
+
+import tempfile
+from typing import NamedTuple
+
+MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+UPLOAD_CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_MEMORY = 1024 * 1024
+
+# Leading bytes of each accepted format
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "image/jpeg",
+    b"\x89PNG\r\n\x1a\n": "image/png",
+}
+
+
+class UploadRejected(ValueError):
+    """The upload is empty, too large or not a JPEG/PNG image."""
+
+    def __init__(self, error: str, message: str = None):
+        super().__init__(error)
+        self.error = error
+        self.message = message
+
+
+class ImageUpload(NamedTuple):
+    file: tempfile.SpooledTemporaryFile
+    content_type: str
+    size: int
+
+
+def sniff_image_type(head: bytes):
+    """``image/jpeg`` or ``image/png`` from the leading bytes, else None."""
+    for signature, content_type in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+def _too_large(max_bytes: int):
+    return UploadRejected(
+        "File size exceeds the limit",
+        f"File size should be less than {max_bytes // (1024 * 1024)}MB",
+    )
+
+
+async def read_image_upload(
+    upload, max_bytes: int = MAX_FILE_SIZE, chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> ImageUpload:
+    """Copy `upload` (a Starlette UploadFile) into a spooled temp file.
+    Raises ``UploadRejected``; the caller closes ``ImageUpload.file``."""
+    # Starlette records the size while parsing the form; reject without reading
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    try:
+        first = await upload.read(chunk_size)
+        if not first:
+            raise UploadRejected("Empty file uploaded")
+        content_type = sniff_image_type(first)
+        if content_type is None:
+            raise UploadRejected(
+                "Invalid file type", "Only JPEG and PNG files are allowed"
+            )
+        size = 0
+        chunk = first
+        while chunk:
+            size += len(chunk)
+            if size > max_bytes:
+                raise _too_large(max_bytes)
+            spool.write(chunk)
+            chunk = await upload.read(chunk_size)
+        spool.seek(0)
+        return ImageUpload(spool, content_type, size)
+    except BaseException:
+        spool.close()
+        raise